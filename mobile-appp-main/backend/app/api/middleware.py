@@ -0,0 +1,127 @@
+"""
+Middleware - Nén response (gzip, brotli nếu có) theo Accept-Encoding của client
+
+Bodies under COMPRESSION_MIN_SIZE, non-text content types and responses that
+already carry a Content-Encoding (e.g. gzipped exports) go out untouched.
+Streamed responses are compressed chunk by chunk, flushing after each chunk
+so clients keep receiving data as it is produced. Compressed GET bodies are
+kept in a per-worker LRU keyed by a hash of the body, so the same menu page
+is compressed once rather than on every request.
+"""
+import hashlib
+import zlib
+
+from flask import request
+
+from app.config import Config
+from app.infrastructure.cache.lru import LocalLRU
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first when the client weighs them equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml"
+}
+
+compressed_bodies = LocalLRU(Config.COMPRESSION_CACHE_SIZE)
+
+
+def compressible(response):
+    mimetype = response.mimetype or ""
+    return (
+        200 <= response.status_code < 300
+        and response.status_code not in (204, 206)
+        and not response.direct_passthrough
+        and "Content-Encoding" not in response.headers
+        and not response.cache_control.no_transform
+        and (mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES)
+    )
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=Config.BROTLI_QUALITY)
+    compressor = gzip_compressor()
+    return compressor.compress(body) + compressor.flush()
+
+
+def gzip_compressor():
+    # wbits 31: zlib stream with a gzip header and trailer
+    return zlib.compressobj(Config.GZIP_LEVEL, zlib.DEFLATED, 31)
+
+
+def compress_cached(body, encoding):
+    """Compressed body, reused while the same bytes keep being served"""
+    if len(body) > Config.COMPRESSION_CACHE_MAX_BODY:
+        return compress(body, encoding)
+    key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+    entry = compressed_bodies.get(key)
+    if entry is not None:
+        return entry[1]
+    compressed = compress(body, encoding)
+    compressed_bodies.set(key, compressed, Config.COMPRESSION_CACHE_TTL)
+    return compressed
+
+
+def compress_stream(chunks, encoding):
+    """Compress an iterable of chunks, flushing after each one"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=Config.BROTLI_QUALITY)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = gzip_compressor()
+        process, flush, finish = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            if chunk:
+                data = process(chunk) + flush()
+                if data:
+                    yield data
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def setup_middleware(app):
+    """Register response compression"""
+    if not Config.COMPRESSION_ENABLED:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if request.method == "HEAD" or not compressible(response):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(ENCODINGS)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if len(body) < Config.COMPRESSION_MIN_SIZE:
+                return response
+            if request.method == "GET" and not response.cache_control.no_store:
+                body = compress_cached(body, encoding)
+            else:
+                body = compress(body, encoding)
+            response.set_data(body)
+
+        response.headers["Content-Encoding"] = encoding
+        return response
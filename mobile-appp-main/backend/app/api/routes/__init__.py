@@ -1,41 +1,57 @@
 """
 Routes package - Register all blueprints
+
+Route modules are imported by register_routes, and only those listed in
+ENABLED_ROUTES, so a worker that serves e.g. just guest ordering never loads
+the admin or analytics code.
 """
-from app.api.routes.auth_routes import auth_bp
-from app.api.routes.dish_routes import dish_bp
-from app.api.routes.restaurant_routes import restaurant_bp
-from app.api.routes.order_routes import order_bp
-from app.api.routes.table_routes import table_bp
-from app.api.routes.guest_routes import guest_bp
-from app.api.routes.admin_routes import admin_bp
-from app.api.routes.static_routes import static_bp
-from app.api.routes.customer_routes import customer_bp
-from app.api.routes.mobile_routes import mobile_bp
-from app.api.routes.review_routes import review_bp
-from app.api.routes.reservation_routes import reservation_bp
-from app.api.routes.history_routes import history_bp
-from app.api.routes.membership_routes import membership_bp
-from app.api.routes.qr_routes import qr_bp
+import importlib
 
-def register_routes(app):
+from app.config import Config
+
+# (module, blueprint, url prefix) in registration order; the module name
+# without "_routes" is what ENABLED_ROUTES lists
+BLUEPRINTS = [
     # Register static route FIRST
-    app.register_blueprint(static_bp, url_prefix="/static")
+    ("static_routes", "static_bp", "/static"),
     
-    # Register API routes
-    app.register_blueprint(auth_bp, url_prefix="/api/v1/auth")
-    app.register_blueprint(dish_bp, url_prefix="/api/v1/dishes")
-    app.register_blueprint(restaurant_bp, url_prefix="/api/v1/restaurants")
-    app.register_blueprint(order_bp, url_prefix="/api/v1/orders")
-    app.register_blueprint(table_bp, url_prefix="/api/v1/tables")
-    app.register_blueprint(guest_bp, url_prefix="/api/v1/guest")
-    app.register_blueprint(admin_bp, url_prefix="/api/v1/admin")
+    # API routes
+    ("auth_routes", "auth_bp", "/api/v1/auth"),
+    ("dish_routes", "dish_bp", "/api/v1/dishes"),
+    ("restaurant_routes", "restaurant_bp", "/api/v1/restaurants"),
+    ("order_routes", "order_bp", "/api/v1/orders"),
+    ("table_routes", "table_bp", "/api/v1/tables"),
+    ("guest_routes", "guest_bp", "/api/v1/guest"),
+    ("admin_routes", "admin_bp", "/api/v1/admin"),
+    ("analytics_routes", "analytics_bp", "/api/v1/analytics"),
     
     # Mobile App routes
-    app.register_blueprint(customer_bp, url_prefix="/api/v1/customer")
-    app.register_blueprint(mobile_bp, url_prefix="/api/v1/mobile")
-    app.register_blueprint(review_bp, url_prefix="/api/v1")
-    app.register_blueprint(reservation_bp, url_prefix="/api/v1")
-    app.register_blueprint(history_bp, url_prefix="/api/v1")
-    app.register_blueprint(membership_bp, url_prefix="/api/v1/membership")
-    app.register_blueprint(qr_bp, url_prefix="/api/v1/qr")
+    ("customer_routes", "customer_bp", "/api/v1/customer"),
+    ("mobile_routes", "mobile_bp", "/api/v1/mobile"),
+    ("review_routes", "review_bp", "/api/v1"),
+    ("reservation_routes", "reservation_bp", "/api/v1"),
+    ("history_routes", "history_bp", "/api/v1"),
+    ("membership_routes", "membership_bp", "/api/v1/membership"),
+    ("qr_routes", "qr_bp", "/api/v1/qr"),
+]
+
 
+def enabled_route_modules():
+    if Config.ENABLED_ROUTES == "all":
+        return [module for module, _, _ in BLUEPRINTS]
+    enabled = {name.strip() for name in Config.ENABLED_ROUTES.split(",") if name.strip()}
+    known = {module[:-len("_routes")] for module, _, _ in BLUEPRINTS}
+    unknown = enabled - known
+    if unknown:
+        # A typo would otherwise turn a route group off and surface only as 404s
+        raise ValueError(f"Unknown ENABLED_ROUTES: {', '.join(sorted(unknown))} (known: {', '.join(sorted(known))})")
+    return [module for module, _, _ in BLUEPRINTS if module[:-len("_routes")] in enabled]
+
+
+def register_routes(app):
+    enabled = set(enabled_route_modules())
+    for module_name, blueprint, url_prefix in BLUEPRINTS:
+        if module_name not in enabled:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_name}")
+        app.register_blueprint(getattr(module, blueprint), url_prefix=url_prefix)
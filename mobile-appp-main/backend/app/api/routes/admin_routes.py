@@ -2,10 +2,15 @@
 Admin routes
 """
 from flask import Blueprint, request, jsonify, g
-from app.infrastructure.databases import get_session
+from datetime import date, timedelta
+from app.infrastructure.databases import get_session, pool_stats
 from app.models.tenant_model import TenantModel, TenantStatus
 from app.models.account_model import AccountModel, AccountRole
 from app.api.decorators import require_admin
+from app.services.metrics_service import unique_metrics
+from app.services.tenant_admin_service import tenant_listing, LISTING_TAG
+from app.infrastructure.cache import invalidate_tags, cache_stats
+from app.config import Config
 
 admin_bp = Blueprint("admin", __name__)
 
@@ -18,33 +23,19 @@ def admin_get_restaurants():
     limit = request.args.get('limit', 10, type=int)
     status = request.args.get('status')
     
-    session = get_session()
     try:
-        query = session.query(TenantModel)
-        
-        if status:
-            query = query.filter(TenantModel.status == TenantStatus(status))
-        
-        restaurants = query.offset((page - 1) * limit).limit(limit).all()
-        
-        return jsonify({
-            "data": [{
-                "id": r.id,
-                "name": r.name,
-                "slug": r.slug,
-                "email": r.email,
-                "phone": r.phone,
-                "address": r.address,
-                "logo": r.logo,
-                "description": r.description,
-                "status": r.status.value,
-                "subscription": r.subscription.value,
-                "created_at": r.created_at.isoformat() if r.created_at else None
-            } for r in restaurants],
-            "message": "Lấy danh sách nhà hàng thành công!"
-        }), 200
-    finally:
-        session.close()
+        status = TenantStatus(status).value if status else None
+    except ValueError:
+        return jsonify({"message": "Invalid status"}), 400
+
+    listing = tenant_listing(status, page, limit)
+    return jsonify({
+        "data": listing["items"],
+        "total": listing["total"],
+        "page": page,
+        "limit": limit,
+        "message": "Lấy danh sách nhà hàng thành công!"
+    }), 200
 
 
 @admin_bp.route("/restaurants/<int:restaurant_id>/status", methods=["PUT"])
@@ -67,6 +58,7 @@ def update_restaurant_status(restaurant_id):
         try:
             restaurant.status = TenantStatus(data['status'])
             session.commit()
+            invalidate_tags(LISTING_TAG)
             session.refresh(restaurant)
             
             return jsonify({
@@ -116,3 +108,48 @@ def admin_get_users():
         }), 200
     finally:
         session.close()
+
+
+@admin_bp.route("/metrics", methods=["GET"])
+@require_admin
+def admin_get_metrics():
+    """Approximate unique guests, customers and active tables per day (Admin only)"""
+    try:
+        today = date.today()
+        start_day = date.fromisoformat(request.args.get('from') or (today - timedelta(days=29)).isoformat())
+        end_day = date.fromisoformat(request.args.get('to') or today.isoformat())
+    except ValueError:
+        return jsonify({"message": "Invalid date (YYYY-MM-DD)"}), 400
+    
+    if end_day < start_day or (end_day - start_day).days > Config.ANALYTICS_MAX_DAYS:
+        return jsonify({"message": "Invalid date range"}), 400
+    
+    session = get_session()
+    try:
+        metrics = unique_metrics(session, start_day, end_day, request.args.get('tenant_id', type=int))
+        return jsonify({
+            "data": metrics,
+            "message": "Lấy số liệu nền tảng thành công!"
+        }), 200
+    finally:
+        session.close()
+
+
+@admin_bp.route("/cache", methods=["GET"])
+@require_admin
+def admin_get_cache_stats():
+    """Hit ratio and counters of this worker's cache (Admin only)"""
+    return jsonify({
+        "data": cache_stats(),
+        "message": "Lấy thống kê cache thành công!"
+    }), 200
+
+
+@admin_bp.route("/db-pool", methods=["GET"])
+@require_admin
+def admin_get_db_pool_stats():
+    """Connection checkout counters and hold times of this worker's pool (Admin only)"""
+    return jsonify({
+        "data": pool_stats(),
+        "message": "Lấy thống kê kết nối thành công!"
+    }), 200
@@ -0,0 +1,119 @@
+"""
+Analytics routes - Doanh thu và món bán chạy (đọc từ bảng tổng hợp)
+"""
+from flask import Blueprint, request, jsonify, g
+from datetime import date, datetime, timedelta
+from app.api.decorators import require_employee
+from app.infrastructure.databases import get_session
+from app.services.analytics_service import PERIODS, sales_series, top_dishes
+from app.services.reporting_service import build_report
+from app.config import Config
+
+analytics_bp = Blueprint("analytics", __name__)
+
+
+def parse_day_range():
+    """(from, to) local dates from the query string, defaulting to the last 7 days"""
+    today = date.today()
+    start_day = date.fromisoformat(request.args.get('from') or (today - timedelta(days=6)).isoformat())
+    end_day = date.fromisoformat(request.args.get('to') or today.isoformat())
+    if end_day < start_day or (end_day - start_day).days > Config.ANALYTICS_MAX_DAYS:
+        raise ValueError("Invalid date range")
+    return start_day, end_day
+
+
+@analytics_bp.route("/sales", methods=["GET"])
+@require_employee
+def get_sales():
+    """Revenue, covers, items sold and average ticket per hour or day"""
+    if not g.current_user.tenant_id:
+        return jsonify({"message": "User must belong to a tenant"}), 403
+
+    period = request.args.get('period', 'day')
+    if period not in PERIODS:
+        return jsonify({"message": "Invalid period (hour, day)"}), 400
+    try:
+        start_day, end_day = parse_day_range()
+    except ValueError:
+        return jsonify({"message": "Invalid date range (YYYY-MM-DD)"}), 400
+
+    session = get_session()
+    try:
+        series = sales_series(
+            session,
+            g.current_user.tenant_id,
+            period,
+            datetime.combine(start_day, datetime.min.time()),
+            datetime.combine(end_day + timedelta(days=1), datetime.min.time()),
+            request.args.get('branch_id', type=int)
+        )
+        revenue = sum(row["revenue"] for row in series)
+        tickets = sum(row["tickets"] for row in series)
+
+        return jsonify({
+            "data": {
+                "period": period,
+                "series": series,
+                "total_revenue": revenue,
+                "total_items_sold": sum(row["items_sold"] for row in series),
+                "average_ticket": round(revenue / tickets, 2) if tickets else 0
+            },
+            "message": "Lấy thống kê doanh thu thành công!"
+        }), 200
+    finally:
+        session.close()
+
+
+@analytics_bp.route("/dishes", methods=["GET"])
+@require_employee
+def get_dish_sales():
+    """Best-selling dishes over a date range"""
+    if not g.current_user.tenant_id:
+        return jsonify({"message": "User must belong to a tenant"}), 403
+
+    try:
+        start_day, end_day = parse_day_range()
+    except ValueError:
+        return jsonify({"message": "Invalid date range (YYYY-MM-DD)"}), 400
+
+    session = get_session()
+    try:
+        dishes = top_dishes(
+            session,
+            g.current_user.tenant_id,
+            start_day,
+            end_day,
+            request.args.get('branch_id', type=int),
+            min(request.args.get('limit', 20, type=int), 100)
+        )
+        return jsonify({
+            "data": dishes,
+            "message": "Lấy thống kê món bán chạy thành công!"
+        }), 200
+    finally:
+        session.close()
+
+
+@analytics_bp.route("/report", methods=["GET"])
+@require_employee
+def get_report():
+    """Revenue, top dishes and weekday/hour heatmap from columnar snapshots (no DB access)"""
+    if not g.current_user.tenant_id:
+        return jsonify({"message": "User must belong to a tenant"}), 403
+
+    try:
+        start_day, end_day = parse_day_range()
+    except ValueError:
+        return jsonify({"message": "Invalid date range (YYYY-MM-DD)"}), 400
+
+    report = build_report(
+        g.current_user.tenant_id,
+        start_day,
+        end_day,
+        request.args.get('branch_id', type=int),
+        min(request.args.get('limit', 20, type=int), 100)
+    )
+    return jsonify({
+        "data": report,
+        "message": "Lấy báo cáo thành công!"
+    }), 200
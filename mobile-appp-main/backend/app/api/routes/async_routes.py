@@ -0,0 +1,262 @@
+"""
+Async routes - Menu, gọi món của khách và quét QR chạy native asyncio (phục vụ qua app.asgi)
+
+Cùng URL, tham số và JSON với các handler Flask tương ứng; các route còn lại
+vẫn do Flask phục vụ.
+"""
+import json
+from datetime import datetime
+
+from anyio import from_thread
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+
+from app.api.routes.dish_routes import dish_page
+from app.infrastructure.databases.async_sessions import async_session, locate_tenant
+from app.models.dish_model import DishModel, DishSnapshotModel, DishStatus
+from app.models.guest_model import GuestModel
+from app.models.order_model import OrderModel, OrderStatus
+from app.models.table_model import TableModel
+from app.models.tenant_model import TenantModel
+from app.services.metrics_service import track_order_activity
+from app.services.order_history_service import record_order_lines
+from app.services.trending_service import record_order_trending
+from app.utils.errors import AuthError, EntityError
+from app.utils.jwt import verify_access_token
+from app.utils.serialization import JSON_CONTENT_TYPE, envelope
+
+
+def error_response(error):
+    """Same body as the Flask error handlers"""
+    response = JSONResponse({"message": error.description, "statusCode": error.code}, status_code=error.code)
+    if isinstance(error, AuthError):
+        response.delete_cookie("session_token")
+    return response
+
+
+def int_arg(request, name, default=None):
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+async def json_body(request):
+    try:
+        return await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+# MENU
+async def get_dishes(request):
+    """Get list of dishes"""
+    page = int_arg(request, 'page', 1)
+    limit = int_arg(request, 'limit', 10)
+    category = request.query_params.get('category')
+    status = request.query_params.get('status')
+    tenant_id = int_arg(request, 'tenant_id')
+
+    async def query_page():
+        # Sync ORM code over the async connection
+        async with async_session(tenant_id) as session:
+            return await session.run_sync(dish_page.__wrapped__, tenant_id, page, limit, category, status)
+
+    if tenant_id:
+        # Only a single restaurant's menu has a tag to invalidate it by. The
+        # cache does blocking Redis I/O (and waits on another worker's lock on
+        # a stampede), so it runs in a thread; a miss runs the query back on the loop.
+        data = await run_in_threadpool(
+            dish_page.get_or_set, lambda: from_thread.run(query_page), None, tenant_id, page, limit, category, status
+        )
+    else:
+        data = await query_page()
+
+    return Response(envelope(data.encode(), "Lấy danh sách món ăn thành công!"), media_type=JSON_CONTENT_TYPE)
+
+
+# GUEST ORDERS
+def guest_token(request):
+    """Payload of the guest's bearer token"""
+    auth_header = request.headers.get("Authorization")
+
+    if not auth_header or not auth_header.startswith("Bearer "):
+        raise AuthError("Vui lòng đăng nhập")
+
+    payload = verify_access_token(auth_header.split(" ")[1])
+
+    if not payload or "guestId" not in payload:
+        raise AuthError("Token không hợp lệ hoặc đã hết hạn")
+    return payload
+
+
+async def load_guest(session, payload):
+    guest = await session.get(GuestModel, payload["guestId"])
+    if not guest:
+        raise AuthError("Phiên đăng nhập đã hết hạn")
+    return guest
+
+
+async def create_guest_orders(request):
+    try:
+        payload = guest_token(request)
+        data = await json_body(request) or {}
+        orders_data = data.get("orders")
+
+        async with async_session(payload.get("tenantId")) as session:
+            guest = await load_guest(session, payload)
+
+            if not orders_data:
+                raise EntityError("Vui lòng chọn ít nhất 1 món")
+
+            # Logged-in mobile app member ordering at the table earns points
+            customer_id = None
+            customer_token = data.get("customer_token")
+            if customer_token:
+                customer_payload = verify_access_token(customer_token)
+                if not customer_payload or customer_payload.get("role") != "Customer":
+                    raise AuthError("Token khách hàng không hợp lệ")
+                customer_id = customer_payload.get("customer_id")
+
+            # One round-trip for every dish of the batch
+            dishes = {dish.id: dish for dish in await session.scalars(
+                select(DishModel).where(
+                    DishModel.id.in_([item.get("dish_id") for item in orders_data]),
+                    DishModel.status == DishStatus.AVAILABLE
+                )
+            )}
+
+            order_lines = []
+            for item in orders_data:
+                dish = dishes.get(item.get("dish_id"))
+                if not dish:
+                    continue
+
+                snapshot = DishSnapshotModel(
+                    dish_id=dish.id,
+                    name=dish.name,
+                    price=dish.price,
+                    description=dish.description,
+                    image=dish.image,
+                    category=dish.category,
+                    status=dish.status.value
+                )
+                order = OrderModel(
+                    tenant_id=guest.tenant_id,
+                    guest_id=guest.id,
+                    customer_id=customer_id,
+                    table_number=guest.table_number,
+                    dish_snapshot=snapshot,
+                    quantity=item.get("quantity", 1),
+                    notes=item.get("notes", ""),
+                    status=OrderStatus.PENDING,
+                    created_at=datetime.utcnow()
+                )
+                session.add(order)
+                order_lines.append((order, snapshot))
+
+            if not order_lines:
+                raise EntityError("Không có món hợp lệ để đặt")
+
+            await session.flush()
+            await session.run_sync(record_order_lines, order_lines)
+            await session.commit()
+    except (AuthError, EntityError) as e:
+        return error_response(e)
+
+    created_orders = [order for order, _ in order_lines]
+    record_order_trending(guest.tenant_id, order_lines)
+    track_order_activity(guest.tenant_id, created_orders)
+
+    return JSONResponse({
+        "success": True,
+        "message": "Đặt món thành công",
+        "data": {
+            "orderIds": [o.id for o in created_orders],
+            "totalOrders": len(created_orders)
+        }
+    }, status_code=201)
+
+
+async def get_guest_orders(request):
+    try:
+        payload = guest_token(request)
+        async with async_session(payload.get("tenantId")) as session:
+            guest = await load_guest(session, payload)
+            rows = (await session.execute(
+                select(OrderModel, DishSnapshotModel).join(
+                    DishSnapshotModel, DishSnapshotModel.id == OrderModel.dish_snapshot_id
+                ).where(
+                    OrderModel.guest_id == guest.id
+                ).order_by(OrderModel.created_at.desc())
+            )).all()
+    except AuthError as e:
+        return error_response(e)
+
+    items = [{
+        "id": order.id,
+        "status": order.status.value,
+        "quantity": order.quantity,
+        "notes": order.notes,
+        "createdAt": order.created_at.isoformat(),
+        "dish": {
+            "name": snapshot.name,
+            "price": snapshot.price,
+            "image": snapshot.image
+        },
+        "totalPrice": snapshot.price * order.quantity
+    } for order, snapshot in rows]
+
+    return JSONResponse({
+        "success": True,
+        "data": {
+            "items": items,
+            "total": len(items)
+        }
+    })
+
+
+# QR
+async def scan_qr_code(request):
+    """Scan QR code to get restaurant and table info"""
+    data = await json_body(request)
+    if not data or 'token' not in data:
+        return JSONResponse({"message": "Invalid request"}, status_code=400)
+
+    token = data.get('token')
+
+    # The token alone does not say which shard the table is on
+    tenant_id = await locate_tenant(TableModel, TableModel.token == token)
+    async with async_session(tenant_id) as session:
+        row = (await session.execute(
+            select(TableModel, TenantModel).outerjoin(
+                TenantModel, TenantModel.id == TableModel.tenant_id
+            ).where(TableModel.token == token).limit(1)
+        )).first()
+
+    if not row:
+        return JSONResponse({"message": "Invalid QR code"}, status_code=404)
+
+    table, restaurant = row
+    if not restaurant:
+        return JSONResponse({"message": "Restaurant not found"}, status_code=404)
+
+    return JSONResponse({
+        "data": {
+            "restaurant": {
+                "id": restaurant.id,
+                "name": restaurant.name,
+                "slug": restaurant.slug,
+                "logo": restaurant.logo,
+                "address": restaurant.address
+            },
+            "table": {
+                "number": table.number,
+                "capacity": table.capacity,
+                "status": table.status.value
+            },
+            "token": token
+        },
+        "message": "Quét mã QR thành công!"
+    })
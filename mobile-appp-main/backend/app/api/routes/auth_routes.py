@@ -8,9 +8,8 @@ from app.models.tenant_model import TenantModel, TenantStatus
 from app.utils.crypto import hash_password, verify_password
 from app.utils.jwt import create_access_token, create_refresh_token, verify_refresh_token
 from app.utils.helpers import generate_slug
+from app.services.refresh_token_service import get_refresh_token_store, refresh_token_expires_at
 from app.api.decorators import require_auth
-from app.config import Config
-from datetime import datetime, timedelta
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -106,15 +105,8 @@ def login():
         access_token = create_access_token(token_data)
         refresh_token = create_refresh_token(token_data)
         
-        # Save refresh token to database
-        from app.models.refresh_token_model import RefreshTokenModel
-        
-        refresh_token_model = RefreshTokenModel(
-            token=refresh_token,
-            account_id=user.id,
-            expires_at=datetime.utcnow() + timedelta(seconds=Config.REFRESH_TOKEN_EXPIRES_IN)
-        )
-        session.add(refresh_token_model)
+        # Save refresh token digest
+        get_refresh_token_store().save(session, refresh_token, user.id, refresh_token_expires_at())
         session.commit()
         
         return jsonify({
@@ -147,14 +139,9 @@ def refresh_token():
     
     session = get_session()
     try:
-        # Verify token exists in database
-        from app.models.refresh_token_model import RefreshTokenModel
-        
-        token_model = session.query(RefreshTokenModel).filter(
-            RefreshTokenModel.token == refresh_token
-        ).first()
-        
-        if not token_model or token_model.expires_at < datetime.utcnow():
+        # Revoking is the check: of two concurrent refreshes with one token only one removes it
+        token_store = get_refresh_token_store()
+        if not token_store.consume(session, refresh_token):
             return jsonify({"message": "Refresh token expired or invalid"}), 401
         
         # Get user
@@ -173,9 +160,8 @@ def refresh_token():
         new_access_token = create_access_token(token_data)
         new_refresh_token = create_refresh_token(token_data)
         
-        # Update refresh token
-        token_model.token = new_refresh_token
-        token_model.expires_at = datetime.utcnow() + timedelta(seconds=Config.REFRESH_TOKEN_EXPIRES_IN)
+        # Rotate refresh token (the old one was consumed above)
+        token_store.save(session, new_refresh_token, user.id, refresh_token_expires_at())
         session.commit()
         
         return jsonify({
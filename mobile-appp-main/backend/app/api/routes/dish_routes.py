@@ -2,17 +2,59 @@
 Dish routes
 """
 from flask import Blueprint, request, jsonify
-from app.infrastructure.databases import get_session
+from app.infrastructure.databases import get_session, use_replica
+from app.infrastructure.cache import cached, invalidate_tags, tenant_tag
 from app.models.dish_model import DishModel, DishStatus
+from app.models.rating_stats_model import DishRatingStatsModel
 from app.api.decorators import require_employee
+from app.utils.serialization import compile_serializer, dumps, json_response
+from app.config import Config
 from flask import g
 
 dish_bp = Blueprint("dish", __name__)
 
+serialize_dish = compile_serializer(
+    "id", "tenant_id", "name", "price", "description", "image", "category", "status", "created_at", "updated_at"
+)
+
+
+def dish_rating(stats):
+    """Rating summary from the materialized per-dish stats row"""
+    if not stats or not stats.rating_count:
+        return {"average": 0.0, "count": 0, "histogram": [0, 0, 0, 0, 0]}
+    return {"average": stats.average, "count": stats.rating_count, "histogram": stats.histogram}
+
+
+@cached("dishes_json", ttl=Config.MENU_CACHE_TTL, tags=("tenant:{tenant_id}:menu",))
+def dish_page(session, tenant_id, page, limit, category=None, status=None):
+    """One page of dishes with their rating summaries, as JSON text (cached already encoded)"""
+    query = session.query(DishModel)
+    
+    if tenant_id:
+        query = query.filter(DishModel.tenant_id == tenant_id)
+    
+    if category:
+        query = query.filter(DishModel.category == category)
+    
+    if status:
+        query = query.filter(DishModel.status == DishStatus(status))
+    
+    total = query.count()
+    dishes = query.add_entity(DishRatingStatsModel).outerjoin(
+        DishRatingStatsModel, DishRatingStatsModel.dish_id == DishModel.id
+    ).offset((page - 1) * limit).limit(limit).all()
+    
+    return dumps({
+        "items": [serialize_dish(d, rating=dish_rating(stats)) for d, stats in dishes],
+        "total": total,
+        "page": page,
+        "limit": limit
+    }).decode()
+
 
 @dish_bp.route("", methods=["GET"])
 def get_dishes():
-    """Get list of dishes"""
+    """Get list of dishes (reads the primary: a lagging replica would refill the menu cache with stale rows)"""
     page = request.args.get('page', 1, type=int)
     limit = request.args.get('limit', 10, type=int)
     category = request.args.get('category')
@@ -21,54 +63,31 @@ def get_dishes():
     
     session = get_session()
     try:
-        query = session.query(DishModel)
-        
-        if tenant_id:
-            query = query.filter(DishModel.tenant_id == tenant_id)
+        # Only a single restaurant's menu has a tag to invalidate it by
+        load_page = dish_page if tenant_id else dish_page.__wrapped__
         
-        if category:
-            query = query.filter(DishModel.category == category)
-        
-        if status:
-            query = query.filter(DishModel.status == DishStatus(status))
-        
-        total = query.count()
-        dishes = query.offset((page - 1) * limit).limit(limit).all()
-        
-        return jsonify({
-            "data": {
-                "items": [{
-                    "id": d.id,
-                    "tenant_id": d.tenant_id,
-                    "name": d.name,
-                    "price": d.price,
-                    "description": d.description,
-                    "image": d.image,
-                    "category": d.category,
-                    "status": d.status.value,
-                    "created_at": d.created_at.isoformat() if d.created_at else None,
-                    "updated_at": d.updated_at.isoformat() if d.updated_at else None
-                } for d in dishes],
-                "total": total,
-                "page": page,
-                "limit": limit
-            },
-            "message": "Lấy danh sách món ăn thành công!"
-        }), 200
+        return json_response(
+            load_page(session, tenant_id, page, limit, category, status).encode(),
+            "Lấy danh sách món ăn thành công!"
+        )
     finally:
         session.close()
 
 
 @dish_bp.route("/<int:dish_id>", methods=["GET"])
+@use_replica
 def get_dish(dish_id):
     """Get dish by ID"""
     session = get_session()
     try:
-        dish = session.query(DishModel).filter(DishModel.id == dish_id).first()
+        row = session.query(DishModel, DishRatingStatsModel).outerjoin(
+            DishRatingStatsModel, DishRatingStatsModel.dish_id == DishModel.id
+        ).filter(DishModel.id == dish_id).first()
         
-        if not dish:
+        if not row:
             return jsonify({"message": "Dish not found"}), 404
         
+        dish, stats = row
         return jsonify({
             "data": {
                 "id": dish.id,
@@ -79,6 +98,7 @@ def get_dish(dish_id):
                 "image": dish.image,
                 "category": dish.category,
                 "status": dish.status.value,
+                "rating": dish_rating(stats),
                 "created_at": dish.created_at.isoformat() if dish.created_at else None,
                 "updated_at": dish.updated_at.isoformat() if dish.updated_at else None
             },
@@ -113,6 +133,7 @@ def create_dish():
         
         session.add(dish)
         session.commit()
+        invalidate_tags(tenant_tag(g.current_user.tenant_id, "menu"))
         session.refresh(dish)
         
         return jsonify({
@@ -169,6 +190,7 @@ def update_dish(dish_id):
             dish.status = DishStatus(data['status'])
         
         session.commit()
+        invalidate_tags(tenant_tag(g.current_user.tenant_id, "menu"))
         session.refresh(dish)
         
         return jsonify({
@@ -208,6 +230,7 @@ def delete_dish(dish_id):
         
         session.delete(dish)
         session.commit()
+        invalidate_tags(tenant_tag(g.current_user.tenant_id, "menu"))
         
         return jsonify({"message": "Xóa món ăn thành công!"}), 200
     except Exception as e:
@@ -4,7 +4,7 @@ from functools import wraps
 from datetime import datetime
 import logging
 
-from app.infrastructure.databases import get_session
+from app.infrastructure.databases import get_session, locate_tenant
 
 from app.models.guest_model import GuestModel
 from app.models.table_model import TableModel
@@ -13,6 +13,9 @@ from app.models.order_model import OrderModel, OrderStatus
 
 from app.utils.jwt import create_access_token, verify_access_token
 from app.utils.errors import EntityError, AuthError, NotFoundError
+from app.services.trending_service import record_order_trending
+from app.services.metrics_service import track_unique, track_order_activity
+from app.services.order_history_service import record_order_lines
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +37,8 @@ def guest_auth_required(f):
         if not payload or "guestId" not in payload:
             raise AuthError("Token không hợp lệ hoặc đã hết hạn")
 
+        # Route to the restaurant's shard (older tokens without it use the default)
+        g.shard_tenant_id = payload.get("tenantId")
         session = get_session()
         try:
             guest = session.query(GuestModel).filter(
@@ -59,15 +64,18 @@ def guest_auth_required(f):
 # AUTH
 @bp.route("/login", methods=["POST"])
 def guest_login():
-    session = get_session()
-    try:
-        data = request.get_json() or {}
-        table_token = data.get("table_token")
-        name = data.get("name", "Khách")
+    data = request.get_json() or {}
+    table_token = data.get("table_token")
+    name = data.get("name", "Khách")
+
+    if not table_token:
+        raise EntityError("Thiếu table_token")
 
-        if not table_token:
-            raise EntityError("Thiếu table_token")
+    # The QR token alone does not say which shard the table is on
+    g.shard_tenant_id = locate_tenant(TableModel, TableModel.token == table_token)
 
+    session = get_session()
+    try:
         table = session.query(TableModel).filter(
             TableModel.token == table_token
         ).first()
@@ -96,8 +104,10 @@ def guest_login():
             guest.updated_at = datetime.utcnow()
             session.commit()
 
+        track_unique("guests", guest.tenant_id, guest.id)
+
         access_token = create_access_token(
-            data={"guestId": guest.id, "tableNumber": guest.table_number},
+            data={"guestId": guest.id, "tableNumber": guest.table_number, "tenantId": guest.tenant_id},
             is_guest=True
         )
 
@@ -131,7 +141,17 @@ def create_orders():
     session = g.session
     guest = g.guest
 
+    # Logged-in mobile app member ordering at the table earns points
+    customer_id = None
+    customer_token = data.get("customer_token")
+    if customer_token:
+        customer_payload = verify_access_token(customer_token)
+        if not customer_payload or customer_payload.get("role") != "Customer":
+            raise AuthError("Token khách hàng không hợp lệ")
+        customer_id = customer_payload.get("customer_id")
+
     created_orders = []
+    order_lines = []
 
     for item in orders_data:
         dish_id = item.get("dish_id")
@@ -162,6 +182,7 @@ def create_orders():
         order = OrderModel(
             tenant_id=guest.tenant_id,
             guest_id=guest.id,
+            customer_id=customer_id,
             table_number=guest.table_number,
             dish_snapshot_id=snapshot.id,
             quantity=quantity,
@@ -171,11 +192,16 @@ def create_orders():
         )
         session.add(order)
         created_orders.append(order)
+        order_lines.append((order, snapshot))
 
     if not created_orders:
         raise EntityError("Không có món hợp lệ để đặt")
 
+    session.flush()
+    record_order_lines(session, order_lines)
     session.commit()
+    record_order_trending(guest.tenant_id, order_lines)
+    track_order_activity(guest.tenant_id, created_orders)
 
     return jsonify({
         "success": True,
@@ -1,11 +1,13 @@
+from datetime import datetime
 from flask import Blueprint, request, jsonify, g
 from app.infrastructure.databases import get_session
 from app.models.guest_model import GuestModel
-from app.models.order_model import OrderModel
-from app.models.dish_model import DishModel
+from app.models.order_history_model import OrderHistoryModel
+from app.services.order_history_service import get_history_page
+from app.utils.helpers import encode_cursor, decode_cursor
 from app.utils.jwt import verify_access_token
 
-bp = Blueprint("history", __name__)
+history_bp = Blueprint("history", __name__)
 
 
 def guest_auth():
@@ -22,47 +24,79 @@ def guest_auth():
             "success": False,
             "message": "Token không hợp lệ"
         }), 401
+    g.shard_tenant_id = payload.get("tenantId")
     session = get_session()
-    guest = session.query(GuestModel).filter(
-        GuestModel.id == payload["guestId"]
-    ).first()
-    if not guest:
+    try:
+        guest_id = session.query(GuestModel.id).filter(
+            GuestModel.id == payload["guestId"]
+        ).scalar()
+    finally:
         session.close()
+    if not guest_id:
         return None, jsonify({
             "success": False,
             "message": "Phiên đăng nhập đã hết hạn"
         }), 401
-    g.session = session
-    g.guest = guest
-    return guest, None, None
-@bp.route("/history/orders", methods=["GET"])
-def get_order_history():
-    guest, error_response, status_code = guest_auth()
-    if error_response:
-        return error_response, status_code
-    session = g.session
+    return guest_id, None, None
+
+
+def customer_auth():
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None, jsonify({
+            "success": False,
+            "message": "Vui lòng đăng nhập"
+        }), 401
+    payload = verify_access_token(auth_header.split(" ")[1])
+    if not payload or payload.get("role") != "Customer":
+        return None, jsonify({
+            "success": False,
+            "message": "Token không hợp lệ"
+        }), 401
+    return payload.get("customer_id"), None, None
+
+
+def history_page(owner_column, owner_id):
+    limit = max(1, min(request.args.get("limit", 20, type=int), 100))
+    cursor = request.args.get("cursor")
+    cursor_values = None
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            if len(values) != 2:
+                raise ValueError(cursor)
+            cursor_values = (datetime.fromisoformat(values[0]), int(values[1]))
+        except (TypeError, ValueError):
+            return jsonify({
+                "success": False,
+                "message": "Cursor không hợp lệ"
+            }), 400
+    session = get_session()
     try:
-        orders = (
-            session.query(OrderModel, DishModel)
-            .join(DishModel, OrderModel.dish_id == DishModel.id)
-            .filter(OrderModel.guest_id == guest.id)
-            .order_by(OrderModel.created_at.desc())
-            .all()
-        )
-        data = []
-        for order, dish in orders:
-            data.append({
-                "orderId": order.id,
-                "dishName": dish.name,
-                "quantity": order.quantity,
-                "notes": order.notes,
-                "price": dish.price,
-                "totalPrice": dish.price * order.quantity,
-                "createdAt": order.created_at.isoformat()
-            })
+        visits, next_values = get_history_page(session, owner_column, owner_id, cursor_values, limit)
         return jsonify({
             "success": True,
-            "data": data
+            "data": {
+                "visits": visits,
+                "nextCursor": encode_cursor(*next_values) if next_values else None,
+                "hasMore": next_values is not None
+            }
         }), 200
     finally:
         session.close()
+
+
+@history_bp.route("/history/orders", methods=["GET"])
+def get_order_history():
+    guest_id, error_response, status_code = guest_auth()
+    if error_response:
+        return error_response, status_code
+    return history_page(OrderHistoryModel.guest_id, guest_id)
+
+
+@history_bp.route("/history/customer/orders", methods=["GET"])
+def get_customer_order_history():
+    customer_id, error_response, status_code = customer_auth()
+    if error_response:
+        return error_response, status_code
+    return history_page(OrderHistoryModel.customer_id, customer_id)
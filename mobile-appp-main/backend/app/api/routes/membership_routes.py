@@ -3,7 +3,10 @@ Membership routes - Hạng thành viên và điểm tích lũy
 """
 from flask import Blueprint, request, jsonify
 from app.infrastructure.databases import get_session
-from app.models.customer_model import CustomerModel, MembershipTier
+from app.models.customer_model import CustomerModel
+from app.services.loyalty_service import (
+    TIERS, TIER_THRESHOLDS, tier_for_spending, next_tier_for_spending
+)
 
 membership_bp = Blueprint("membership", __name__)
 
@@ -14,25 +17,23 @@ def get_membership_tiers():
     tiers_info = {
         "Iron": {
             "name": "Sắt",
-            "min_spending": 0,
             "benefits": ["Tích điểm 1%", "Ưu đãi cơ bản"]
         },
         "Silver": {
             "name": "Bạc",
-            "min_spending": 1000000,
             "benefits": ["Tích điểm 2%", "Giảm giá 5%", "Ưu tiên đặt bàn"]
         },
         "Gold": {
             "name": "Vàng",
-            "min_spending": 5000000,
             "benefits": ["Tích điểm 3%", "Giảm giá 10%", "Quà tặng sinh nhật", "Ưu tiên cao"]
         },
         "Diamond": {
             "name": "Kim cương",
-            "min_spending": 10000000,
             "benefits": ["Tích điểm 5%", "Giảm giá 15%", "Quà tặng đặc biệt", "Ưu tiên tối đa", "Dịch vụ VIP"]
         }
     }
+    for tier, min_spending in zip(TIERS, TIER_THRESHOLDS):
+        tiers_info[tier.value]["min_spending"] = min_spending
     
     return jsonify({
         "data": tiers_info,
@@ -69,25 +70,14 @@ def get_my_membership():
             return jsonify({"message": "Customer not found"}), 404
         
         # Calculate next tier requirements
-        next_tier = None
-        spending_to_next = 0
-        
-        if customer.membership_tier == MembershipTier.IRON:
-            next_tier = "Silver"
-            spending_to_next = max(0, 1000000 - customer.total_spending)
-        elif customer.membership_tier == MembershipTier.SILVER:
-            next_tier = "Gold"
-            spending_to_next = max(0, 5000000 - customer.total_spending)
-        elif customer.membership_tier == MembershipTier.GOLD:
-            next_tier = "Diamond"
-            spending_to_next = max(0, 10000000 - customer.total_spending)
+        next_tier, spending_to_next = next_tier_for_spending(customer.total_spending)
         
         return jsonify({
             "data": {
                 "current_tier": customer.membership_tier.value,
                 "total_spending": customer.total_spending,
                 "points": customer.points,
-                "next_tier": next_tier,
+                "next_tier": next_tier.value if next_tier else None,
                 "spending_to_next": spending_to_next
             },
             "message": "Lấy thông tin hạng thành viên thành công!"
@@ -126,14 +116,7 @@ def update_membership_tier():
         
         # Update tier based on spending
         old_tier = customer.membership_tier
-        if customer.total_spending >= 10000000:
-            customer.membership_tier = MembershipTier.DIAMOND
-        elif customer.total_spending >= 5000000:
-            customer.membership_tier = MembershipTier.GOLD
-        elif customer.total_spending >= 1000000:
-            customer.membership_tier = MembershipTier.SILVER
-        else:
-            customer.membership_tier = MembershipTier.IRON
+        customer.membership_tier = tier_for_spending(customer.total_spending)
         
         tier_updated = old_tier != customer.membership_tier
         
@@ -2,15 +2,93 @@
 Mobile App routes - Restaurant listing, search, recommendations
 """
 from flask import Blueprint, request, jsonify
-from app.infrastructure.databases import get_session
+from app.infrastructure.databases import get_session, use_replica, scatter, only_home_tenants
 from app.models.tenant_model import TenantModel, TenantStatus
 from app.models.review_model import ReviewModel
+from app.models.dish_model import DishModel, DishStatus
+from app.services.trending_service import trending
 from sqlalchemy import func, desc
 
 mobile_bp = Blueprint("mobile", __name__)
 
 
+def restaurant_summaries(session, search=None, min_rating=None):
+    """Active restaurants with their rating summary (one shard)"""
+    query = session.query(TenantModel).filter(
+        TenantModel.status == TenantStatus.ACTIVE
+    )
+    query = only_home_tenants(session, query, TenantModel.id)
+    
+    # Search by name or address
+    if search:
+        query = query.filter(
+            (TenantModel.name.ilike(f'%{search}%')) |
+            (TenantModel.address.ilike(f'%{search}%'))
+        )
+    
+    restaurant_data = []
+    for restaurant in query.all():
+        # Get average rating
+        avg_rating = session.query(func.avg(ReviewModel.rating)).filter(
+            ReviewModel.tenant_id == restaurant.id
+        ).scalar() or 0.0
+        
+        # Filter by min_rating if provided
+        if min_rating and avg_rating < min_rating:
+            continue
+        
+        # Get review count
+        review_count = session.query(func.count(ReviewModel.id)).filter(
+            ReviewModel.tenant_id == restaurant.id
+        ).scalar() or 0
+        
+        restaurant_data.append({
+            "id": restaurant.id,
+            "name": restaurant.name,
+            "slug": restaurant.slug,
+            "address": restaurant.address,
+            "phone": restaurant.phone,
+            "logo": restaurant.logo,
+            "description": restaurant.description,
+            "average_rating": round(float(avg_rating), 1),
+            "review_count": review_count
+        })
+    return restaurant_data
+
+
+def top_rated_restaurants(session, limit):
+    """Highest rated active restaurants (one shard)"""
+    restaurants = session.query(
+        TenantModel,
+        func.avg(ReviewModel.rating).label('avg_rating'),
+        func.count(ReviewModel.id).label('review_count')
+    ).join(
+        ReviewModel, TenantModel.id == ReviewModel.tenant_id, isouter=True
+    ).filter(
+        TenantModel.status == TenantStatus.ACTIVE
+    )
+    restaurants = only_home_tenants(session, restaurants, TenantModel.id).group_by(
+        TenantModel.id
+    ).order_by(
+        desc('avg_rating'),
+        desc('review_count')
+    ).limit(limit).all()
+    
+    return [{
+        "id": restaurant.id,
+        "name": restaurant.name,
+        "slug": restaurant.slug,
+        "address": restaurant.address,
+        "phone": restaurant.phone,
+        "logo": restaurant.logo,
+        "description": restaurant.description,
+        "average_rating": round(float(avg_rating or 0), 1),
+        "review_count": review_count or 0
+    } for restaurant, avg_rating, review_count in restaurants]
+
+
 @mobile_bp.route("/restaurants", methods=["GET"])
+@use_replica
 def get_restaurants_list():
     """Get list of restaurants for mobile app"""
     page = request.args.get('page', 1, type=int)
@@ -18,118 +96,55 @@ def get_restaurants_list():
     search = request.args.get('search')
     min_rating = request.args.get('min_rating', type=float)
     
-    session = get_session()
-    try:
-        query = session.query(TenantModel).filter(
-            TenantModel.status == TenantStatus.ACTIVE
+    # Every shard lists its own restaurants; merged here
+    restaurant_data = [
+        restaurant
+        for _, restaurants in scatter(
+            lambda session: restaurant_summaries(session, search, min_rating), read_only=True
         )
-        
-        # Search by name or address
-        if search:
-            query = query.filter(
-                (TenantModel.name.ilike(f'%{search}%')) |
-                (TenantModel.address.ilike(f'%{search}%'))
-            )
-        
-        # Calculate average rating for each restaurant
-        restaurants = query.all()
-        restaurant_data = []
-        
-        for restaurant in restaurants:
-            # Get average rating
-            avg_rating = session.query(func.avg(ReviewModel.rating)).filter(
-                ReviewModel.tenant_id == restaurant.id
-            ).scalar() or 0.0
-            
-            # Filter by min_rating if provided
-            if min_rating and avg_rating < min_rating:
-                continue
-            
-            # Get review count
-            review_count = session.query(func.count(ReviewModel.id)).filter(
-                ReviewModel.tenant_id == restaurant.id
-            ).scalar() or 0
-            
-            restaurant_data.append({
-                "id": restaurant.id,
-                "name": restaurant.name,
-                "slug": restaurant.slug,
-                "address": restaurant.address,
-                "phone": restaurant.phone,
-                "logo": restaurant.logo,
-                "description": restaurant.description,
-                "average_rating": round(float(avg_rating), 1),
-                "review_count": review_count
-            })
-        
-        # Sort by rating
-        restaurant_data.sort(key=lambda x: x['average_rating'], reverse=True)
-        
-        # Pagination
-        total = len(restaurant_data)
-        start = (page - 1) * limit
-        end = start + limit
-        paginated_data = restaurant_data[start:end]
-        
-        return jsonify({
-            "data": {
-                "items": paginated_data,
-                "total": total,
-                "page": page,
-                "limit": limit
-            },
-            "message": "Lấy danh sách nhà hàng thành công!"
-        }), 200
-    finally:
-        session.close()
+        for restaurant in restaurants
+    ]
+    
+    # Sort by rating
+    restaurant_data.sort(key=lambda x: x['average_rating'], reverse=True)
+    
+    # Pagination
+    total = len(restaurant_data)
+    start = (page - 1) * limit
+    end = start + limit
+    paginated_data = restaurant_data[start:end]
+    
+    return jsonify({
+        "data": {
+            "items": paginated_data,
+            "total": total,
+            "page": page,
+            "limit": limit
+        },
+        "message": "Lấy danh sách nhà hàng thành công!"
+    }), 200
 
 
 @mobile_bp.route("/restaurants/recommended", methods=["GET"])
+@use_replica
 def get_recommended_restaurants():
     """Get recommended restaurants (top rated)"""
     limit = request.args.get('limit', 10, type=int)
     
-    session = get_session()
-    try:
-        # Get restaurants with highest ratings
-        restaurants = session.query(
-            TenantModel,
-            func.avg(ReviewModel.rating).label('avg_rating'),
-            func.count(ReviewModel.id).label('review_count')
-        ).join(
-            ReviewModel, TenantModel.id == ReviewModel.tenant_id, isouter=True
-        ).filter(
-            TenantModel.status == TenantStatus.ACTIVE
-        ).group_by(
-            TenantModel.id
-        ).order_by(
-            desc('avg_rating'),
-            desc('review_count')
-        ).limit(limit).all()
-        
-        restaurant_data = []
-        for restaurant, avg_rating, review_count in restaurants:
-            restaurant_data.append({
-                "id": restaurant.id,
-                "name": restaurant.name,
-                "slug": restaurant.slug,
-                "address": restaurant.address,
-                "phone": restaurant.phone,
-                "logo": restaurant.logo,
-                "description": restaurant.description,
-                "average_rating": round(float(avg_rating or 0), 1),
-                "review_count": review_count or 0
-            })
-        
-        return jsonify({
-            "data": restaurant_data,
-            "message": "Lấy danh sách nhà hàng đề xuất thành công!"
-        }), 200
-    finally:
-        session.close()
+    # Top `limit` of each shard, then the overall top `limit`
+    results = scatter(lambda session: top_rated_restaurants(session, limit), read_only=True)
+    restaurant_data = [restaurant for _, restaurants in results for restaurant in restaurants]
+    if len(results) > 1:
+        restaurant_data.sort(key=lambda r: (r['average_rating'], r['review_count']), reverse=True)
+    
+    return jsonify({
+        "data": restaurant_data[:limit],
+        "message": "Lấy danh sách nhà hàng đề xuất thành công!"
+    }), 200
 
 
 @mobile_bp.route("/restaurants/<int:restaurant_id>", methods=["GET"])
+@use_replica
 def get_restaurant_detail(restaurant_id):
     """Get restaurant detail for mobile app"""
     session = get_session()
@@ -170,7 +185,43 @@ def get_restaurant_detail(restaurant_id):
         session.close()
 
 
+@mobile_bp.route("/restaurants/<int:restaurant_id>/trending", methods=["GET"])
+@use_replica
+def get_trending_dishes(restaurant_id):
+    """Most ordered dishes of the restaurant in the recent window"""
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    top = trending.top(restaurant_id, limit)
+    if not top:
+        return jsonify({
+            "data": [],
+            "message": "Lấy danh sách món đang thịnh hành thành công!"
+        }), 200
+    
+    session = get_session()
+    try:
+        dishes = {dish.id: dish for dish in session.query(DishModel).filter(
+            DishModel.id.in_([dish_id for dish_id, _ in top]),
+            DishModel.tenant_id == restaurant_id,
+            DishModel.status == DishStatus.AVAILABLE
+        )}
+        
+        return jsonify({
+            "data": [{
+                "id": dish_id,
+                "name": dishes[dish_id].name,
+                "price": dishes[dish_id].price,
+                "image": dishes[dish_id].image,
+                "category": dishes[dish_id].category,
+                "recent_orders": count
+            } for dish_id, count in top if dish_id in dishes],
+            "message": "Lấy danh sách món đang thịnh hành thành công!"
+        }), 200
+    finally:
+        session.close()
+
+
 @mobile_bp.route("/restaurants/<int:restaurant_id>/directions", methods=["GET"])
+@use_replica
 def get_restaurant_directions(restaurant_id):
     """Get directions to restaurant (Google Maps URL)"""
     session = get_session()
@@ -1,15 +1,27 @@
 """
 Order routes
 """
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, jsonify, g, Response, stream_with_context
 from app.infrastructure.databases import get_session
 from app.models.order_model import OrderModel, OrderStatus
 from app.models.dish_model import DishModel, DishSnapshotModel
 from app.api.decorators import require_employee
+from app.services.customer_service import publish_table_paid
+from app.services.trending_service import record_order_trending
+from app.services.metrics_service import track_order_activity
+from app.services.order_history_service import record_order_lines, mark_lines_paid
+from app.services.export_service import EXPORT_FORMATS, export_orders
+from app.utils.serialization import compile_serializer, dumps, json_response
 from datetime import datetime
 
 order_bp = Blueprint("order", __name__)
 
+ORDER_FIELDS = (
+    "id", "tenant_id", "table_number", "guest_id", "dish_snapshot_id", "quantity",
+    "notes", "status", "order_handler_id", "created_at", "updated_at"
+)
+serialize_order = compile_serializer(*ORDER_FIELDS)
+
 
 @order_bp.route("", methods=["POST"])
 @require_employee
@@ -25,7 +37,9 @@ def create_orders():
     session = get_session()
     try:
         orders = []
+        order_lines = []
         table_number = data.get('table_number')
+        customer_id = data.get('customer_id')  # Member scanned by staff (optional)
         
         for order_data in data['orders']:
             # Get dish
@@ -57,6 +71,7 @@ def create_orders():
             order = OrderModel(
                 tenant_id=g.current_user.tenant_id,
                 table_number=order_data.get('table_number') or table_number,
+                customer_id=order_data.get('customer_id') or customer_id,
                 dish_snapshot_id=dish_snapshot.id,
                 quantity=order_data.get('quantity', 1),
                 notes=order_data.get('notes'),
@@ -64,8 +79,13 @@ def create_orders():
             )
             session.add(order)
             orders.append(order)
+            order_lines.append((order, dish_snapshot))
         
+        session.flush()
+        record_order_lines(session, order_lines)
         session.commit()
+        record_order_trending(g.current_user.tenant_id, order_lines)
+        track_order_activity(g.current_user.tenant_id, orders)
         
         # Refresh orders
         for order in orders:
@@ -76,6 +96,7 @@ def create_orders():
                 "id": o.id,
                 "tenant_id": o.tenant_id,
                 "table_number": o.table_number,
+                "customer_id": o.customer_id,
                 "dish_snapshot_id": o.dish_snapshot_id,
                 "quantity": o.quantity,
                 "notes": o.notes,
@@ -91,6 +112,25 @@ def create_orders():
         session.close()
 
 
+def order_filters():
+    """Filter criteria shared by the order list and export"""
+    table_number = request.args.get('table_number', type=int)
+    status = request.args.get('status')
+    from_date = request.args.get('from_date')
+    to_date = request.args.get('to_date')
+    
+    filters = []
+    if table_number:
+        filters.append(OrderModel.table_number == table_number)
+    if status:
+        filters.append(OrderModel.status == OrderStatus(status))
+    if from_date:
+        filters.append(OrderModel.created_at >= datetime.fromisoformat(from_date))
+    if to_date:
+        filters.append(OrderModel.created_at <= datetime.fromisoformat(to_date))
+    return filters
+
+
 @order_bp.route("", methods=["GET"])
 @require_employee
 def get_orders():
@@ -100,57 +140,61 @@ def get_orders():
     
     page = request.args.get('page', 1, type=int)
     limit = request.args.get('limit', 10, type=int)
-    table_number = request.args.get('table_number', type=int)
-    status = request.args.get('status')
-    from_date = request.args.get('from_date')
-    to_date = request.args.get('to_date')
     
     session = get_session()
     try:
-        query = session.query(OrderModel).filter(
-            OrderModel.tenant_id == g.current_user.tenant_id
+        # Plain column rows: no ORM identity map for a read-only page
+        query = session.query(*(getattr(OrderModel, field) for field in ORDER_FIELDS)).filter(
+            OrderModel.tenant_id == g.current_user.tenant_id,
+            *order_filters()
         )
         
-        if table_number:
-            query = query.filter(OrderModel.table_number == table_number)
-        
-        if status:
-            query = query.filter(OrderModel.status == OrderStatus(status))
-        
-        if from_date:
-            query = query.filter(OrderModel.created_at >= datetime.fromisoformat(from_date))
-        
-        if to_date:
-            query = query.filter(OrderModel.created_at <= datetime.fromisoformat(to_date))
-        
         total = query.count()
         orders = query.order_by(OrderModel.created_at.desc()).offset(
             (page - 1) * limit
         ).limit(limit).all()
         
-        return jsonify({
-            "data": {
-                "items": [{
-                    "id": o.id,
-                    "tenant_id": o.tenant_id,
-                    "table_number": o.table_number,
-                    "guest_id": o.guest_id,
-                    "dish_snapshot_id": o.dish_snapshot_id,
-                    "quantity": o.quantity,
-                    "notes": o.notes,
-                    "status": o.status.value,
-                    "order_handler_id": o.order_handler_id,
-                    "created_at": o.created_at.isoformat() if o.created_at else None,
-                    "updated_at": o.updated_at.isoformat() if o.updated_at else None
-                } for o in orders],
-                "total": total
-            },
-            "message": "Lấy danh sách đơn hàng thành công!"
-        }), 200
+        return json_response(
+            dumps({"items": [serialize_order(o) for o in orders], "total": total}),
+            "Lấy danh sách đơn hàng thành công!"
+        )
     finally:
         session.close()
 
 
+@order_bp.route("/export", methods=["GET"])
+@require_employee
+def export_order_list():
+    """Stream orders as CSV or NDJSON (optionally gzipped) with flat memory use"""
+    if not g.current_user.tenant_id:
+        return jsonify({"message": "User must belong to a tenant"}), 403
+    
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"message": "Invalid format (csv, ndjson)"}), 400
+    
+    try:
+        filters = order_filters()
+    except ValueError:
+        return jsonify({"message": "Invalid filter"}), 400
+    
+    compress = request.args.get('gzip', 'false').lower() in ('1', 'true')
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    filename = f"orders-{g.current_user.tenant_id}.{extension}"
+    if compress:
+        mimetype, filename = "application/gzip", filename + ".gz"
+    
+    chunks = export_orders(g.current_user.tenant_id, export_format, filters, compress)
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @order_bp.route("/<int:order_id>", methods=["GET"])
 @require_employee
 def get_order(order_id):
@@ -206,6 +250,7 @@ def update_order(order_id):
             return jsonify({"message": "Access denied"}), 403
         
         # Update fields
+        was_paid = order.status == OrderStatus.PAID
         if 'status' in data:
             order.status = OrderStatus(data['status'])
         if 'order_handler_id' in data:
@@ -213,9 +258,16 @@ def update_order(order_id):
         else:
             order.order_handler_id = g.current_user.id
         
+        # Paying a single order closes its own visit
+        newly_paid = order.status == OrderStatus.PAID and not was_paid
+        if newly_paid:
+            mark_lines_paid(session, [order.id])
         session.commit()
         session.refresh(order)
         
+        if newly_paid:
+            publish_table_paid(order.tenant_id, order.table_number, [order.id])
+        
         return jsonify({
             "data": {
                 "id": order.id,
@@ -250,7 +302,7 @@ def pay_orders():
         orders = session.query(OrderModel).filter(
             OrderModel.tenant_id == g.current_user.tenant_id,
             OrderModel.table_number == table_number,
-            OrderModel.status != OrderStatus.PAID
+            OrderModel.status.notin_([OrderStatus.PAID, OrderStatus.CANCELLED])
         ).all()
         
         if not orders:
@@ -260,23 +312,12 @@ def pay_orders():
         for order in orders:
             order.status = OrderStatus.PAID
             order.order_handler_id = g.current_user.id
-            
-            # Update customer history if order has customer_id
-            if order.guest_id:
-                # Check if guest is actually a customer
-                from app.models.guest_model import GuestModel
-                guest = session.query(GuestModel).filter(GuestModel.id == order.guest_id).first()
-                # If guest has customer_id, update history
-                # For now, we'll skip guest orders
-                pass
         
+        mark_lines_paid(session, [order.id for order in orders])
         session.commit()
         
-        # Update customer history for customer orders
-        for order in orders:
-            if hasattr(order, 'customer_id') and order.customer_id:
-                from app.services.customer_service import update_customer_history_from_order
-                update_customer_history_from_order(order.id, order.customer_id)
+        # History, spending and points are booked in the background
+        publish_table_paid(g.current_user.tenant_id, table_number, [order.id for order in orders])
         
         return jsonify({
             "data": [{
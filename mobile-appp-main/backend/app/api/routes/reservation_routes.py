@@ -0,0 +1,270 @@
+"""
+Reservation routes - Đặt bàn và xem bàn trống
+"""
+from flask import Blueprint, request, jsonify, g
+from datetime import date, timedelta
+from app.api.decorators import require_employee
+from app.infrastructure.databases import get_session
+from app.models.reservation_model import ReservationModel, ReservationStatus
+from app.models.tenant_model import TenantModel
+from app.services.reservation_service import (
+    ReservationError, availability, create_reservation, cancel_reservation as cancel_booking,
+    invalidate_reservation, reservation_index
+)
+from app.services.table_assignment_service import solve_day, seat_walk_in
+from app.utils.errors import EntityError
+from app.config import Config
+
+reservation_bp = Blueprint("reservation", __name__)
+
+
+def get_customer_id():
+    """Customer id from the Bearer token, or None"""
+    auth_header = request.headers.get('Authorization')
+    if not auth_header:
+        return None
+    try:
+        token = auth_header.split(' ')[1]
+        from app.utils.jwt import verify_access_token
+        payload = verify_access_token(token)
+    except IndexError:
+        return None
+    if not payload or payload.get('role') != 'Customer':
+        return None
+    return payload.get('customer_id')
+
+
+def reservation_to_dict(reservation):
+    return {
+        "id": reservation.id,
+        "restaurant_id": reservation.tenant_id,
+        "branch_id": reservation.branch_id,
+        "table_number": reservation.table_number,
+        "table_numbers": sorted(table.table_number for table in reservation.tables),
+        "date": reservation.date.date().isoformat() if reservation.date else None,
+        "time": reservation.time,
+        "start_at": reservation.start_at.isoformat() if reservation.start_at else None,
+        "end_at": reservation.end_at.isoformat() if reservation.end_at else None,
+        "guests": reservation.guests,
+        "status": reservation.status.value,
+        "notes": reservation.notes
+    }
+
+
+@reservation_bp.route("/restaurants/<int:restaurant_id>/availability", methods=["GET"])
+def get_availability(restaurant_id):
+    """Free slots per capacity class as compact bitmaps"""
+    try:
+        start_day = date.fromisoformat(request.args.get('from') or date.today().isoformat())
+        end_day = date.fromisoformat(request.args.get('to') or start_day.isoformat())
+    except ValueError:
+        return jsonify({"message": "Invalid date (YYYY-MM-DD)"}), 400
+
+    if end_day < start_day or (end_day - start_day) > timedelta(days=Config.RESERVATION_MAX_DAYS):
+        return jsonify({"message": "Invalid date range"}), 400
+
+    branch_id = request.args.get('branch_id', type=int)
+    duration = request.args.get('duration', type=int)
+
+    session = get_session()
+    try:
+        data = availability(session, restaurant_id, start_day, end_day, branch_id, duration)
+        return jsonify({
+            "data": data,
+            "message": "Lấy danh sách khung giờ trống thành công!"
+        }), 200
+    except ReservationError as e:
+        return jsonify({"message": e.message}), e.status_code
+    finally:
+        session.close()
+
+
+@reservation_bp.route("/restaurants/<int:restaurant_id>/reservations", methods=["POST"])
+def create_restaurant_reservation(restaurant_id):
+    """Create a reservation"""
+    customer_id = get_customer_id()
+    if not customer_id:
+        return jsonify({"message": "Authorization required"}), 401
+
+    data = request.get_json()
+    if not data or not data.get('date') or not data.get('time'):
+        return jsonify({"message": "Invalid request"}), 400
+
+    try:
+        day = date.fromisoformat(data['date'][:10])
+        guests = int(data.get('guests', 0))
+        table_number = data.get('table_number')
+        if table_number is not None:
+            table_number = int(table_number)
+    except (TypeError, ValueError):
+        return jsonify({"message": "Invalid date, guests or table number"}), 400
+
+    session = get_session()
+    try:
+        restaurant = session.query(TenantModel.id).filter(TenantModel.id == restaurant_id).first()
+        if not restaurant:
+            return jsonify({"message": "Restaurant not found"}), 404
+
+        reservation = create_reservation(
+            session,
+            tenant_id=restaurant_id,
+            day=day,
+            time_str=data['time'],
+            guests=guests,
+            customer_id=customer_id,
+            branch_id=data.get('branch_id'),
+            table_number=table_number,
+            duration_minutes=data.get('duration_minutes'),
+            notes=data.get('notes')
+        )
+        session.commit()
+        session.refresh(reservation)
+        invalidate_reservation(reservation)
+
+        return jsonify({
+            "data": reservation_to_dict(reservation),
+            "message": "Đặt bàn thành công!"
+        }), 201
+    except ReservationError as e:
+        session.rollback()
+        return jsonify({"message": e.message}), e.status_code
+    except Exception as e:
+        session.rollback()
+        return jsonify({"message": str(e)}), 500
+    finally:
+        session.close()
+
+
+@reservation_bp.route("/reservations/me", methods=["GET"])
+def get_my_reservations():
+    """Get current customer's reservations"""
+    customer_id = get_customer_id()
+    if not customer_id:
+        return jsonify({"message": "Authorization required"}), 401
+
+    session = get_session()
+    try:
+        reservations = session.query(ReservationModel).filter(
+            ReservationModel.customer_id == customer_id
+        ).order_by(ReservationModel.date.desc(), ReservationModel.id.desc()).limit(50).all()
+
+        return jsonify({
+            "data": [reservation_to_dict(r) for r in reservations],
+            "message": "Lấy danh sách đặt bàn thành công!"
+        }), 200
+    finally:
+        session.close()
+
+
+@reservation_bp.route("/reservations/<int:reservation_id>/cancel", methods=["PUT"])
+def cancel_reservation(reservation_id):
+    """Cancel a reservation"""
+    customer_id = get_customer_id()
+    if not customer_id:
+        return jsonify({"message": "Authorization required"}), 401
+
+    session = get_session()
+    try:
+        reservation = session.query(ReservationModel).filter(
+            ReservationModel.id == reservation_id,
+            ReservationModel.customer_id == customer_id
+        ).first()
+
+        if not reservation:
+            return jsonify({"message": "Reservation not found"}), 404
+        if reservation.status in (ReservationStatus.COMPLETED, ReservationStatus.CANCELLED):
+            raise EntityError("Không thể hủy đặt bàn đã hoàn thành hoặc đã hủy")
+
+        cancel_booking(session, reservation)
+        session.commit()
+        invalidate_reservation(reservation)
+
+        return jsonify({
+            "data": reservation_to_dict(reservation),
+            "message": "Hủy đặt bàn thành công!"
+        }), 200
+    except EntityError as e:
+        session.rollback()
+        return jsonify({"message": e.description}), e.code
+    except Exception as e:
+        session.rollback()
+        return jsonify({"message": str(e)}), 500
+    finally:
+        session.close()
+
+
+@reservation_bp.route("/reservations/assign", methods=["POST"])
+@require_employee
+def assign_tables():
+    """Re-seat the pending reservations of a day (employee)"""
+    if not g.current_user.tenant_id:
+        return jsonify({"message": "User must belong to a tenant"}), 403
+
+    data = request.get_json() or {}
+    try:
+        day = date.fromisoformat((data.get('date') or date.today().isoformat())[:10])
+    except (TypeError, ValueError):
+        return jsonify({"message": "Invalid date (YYYY-MM-DD)"}), 400
+
+    session = get_session()
+    try:
+        moved, unplaced = solve_day(session, g.current_user.tenant_id, day, data.get('branch_id'))
+        session.commit()
+        reservation_index.invalidate(g.current_user.tenant_id)
+
+        return jsonify({
+            "data": {
+                "moved": moved,
+                "unplaced": unplaced
+            },
+            "message": "Xếp bàn thành công!"
+        }), 200
+    except Exception as e:
+        session.rollback()
+        return jsonify({"message": str(e)}), 500
+    finally:
+        session.close()
+
+
+@reservation_bp.route("/reservations/walk-in", methods=["POST"])
+@require_employee
+def create_walk_in():
+    """Seat a walk-in party on the best free tables (employee)"""
+    if not g.current_user.tenant_id:
+        return jsonify({"message": "User must belong to a tenant"}), 403
+
+    data = request.get_json()
+    if not data:
+        return jsonify({"message": "Invalid request"}), 400
+
+    try:
+        guests = int(data.get('guests', 0))
+    except (TypeError, ValueError):
+        return jsonify({"message": "Invalid guests"}), 400
+
+    session = get_session()
+    try:
+        reservation = seat_walk_in(
+            session,
+            tenant_id=g.current_user.tenant_id,
+            guests=guests,
+            branch_id=data.get('branch_id'),
+            duration_minutes=data.get('duration_minutes'),
+            notes=data.get('notes')
+        )
+        session.commit()
+        session.refresh(reservation)
+        invalidate_reservation(reservation)
+
+        return jsonify({
+            "data": reservation_to_dict(reservation),
+            "message": "Xếp bàn cho khách thành công!"
+        }), 201
+    except ReservationError as e:
+        session.rollback()
+        return jsonify({"message": e.message}), e.status_code
+    except Exception as e:
+        session.rollback()
+        return jsonify({"message": str(e)}), 500
+    finally:
+        session.close()
@@ -2,46 +2,94 @@
 Review routes - Restaurant reviews
 """
 from flask import Blueprint, request, jsonify
-from app.infrastructure.databases import get_session
+from app.infrastructure.databases import get_session, use_replica
 from app.models.review_model import ReviewModel
 from app.models.tenant_model import TenantModel
 from app.models.customer_model import CustomerModel
+from app.models.rating_stats_model import TenantRatingStatsModel
+from app.services.rating_service import review_state, apply_review_change, touches_dish_ratings
+from app.infrastructure.cache import invalidate_tags, tenant_tag
 from app.api.decorators import require_auth
+from app.utils.helpers import encode_cursor, decode_cursor
+from sqlalchemy import select, or_, and_
 from datetime import datetime
 
 review_bp = Blueprint("review", __name__)
 
 
 @review_bp.route("/restaurants/<int:restaurant_id>/reviews", methods=["GET"])
+@use_replica
 def get_restaurant_reviews(restaurant_id):
-    """Get reviews for a restaurant"""
+    """Get reviews for a restaurant (cursor pagination, newest first)"""
     page = request.args.get('page', 1, type=int)
     limit = request.args.get('limit', 10, type=int)
+    cursor = request.args.get('cursor')
     
     session = get_session()
     try:
-        reviews = session.query(ReviewModel).filter(
+        total_subquery = select(TenantRatingStatsModel.review_count).where(
+            TenantRatingStatsModel.tenant_id == restaurant_id
+        ).scalar_subquery()
+        
+        # Customer name and total come back in the same round-trip
+        query = session.query(
+            ReviewModel.id,
+            ReviewModel.customer_id,
+            CustomerModel.name.label('customer_name'),
+            ReviewModel.rating,
+            ReviewModel.comment,
+            ReviewModel.dish_ratings,
+            ReviewModel.created_at,
+            total_subquery.label('total')
+        ).outerjoin(
+            CustomerModel, CustomerModel.id == ReviewModel.customer_id
+        ).filter(
             ReviewModel.tenant_id == restaurant_id
-        ).order_by(ReviewModel.created_at.desc()).offset(
-            (page - 1) * limit
-        ).limit(limit).all()
+        )
+        
+        if cursor:
+            values = decode_cursor(cursor)
+            if not values or len(values) != 2:
+                return jsonify({"message": "Invalid cursor"}), 400
+            try:
+                cursor_created_at, cursor_id = datetime.fromisoformat(values[0]), int(values[1])
+            except (TypeError, ValueError):
+                return jsonify({"message": "Invalid cursor"}), 400
+            query = query.filter(or_(
+                ReviewModel.created_at < cursor_created_at,
+                and_(ReviewModel.created_at == cursor_created_at, ReviewModel.id < cursor_id)
+            ))
+        elif page > 1:
+            query = query.offset((page - 1) * limit)
+        
+        rows = query.order_by(
+            ReviewModel.created_at.desc(), ReviewModel.id.desc()
+        ).limit(limit + 1).all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        if rows:
+            total = rows[0].total or 0
+        else:
+            total = session.query(TenantRatingStatsModel.review_count).filter(
+                TenantRatingStatsModel.tenant_id == restaurant_id
+            ).scalar() or 0
         
         return jsonify({
             "data": {
                 "items": [{
                     "id": r.id,
                     "customer_id": r.customer_id,
-                    "customer_name": session.query(CustomerModel.name).filter(
-                        CustomerModel.id == r.customer_id
-                    ).scalar() if r.customer_id else "Anonymous",
+                    "customer_name": r.customer_name if r.customer_id else "Anonymous",
                     "rating": r.rating,
                     "comment": r.comment,
                     "dish_ratings": r.dish_ratings,
                     "created_at": r.created_at.isoformat() if r.created_at else None
-                } for r in reviews],
-                "total": session.query(ReviewModel).filter(
-                    ReviewModel.tenant_id == restaurant_id
-                ).count()
+                } for r in rows],
+                "total": total,
+                "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+                "has_more": has_more
             },
             "message": "Lấy danh sách đánh giá thành công!"
         }), 200
@@ -101,7 +149,11 @@ def create_review(restaurant_id):
             dish_ratings=data.get('dish_ratings')
         )
         session.add(review)
+        new_state = review_state(review)
+        apply_review_change(session, None, new_state)
         session.commit()
+        if touches_dish_ratings(None, new_state):
+            invalidate_tags(tenant_tag(restaurant_id, "menu"))
         session.refresh(review)
         
         return jsonify({
@@ -153,6 +205,8 @@ def update_review(review_id):
         if not review:
             return jsonify({"message": "Review not found"}), 404
         
+        old_state = review_state(review)
+        
         # Update fields
         if 'rating' in data:
             review.rating = data['rating']
@@ -161,7 +215,11 @@ def update_review(review_id):
         if 'dish_ratings' in data:
             review.dish_ratings = data['dish_ratings']
         
+        new_state = review_state(review)
+        apply_review_change(session, old_state, new_state)
         session.commit()
+        if touches_dish_ratings(old_state, new_state):
+            invalidate_tags(tenant_tag(new_state["tenant_id"], "menu"))
         session.refresh(review)
         
         return jsonify({
@@ -209,8 +267,12 @@ def delete_review(review_id):
         if not review:
             return jsonify({"message": "Review not found"}), 404
         
+        old_state = review_state(review)
+        apply_review_change(session, old_state, None)
         session.delete(review)
         session.commit()
+        if touches_dish_ratings(old_state, None):
+            invalidate_tags(tenant_tag(old_state["tenant_id"], "menu"))
         
         return jsonify({"message": "Xóa đánh giá thành công!"}), 200
     except Exception as e:
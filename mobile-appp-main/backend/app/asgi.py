@@ -0,0 +1,58 @@
+"""
+ASGI entry point - Menu, gọi món và quét QR chạy native asyncio; mọi route khác chuyển cho Flask (WSGI) qua thread pool
+
+    uvicorn app.asgi:app --host 0.0.0.0 --port 4000 --workers 4
+"""
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.routing import Mount, Route, request_response
+
+from app.api.routes import async_routes
+from app.config import Config
+from app.create_app import CORS_OPTIONS, create_app
+from app.infrastructure import databases
+from app.infrastructure.databases.async_sessions import dispose_async_db, init_async_db
+
+flask_app = create_app()
+
+
+def native(handler):
+    """Async handler answering CORS like Flask-CORS does for the WSGI routes, gzipped like them"""
+    endpoint = CORSMiddleware(
+        request_response(handler),
+        allow_origins=[CORS_OPTIONS["origins"]],
+        allow_methods=CORS_OPTIONS["methods"],
+        allow_headers=CORS_OPTIONS["allow_headers"],
+        expose_headers=CORS_OPTIONS["expose_headers"],
+        allow_credentials=CORS_OPTIONS["supports_credentials"],
+        max_age=CORS_OPTIONS["max_age"]
+    )
+    if not Config.COMPRESSION_ENABLED:
+        return endpoint
+    # Flask responses are compressed by app.api.middleware; the native ones here
+    return GZipMiddleware(endpoint, minimum_size=Config.COMPRESSION_MIN_SIZE, compresslevel=Config.GZIP_LEVEL)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    init_async_db(databases.shards)
+    yield
+    await dispose_async_db()
+
+
+# A method that does not match (e.g. OPTIONS preflight) falls through to Flask
+routes = [
+    Route("/api/v1/dishes", native(async_routes.get_dishes), methods=["GET"]),
+    Route("/api/v1/guest/orders", native(async_routes.get_guest_orders), methods=["GET"]),
+    Route("/api/v1/guest/orders", native(async_routes.create_guest_orders), methods=["POST"]),
+    Route("/api/v1/qr/scan", native(async_routes.scan_qr_code), methods=["POST"]),
+] if Config.ASGI_NATIVE_ROUTES else []
+
+app = Starlette(
+    routes=routes + [Mount("/", WSGIMiddleware(flask_app, workers=Config.ASGI_WSGI_THREADS))],
+    lifespan=lifespan
+)
@@ -0,0 +1,102 @@
+"""
+Flask CLI commands (flask <command>)
+"""
+import click
+from flask.cli import FlaskGroup
+
+
+def loaded_by_cli_command():
+    """True while `flask <command>` loads the app for a command other than `flask run`"""
+    ctx = click.get_current_context(silent=True)
+    return ctx is not None and isinstance(ctx.find_root().command, FlaskGroup) and ctx.info_name != "run"
+
+
+def register_commands(app):
+    """Register maintenance commands"""
+
+    @app.cli.command("purge-refresh-tokens")
+    @click.option("--batch-size", default=None, type=int, help="Rows deleted per chunk")
+    def purge_refresh_tokens_command(batch_size):
+        """Delete expired refresh tokens in chunks"""
+        from app.services.refresh_token_service import get_refresh_token_store
+
+        deleted = get_refresh_token_store().purge_expired(batch_size)
+        click.echo(f"Deleted {deleted} expired refresh tokens")
+
+    @app.cli.command("backfill-rating-stats")
+    def backfill_rating_stats_command():
+        """Rebuild rating aggregates from existing reviews"""
+        from app.services.rating_service import backfill_tenant_rating_stats, backfill_dish_rating_stats
+
+        tenants = backfill_tenant_rating_stats()
+        dishes = backfill_dish_rating_stats()
+        click.echo(f"Rebuilt rating stats for {tenants} restaurants and {dishes} dishes")
+
+    @app.cli.command("recompute-membership-tiers")
+    def recompute_membership_tiers_command():
+        """Recompute all customers' tiers from total spending"""
+        from app.infrastructure.databases import get_session
+        from app.services.loyalty_service import recompute_all_tiers
+
+        session = get_session()
+        try:
+            updated = recompute_all_tiers(session)
+            session.commit()
+            click.echo(f"Recomputed membership tier for {updated} customers")
+        finally:
+            session.close()
+
+    @app.cli.command("refresh-sales-rollups")
+    @click.option("--full", is_flag=True, help="Rebuild every day instead of only changed ones")
+    def refresh_sales_rollups_command(full):
+        """Refresh hourly/daily sales and dish-sales rollups"""
+        from app.services.analytics_service import refresh_sales_rollups
+
+        rebuilt = refresh_sales_rollups(full=full)
+        click.echo(f"Rebuilt sales rollups for {rebuilt} restaurant-days")
+
+    @app.cli.command("dump-analytics-snapshots")
+    @click.option("--months", default=None, type=int, help="Recent months to (re)write")
+    @click.option("--tenant-id", default=None, type=int, help="Only this restaurant")
+    def dump_analytics_snapshots_command(months, tenant_id):
+        """Write columnar (.npy) snapshots of paid order lines per restaurant/month"""
+        from app.services.snapshot_service import dump_recent_snapshots
+
+        written = dump_recent_snapshots(months=months, tenant_id=tenant_id)
+        click.echo(f"Wrote {written} snapshot segments")
+
+    @app.cli.command("migrate-tenant")
+    @click.option("--tenant-id", required=True, type=int, help="Restaurant to move")
+    @click.option("--to", "target", required=True, help="Target shard name (see DATABASE_SHARDS)")
+    @click.option("--keep-source", is_flag=True, help="Leave the rows on the old shard")
+    @click.option("--force", is_flag=True, help="Move even if the restaurant is still active")
+    def migrate_tenant_command(tenant_id, target, keep_source, force):
+        """Copy one restaurant's rows to another shard and switch its routing"""
+        from app.infrastructure.databases.shards import ShardError
+        from app.services.shard_migration_service import migrate_tenant
+
+        try:
+            counts = migrate_tenant(tenant_id, target, keep_source=keep_source, force=force)
+        except ShardError as e:
+            raise click.ClickException(str(e))
+        for table, rows in counts.items():
+            click.echo(f"{table}: {rows}")
+        click.echo(f"Restaurant {tenant_id} now lives on shard {target}")
+
+    @app.cli.command("db-setup")
+    @click.option("--no-seed", is_flag=True, help="Skip the default admin account")
+    def db_setup_command(no_seed):
+        """Migrate the default database and every shard to the latest schema, then seed"""
+        from app.infrastructure import databases
+        from app.infrastructure.databases.migrations import MigrationError, upgrade_database
+        from app.utils.init_data import init_admin_account
+
+        for name, shard_engine in databases.shards.engines.items():
+            try:
+                result = upgrade_database(shard_engine)
+            except MigrationError as e:
+                raise click.ClickException(str(e))
+            click.echo(f"{name}: {result} to head")
+        databases.reserve_shard_ids()
+        if not no_seed:
+            init_admin_account()
@@ -6,10 +6,30 @@ from flask_cors import CORS
 from app.config import Config
 from app.api.routes import register_routes
 from app.api.middleware import setup_middleware
-from app.infrastructure.databases import init_db
+from app.infrastructure.databases import init_db, init_request_sessions
 from app.error_handler import setup_error_handler
 from app.utils.helpers import create_folder
 from app.utils.init_data import init_admin_account
+from app.infrastructure.scheduler import init_scheduler
+from app.services.customer_service import init_customer_history_pipeline
+from app.cli import loaded_by_cli_command, register_commands
+from app.utils.serialization import OrjsonProvider
+
+# Shared with the native async routes in app.asgi
+CORS_OPTIONS = {
+    "origins": "*",
+    "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
+    "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "X-Tenant-ID"],
+    "expose_headers": ["Content-Type", "Authorization"],
+    "supports_credentials": True,
+    "max_age": 3600
+}
+
+# Content types that get an explicit charset in after_request
+CHARSET_CONTENT_TYPES = {
+    "application/json": "application/json; charset=utf-8",
+    "text/html": "text/html; charset=utf-8"
+}
 
 def create_app():
     app = Flask(__name__, static_folder=None, static_url_path=None)
@@ -21,17 +41,13 @@ def create_app():
     # Ensure UTF-8 encoding for responses
     app.config['JSON_AS_ASCII'] = False
     
+    # orjson for jsonify, dict responses and request.get_json
+    app.json = OrjsonProvider(app)
+    
     # CORS
     CORS(app, 
          resources={
-             r"/*": {
-                 "origins": "*",
-                 "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-                 "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "X-Tenant-ID"],
-                 "expose_headers": ["Content-Type", "Authorization"],
-                 "supports_credentials": True,
-                 "max_age": 3600
-             }
+             r"/*": CORS_OPTIONS
          })
     
     # Disable strict slashes
@@ -39,13 +55,10 @@ def create_app():
     
     @app.after_request
     def after_request(response):
-        # Set charset to UTF-8 for all responses
-        content_type = response.headers.get('Content-Type', 'application/json')
-        if 'charset' not in content_type.lower():
-            if 'application/json' in content_type:
-                response.headers['Content-Type'] = 'application/json; charset=utf-8'
-            elif 'text/html' in content_type:
-                response.headers['Content-Type'] = 'text/html; charset=utf-8'
+        # Set charset to UTF-8 for all responses (JSON responses already carry it)
+        content_type = CHARSET_CONTENT_TYPES.get(response.headers.get('Content-Type', 'application/json'))
+        if content_type:
+            response.headers['Content-Type'] = content_type
         return response
     
     # Setup middleware
@@ -54,8 +67,13 @@ def create_app():
     # Setup error handler
     setup_error_handler(app)
     
+    # Commands such as `flask db-setup` manage the schema themselves: no create_all, seed or jobs
+    if loaded_by_cli_command():
+        app.config.update(DB_CREATE_ALL_ON_BOOT=False, SEED_ON_BOOT=False, SCHEDULER_ENABLED=False)
+    
     # Initialize database
     init_db(app)
+    init_request_sessions(app)
     
     # Create upload folder
     upload_folder = app.config.get('UPLOAD_FOLDER', 'uploads')
@@ -75,9 +93,17 @@ def create_app():
     # Register routes
     register_routes(app)
     
+    # Register CLI commands
+    register_commands(app)
+    
     # Initialize admin account
-    with app.app_context():
-        init_admin_account()
+    if app.config['SEED_ON_BOOT']:
+        with app.app_context():
+            init_admin_account()
+    
+    # Start background jobs
+    init_customer_history_pipeline(app)
+    init_scheduler(app)
     
     return app
 
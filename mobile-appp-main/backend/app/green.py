@@ -0,0 +1,37 @@
+"""
+Green entry point - Một worker eventlet/gevent giữ hàng nghìn kết nối (Socket.IO, long-poll) cùng request HTTP
+
+    python -m app.green
+    gunicorn -k eventlet -w 1 --worker-connections 5000 app.green:app
+
+The patch must happen before anything else is imported, so this module is
+the only place that does it.
+"""
+from app.config import Config
+from app.infrastructure import green
+
+green.patch(Config.GREEN_WORKER)
+
+from app.create_app import create_app  # noqa: E402
+
+app = create_app()
+
+if Config.GREEN_BLOCK_THRESHOLD_MS:
+    hub_watchdog = green.HubWatchdog(Config.GREEN_BLOCK_THRESHOLD_MS).start()
+
+
+if __name__ == "__main__":
+    if green.worker == "eventlet":
+        import eventlet
+        import eventlet.wsgi
+
+        eventlet.wsgi.server(
+            eventlet.listen(("0.0.0.0", Config.PORT), backlog=2048),
+            app,
+            max_size=Config.GREEN_MAX_CONNECTIONS
+        )
+    else:
+        from gevent.pool import Pool
+        from gevent.pywsgi import WSGIServer
+
+        WSGIServer(("0.0.0.0", Config.PORT), app, spawn=Pool(Config.GREEN_MAX_CONNECTIONS)).serve_forever()
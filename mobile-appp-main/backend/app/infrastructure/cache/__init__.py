@@ -0,0 +1,358 @@
+"""
+Cache setup - Cache hai tầng: LRU trong từng worker trước Redis, vô hiệu hóa theo tag
+
+Mỗi giá trị trên Redis lưu kèm phiên bản của các tag (vd. tenant:5:menu) lúc
+tạo; đổi tag chỉ là INCR phiên bản, giá trị cũ tự hết hiệu lực ở lần đọc sau.
+Giá trị được đọc cùng phiên bản tag trong một MGET. Chống dồn tải khi hết hạn
+bằng làm mới sớm xác suất (XFetch) và khóa ngắn khi trượt cache. Mỗi lần vô
+hiệu hóa được phát qua bus để các worker khác xóa near-cache ngay.
+"""
+import functools
+import inspect
+import json
+import logging
+import math
+import random
+import threading
+import time
+
+from app.config import Config
+from app.infrastructure.cache.backends import MemoryBackend, RedisBackend
+from app.infrastructure.cache.bus import LocalBus, RedisBus
+from app.infrastructure.cache.lru import LocalLRU
+
+logger = logging.getLogger(__name__)
+
+STAT_NAMES = ("local_hits", "remote_hits", "misses", "early_refreshes", "lock_waits", "errors", "bus_messages")
+
+
+def tenant_key(tenant_id, *parts):
+    """Cache key scoped to a tenant (or global when tenant_id is None)"""
+    scope = f"t{tenant_id}" if tenant_id is not None else "global"
+    return ":".join([scope, *(str(part) for part in parts)])
+
+
+def tenant_tag(tenant_id, name):
+    """Invalidation tag of one kind of tenant data, e.g. tenant:5:menu"""
+    return f"tenant:{tenant_id}:{name}"
+
+
+class Cache:
+    """Near-cache LRU in front of an optional shared backend"""
+
+    def __init__(self, backend=None, local_maxsize=1024, local_ttl=5, default_ttl=300,
+                 prefix="cache", beta=1.0, lock_timeout=5, retry_after=30, enabled=True, bus=None):
+        self.backend = backend
+        self.local = LocalLRU(local_maxsize)
+        self.local_ttl = local_ttl
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+        self.beta = beta
+        self.lock_timeout = lock_timeout
+        self.retry_after = retry_after
+        self.enabled = enabled
+        self._down_until = 0.0
+        self._stats = dict.fromkeys(STAT_NAMES, 0)
+        self._stats_lock = threading.Lock()
+        self._invalidations = 0  # bus messages applied so far
+        self.bus = bus
+        if bus is not None:
+            bus.subscribe(self._apply_invalidation)
+
+    # -- helpers -----------------------------------------------------------
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def _tag_key(self, tag):
+        return f"{self.prefix}:tag:{tag}"
+
+    def _backend_ok(self):
+        return self.backend is not None and time.monotonic() >= self._down_until
+
+    def _backend_failed(self, action):
+        # Skip the backend for a while instead of paying a timeout on every call
+        self._count("errors")
+        self._down_until = time.monotonic() + self.retry_after
+        logger.warning("Cache backend %s failed; serving without it for %ss", action, self.retry_after, exc_info=True)
+
+    def _fresh(self, entry, tags, versions):
+        """Entry is valid for the current tag versions and not due for early refresh"""
+        stored = entry.get("t", {})
+        for tag, version in zip(tags, versions):
+            if version is None or stored.get(tag) != int(version):
+                return False, False
+        # XFetch: refresh before expiry with probability growing as expiry nears
+        early = time.time() - entry["d"] * self.beta * math.log(1.0 - random.random()) >= entry["e"]
+        return True, early
+
+    # -- API ---------------------------------------------------------------
+
+    def get_or_set(self, key, producer, ttl=None, tags=(), local_ttl=None):
+        """Cached value of key, computing it with producer() on a miss.
+
+        Returned values may be shared between callers; treat them as read-only.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if not self.enabled or ttl <= 0:
+            return producer()
+
+        local_ttl = min(ttl, self.local_ttl if local_ttl is None else local_ttl)
+        full_key = self._key(key)
+        tags = tuple(tags)
+
+        entry = self.local.get(full_key)
+        if entry is not None:
+            self._count("local_hits")
+            return entry[1]
+
+        versions = None
+        locked = False
+        if self._backend_ok():
+            tag_keys = [self._tag_key(tag) for tag in tags]
+            try:
+                raw, *versions = self.backend.get_many([full_key, *tag_keys])
+                if raw is not None:
+                    stored = json.loads(raw)
+                    valid, early = self._fresh(stored, tags, versions)
+                    if valid and not early:
+                        self._count("remote_hits")
+                        self.local.set(full_key, stored["v"], local_ttl, tags)
+                        return stored["v"]
+                    if valid:
+                        # This caller refreshes; everyone else keeps getting the stored value
+                        self._count("early_refreshes")
+                if raw is None or not valid:
+                    self._count("misses")
+                    locked = self.backend.add(f"{full_key}:lock", "1", self.lock_timeout)
+                    if not locked:
+                        value = self._wait_for(full_key, tags, local_ttl)
+                        if value is not None:
+                            return value
+                if any(version is None for version in versions):
+                    versions = self._init_versions(tag_keys)
+            except Exception:
+                self._backend_failed("read")
+                versions = None
+        else:
+            self._count("misses")
+
+        invalidations = self._invalidations
+        started = time.monotonic()
+        try:
+            value = producer()
+        finally:
+            if locked:
+                self._release(f"{full_key}:lock")
+        delta = time.monotonic() - started
+
+        if versions is not None and self._backend_ok():
+            self._store(full_key, value, ttl, tags, versions, delta)
+        # An invalidation during producer() may cover what it read; the shared
+        # tier rejects the entry by tag version, the near-cache must not keep it.
+        # Checked after set(): a message applied later evicts the entry itself.
+        self.local.set(full_key, value, local_ttl, tags)
+        if self._invalidations != invalidations:
+            self.local.delete(full_key)
+        return value
+
+    def _wait_for(self, full_key, tags, local_ttl):
+        """Another worker is computing the value; poll briefly for it"""
+        self._count("lock_waits")
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            raw, *versions = self.backend.get_many([full_key, *tag_keys])
+            if raw is not None:
+                stored = json.loads(raw)
+                if self._fresh(stored, tags, versions)[0]:
+                    self.local.set(full_key, stored["v"], local_ttl, tags)
+                    return stored["v"]
+        return None
+
+    def _init_versions(self, tag_keys):
+        # Never-seen tags start at a time-based version so an evicted tag key
+        # cannot bring back entries written under an older version
+        self.backend.add_many({tag_key: time.time_ns() // 1000 for tag_key in tag_keys})
+        return self.backend.get_many(tag_keys) if tag_keys else []
+
+    def _store(self, full_key, value, ttl, tags, versions, delta):
+        try:
+            payload = json.dumps({
+                "v": value,
+                "t": {tag: int(version) for tag, version in zip(tags, versions)},
+                "d": delta,
+                "e": time.time() + ttl
+            }, separators=(",", ":"))
+        except (TypeError, ValueError):
+            logger.warning("Cache value of %s is not JSON serializable; not stored", full_key)
+            return
+        try:
+            self.backend.set(full_key, payload, ttl)
+        except Exception:
+            self._backend_failed("write")
+
+    def _release(self, lock_key):
+        try:
+            self.backend.delete(lock_key)
+        except Exception:
+            pass
+
+    def _apply_invalidation(self, message):
+        """Evict near-cache entries named by a bus message (ours or another worker's)"""
+        self._count("bus_messages")
+        with self._stats_lock:
+            self._invalidations += 1
+        if message.get("reset"):
+            self.local.clear()
+            return
+        if message.get("tags"):
+            self.local.evict_tags(message["tags"])
+        if message.get("keys"):
+            self.local.delete(*message["keys"])
+
+    def _broadcast(self, message):
+        if self.bus is None:
+            self._apply_invalidation(message)
+        else:
+            self.bus.publish(message)
+
+    def delete(self, *keys):
+        full_keys = [self._key(key) for key in keys]
+        if self._backend_ok():
+            try:
+                self.backend.delete(*full_keys)
+            except Exception:
+                self._backend_failed("delete")
+        self._broadcast({"keys": full_keys})
+
+    def invalidate_tags(self, *tags):
+        """Bump tag versions; every entry stored under them becomes stale"""
+        if not tags:
+            return
+        # Shared tier first, so workers evicting on the message re-read new versions
+        if self._backend_ok():
+            try:
+                self.backend.incr_many([self._tag_key(tag) for tag in tags])
+            except Exception:
+                self._backend_failed("invalidate")
+        self._broadcast({"tags": list(tags)})
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["local_hits"] + stats["remote_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["local_hits"] + stats["remote_hits"]) / lookups, 4) if lookups else 0.0
+        stats["local_entries"] = len(self.local)
+        stats["backend_up"] = self._backend_ok()
+        return stats
+
+    def clear_local(self):
+        self.local.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def build_cache():
+    """Cache configured from Config.CACHE_BACKEND: redis | memory | none"""
+    kind = Config.CACHE_BACKEND
+    backend = None
+    if kind == "redis":
+        from app.infrastructure.redis import get_redis_client
+        backend = RedisBackend(get_redis_client())
+    elif kind == "memory":
+        backend = MemoryBackend()
+
+    # A Redis bus only makes sense next to the Redis backend
+    if Config.CACHE_BROADCAST:
+        from app.infrastructure.redis import get_redis_client
+        bus = RedisBus(get_redis_client(), Config.CACHE_BUS_CHANNEL)
+    else:
+        bus = LocalBus()
+    bus.start()
+
+    return Cache(
+        backend=backend,
+        local_maxsize=Config.CACHE_LOCAL_MAXSIZE,
+        local_ttl=Config.CACHE_LOCAL_TTL,
+        default_ttl=Config.CACHE_DEFAULT_TTL,
+        prefix=Config.CACHE_KEY_PREFIX,
+        beta=Config.CACHE_XFETCH_BETA,
+        lock_timeout=Config.CACHE_LOCK_TIMEOUT,
+        enabled=kind != "none",
+        bus=bus
+    )
+
+
+def get_cache():
+    """Get shared cache (created on first use)"""
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = build_cache()
+    return _cache
+
+
+def set_cache(cache):
+    """Swap the shared cache (e.g. Cache(MemoryBackend()) in tests)"""
+    global _cache
+    _cache = cache
+
+
+def invalidate_tags(*tags):
+    get_cache().invalidate_tags(*tags)
+
+
+def invalidate_keys(*keys):
+    get_cache().delete(*keys)
+
+
+def cache_stats():
+    return get_cache().stats()
+
+
+def cached(name, ttl=None, tags=(), tenant_arg="tenant_id", skip=("session",), local_ttl=None):
+    """Cache a function's JSON-serializable result.
+
+    The key is built from `name` and the call's arguments (minus `skip`),
+    scoped by the `tenant_arg` argument. Tags are format strings filled from
+    the arguments, e.g. tags=("tenant:{tenant_id}:menu",).
+
+    `wrapper.get_or_set(producer, *args, **kwargs)` looks up the same entry
+    but fills a miss with `producer()` instead of calling the function
+    (e.g. when the query has to run elsewhere, like on an event loop).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def get_or_set(producer, *args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            parts = [f"{arg}={arguments[arg]!r}" for arg in sorted(arguments) if arg != tenant_arg and arg not in skip]
+            key = tenant_key(arguments.get(tenant_arg), name, *parts)
+            return get_cache().get_or_set(
+                key,
+                producer,
+                ttl=ttl,
+                tags=[tag.format(**arguments) for tag in tags],
+                local_ttl=local_ttl
+            )
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_set(lambda: func(*args, **kwargs), *args, **kwargs)
+
+        wrapper.get_or_set = get_or_set
+        return wrapper
+
+    return decorator
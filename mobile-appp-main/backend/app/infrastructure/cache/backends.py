@@ -0,0 +1,96 @@
+"""
+Cache backends - Redis dùng chung giữa các worker và bản giả trong bộ nhớ (test, chạy một tiến trình)
+"""
+import threading
+import time
+
+
+class RedisBackend:
+    """Shared tier; values are bytes, versions are Redis integers"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_many(self, keys):
+        return self.client.mget(keys)
+
+    def set(self, key, value, ttl):
+        self.client.set(key, value, ex=max(1, int(ttl)))
+
+    def add(self, key, value, ttl):
+        """Set only if absent (used as a short lock); True when set"""
+        return bool(self.client.set(key, value, ex=max(1, int(ttl)), nx=True))
+
+    def add_many(self, mapping):
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipeline.set(key, value, nx=True)
+        pipeline.execute()
+
+    def incr_many(self, keys):
+        pipeline = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.incr(key)
+        pipeline.execute()
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*keys)
+
+
+class MemoryBackend:
+    """Process-local stand-in with the same semantics as RedisBackend"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key, now):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._data[key]
+            return None
+        return value
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            return [self._get(key, now) for key in keys]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def add(self, key, value, ttl):
+        now = time.monotonic()
+        with self._lock:
+            if self._get(key, now) is not None:
+                return False
+            self._data[key] = (value, now + ttl)
+            return True
+
+    def add_many(self, mapping):
+        now = time.monotonic()
+        with self._lock:
+            for key, value in mapping.items():
+                if self._get(key, now) is None:
+                    self._data[key] = (value, None)
+
+    def incr_many(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                current = self._get(key, now)
+                self._data[key] = (int(current or 0) + 1, None)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data = {}
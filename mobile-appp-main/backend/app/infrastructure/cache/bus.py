@@ -0,0 +1,105 @@
+"""
+Invalidation bus - Báo cho mọi worker xóa near-cache khi dữ liệu đổi (Redis pub/sub hoặc loopback trong tiến trình)
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBus:
+    """In-process loopback for single-process runs and tests"""
+
+    def __init__(self):
+        self._handlers = []
+
+    def subscribe(self, handler):
+        self._handlers.append(handler)
+
+    def publish(self, message):
+        for handler in self._handlers:
+            handler(message)
+
+    def start(self):
+        pass
+
+
+class RedisBus:
+    """Redis pub/sub fan-out; a daemon thread per worker applies remote messages.
+
+    Pub/sub is at-most-once, so after a dropped subscription the handlers get
+    a {"reset": true} message to throw away whatever may have been missed.
+    """
+
+    def __init__(self, client, channel):
+        self.client = client
+        self.channel = channel
+        self.origin = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers = []
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler):
+        self._handlers.append(handler)
+
+    def _dispatch(self, message):
+        for handler in self._handlers:
+            try:
+                handler(message)
+            except Exception:
+                logger.exception("Cache invalidation handler failed")
+
+    def publish(self, message):
+        # Apply locally right away; the listener skips our own echo
+        self._dispatch(message)
+        try:
+            self.client.publish(self.channel, json.dumps({**message, "origin": self.origin}))
+        except Exception:
+            logger.warning("Could not publish cache invalidation", exc_info=True)
+
+    def start(self):
+        """Start the listener once per process (after a fork the thread is gone)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+            self._thread.start()
+
+    def _listen(self):
+        backoff = 0.5
+        failures = 0
+        connected_before = False
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                if connected_before:
+                    self._dispatch({"reset": True})
+                if failures:
+                    logger.info("Cache invalidation listener reconnected after %d failed attempts", failures)
+                connected_before = True
+                backoff = 0.5
+                failures = 0
+                while True:
+                    raw = pubsub.get_message(timeout=1.0)
+                    if raw is None or raw.get("type") != "message":
+                        continue
+                    message = json.loads(raw["data"])
+                    if message.pop("origin", None) != self.origin:
+                        self._dispatch(message)
+            except Exception:
+                # Only the first failure of an outage is worth a warning
+                log = logger.warning if failures == 0 else logger.debug
+                log("Cache invalidation listener disconnected; retrying in %ss", backoff, exc_info=True)
+                failures += 1
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
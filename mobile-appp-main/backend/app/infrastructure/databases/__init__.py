@@ -1,36 +1,86 @@
 """
 Database initialization and session management
 """
-from sqlalchemy import create_engine
+import functools
+import hashlib
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, scoped_session
+from app.infrastructure import green
 from app.infrastructure.databases.base import Base
+from app.infrastructure.databases.pool_monitor import PoolMonitor
+from app.infrastructure.databases.replicas import ReplicaSet
+from app.infrastructure.databases.shards import DEFAULT_SHARD, ShardRouter, parse_shard_urls, reserve_id_range
 from app.config import Config
 
 engine = None
 SessionLocal = None
+ReplicaSession = None
+replicas = None
+shards = None
+pool_monitor = None
+
+STICKY_COOKIE = "db_primary_until"
+
+def with_connect_timeout(database_uri):
+    """Add connection timeout for PostgreSQL"""
+    if 'postgresql' in database_uri.lower() and 'connect_timeout' not in database_uri.lower():
+        separator = '&' if '?' in database_uri else '?'
+        database_uri = f"{database_uri}{separator}connect_timeout=10"
+    return database_uri
+
 
 def init_db(app):
     """Initialize database"""
-    global engine, SessionLocal
+    global engine, SessionLocal, ReplicaSession, replicas, shards, pool_monitor
     
-    database_uri = app.config['DATABASE_URI']
+    database_uri = with_connect_timeout(app.config['DATABASE_URI'])
     
-    # Add connection timeout for PostgreSQL
-    if 'postgresql' in database_uri.lower() and 'connect_timeout' not in database_uri.lower():
-        separator = '&' if '?' in database_uri else '?'
-        database_uri = f"{database_uri}{separator}connect_timeout=10"
+    engine_options = {
+        "echo": app.config.get('DEBUG', False),
+        "pool_pre_ping": True,
+        "pool_recycle": 300,
+        "pool_size": Config.DB_POOL_SIZE,
+        "max_overflow": Config.DB_MAX_OVERFLOW
+    }
+    if green.worker:
+        # Thousands of greenlets share a few connections and queue on the pool
+        engine_options.update(
+            pool_size=Config.GREEN_DB_POOL_SIZE,
+            max_overflow=0,
+            pool_timeout=Config.GREEN_DB_POOL_TIMEOUT
+        )
+    engine = create_engine(database_uri, **engine_options)
+    pool_monitor = PoolMonitor(Config.DB_SLOW_HOLD_MS).attach(engine)
+    
+    # Objects stay readable after commit, so routes do not reload them
+    # (and re-check out a connection) just to build the response
+    session_factory = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    SessionLocal = scoped_session(session_factory)
+    event.listen(session_factory, "after_flush", _mark_write)
+    event.listen(session_factory, "do_orm_execute", _mark_bulk_write)
+    event.listen(session_factory, "after_commit", _after_commit)
     
-    engine = create_engine(
-        database_uri,
-        echo=app.config.get('DEBUG', False),
-        pool_pre_ping=True,
-        pool_recycle=300,
-        pool_size=10,
-        max_overflow=20
+    # Read replicas for @use_replica handlers
+    replicas = ReplicaSet(
+        [with_connect_timeout(url) for url in Config.DATABASE_REPLICA_URLS],
+        engine_options,
+        Config.REPLICA_MAX_LAG_SECONDS,
+        Config.REPLICA_CHECK_INTERVAL
     )
+    ReplicaSession = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
     
-    SessionLocal = scoped_session(
-        sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Tenant shards; the primary is the default shard
+    shard_urls = parse_shard_urls(Config.DATABASE_SHARDS)
+    shards = ShardRouter(
+        engine,
+        {name: with_connect_timeout(url) for name, url in shard_urls.items()},
+        engine_options,
+        Config.SHARD_MAP_TTL
     )
     
     # Import all models to ensure they are registered
@@ -48,15 +98,249 @@ def init_db(app):
         refresh_token_model,
         socket_model,
         customer_model,
-        customer_history_model
+        customer_history_model,
+        loyalty_ledger_model,
+        order_history_model,
+        rating_stats_model,
+        analytics_model,
+        hll_sketch_model,
+        tenant_shard_model
     )
     
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    # Create all tables (fast-start deployments migrate with `flask db-setup` instead)
+    if app.config.get('DB_CREATE_ALL_ON_BOOT', Config.DB_CREATE_ALL_ON_BOOT):
+        create_schema()
     
     return SessionLocal
 
-def get_session():
-    """Get database session"""
-    return SessionLocal()
+def create_schema():
+    """create_all on the default database and every shard"""
+    for shard_engine in shards.engines.values():
+        Base.metadata.create_all(bind=shard_engine)
+    reserve_shard_ids()
+
+
+def reserve_shard_ids():
+    """Give every extra shard its own Postgres id range (idempotent)"""
+    extra_shards = [name for name in shards.engines if name != DEFAULT_SHARD]
+    for index, name in enumerate(extra_shards, start=1):
+        reserve_id_range(shards.engines[name], Base.metadata.sorted_tables, index * Config.SHARD_ID_BLOCK)
+
+
+def get_session(tenant_id=None):
+    """Session of the current request, or a new session outside requests.
+
+    Inside a request every call returns the same session (per shard); it
+    checks out a connection on its first SQL statement, gives it back on
+    commit, rollback or close, and is removed at teardown. Background
+    threads, CLI commands and scheduler jobs get their own session and must
+    close it. With shards configured, the session belongs to the shard of
+    `tenant_id`, or of the tenant the request is about.
+    """
+    if has_request_context():
+        shard = _request_shard(tenant_id)
+        if shard != DEFAULT_SHARD:
+            return _shard_session(shard)
+        if g.get('db_use_replica'):
+            session = _replica_session()
+            if session is not None:
+                return session
+        return SessionLocal()
+    if tenant_id is not None and shards is not None and shards.enabled:
+        return shards.session(shards.shard_for(tenant_id))
+    return SessionLocal.session_factory()
+
+
+def resolve_request_tenant():
+    """Tenant a request is about: explicit, signed-in staff, URL, query or X-Tenant-ID"""
+    tenant_id = g.get('shard_tenant_id')
+    if tenant_id is None:
+        tenant_id = getattr(g.get('current_user'), 'tenant_id', None)
+    if tenant_id is None and request.view_args:
+        tenant_id = request.view_args.get('restaurant_id', request.view_args.get('tenant_id'))
+    if tenant_id is None:
+        tenant_id = request.args.get('tenant_id', type=int)
+    if tenant_id is None:
+        header = request.headers.get('X-Tenant-ID', '')
+        tenant_id = int(header) if header.isdigit() else None
+    return tenant_id
+
+
+def _request_shard(tenant_id):
+    if shards is None or not shards.enabled:
+        return DEFAULT_SHARD
+    return shards.shard_for(tenant_id if tenant_id is not None else resolve_request_tenant())
+
+
+def _shard_session(shard):
+    sessions = g.get('_shard_sessions')
+    if sessions is None:
+        sessions = g._shard_sessions = {}
+    session = sessions.get(shard)
+    if session is None:
+        session = sessions[shard] = shards.session(shard)
+    return session
+
+
+def is_sharded():
+    return shards is not None and shards.enabled
+
+
+def shard_for(tenant_id):
+    """Name of the shard holding the tenant (the default shard when unsharded)"""
+    if shards is None or not shards.enabled:
+        return DEFAULT_SHARD
+    return shards.shard_for(tenant_id)
+
+
+def scatter(fn, read_only=False):
+    """[(shard, fn(session))] over every shard for cross-tenant queries.
+
+    Unsharded, this is a single call with get_session(). Sharded, each shard
+    gets its own short-lived session, queried concurrently; read_only lets
+    the default shard use a read replica.
+    """
+    if shards is None or not shards.enabled:
+        if has_request_context():
+            return [(DEFAULT_SHARD, fn(get_session()))]
+        session = get_session()
+        try:
+            return [(DEFAULT_SHARD, fn(session))]
+        finally:
+            session.close()
+    engines = {}
+    if read_only and replicas:
+        replica_engine = replicas.choose()
+        if replica_engine is not None:
+            engines[DEFAULT_SHARD] = replica_engine
+    return shards.scatter(fn, engines)
+
+
+def only_home_tenants(session, query, column):
+    """Limit a scattered query (or select) to tenants whose home is the session's shard"""
+    if shards is None or not shards.enabled:
+        return query
+    return query.filter(shards.home_filter(column, session.info.get("shard", DEFAULT_SHARD)))
+
+
+def locate_tenant(model, *criteria):
+    """Tenant owning a row found by criteria on any shard; None when unsharded"""
+    if shards is None or not shards.enabled:
+        return None
+    return shards.locate_tenant(model, *criteria)
+
+
+@contextmanager
+def advisory_lock(name):
+    """Yield whether this process holds the named lock; only one process can at a time.
+
+    A session-level Postgres advisory lock on the default database, held on
+    its own connection until the block exits (or the connection dies). Other
+    databases have no cross-process lock, so it is always granted there.
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+    key = int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+    with engine.connect() as connection:
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        connection.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                connection.commit()
+
+
+def _replica_session():
+    """Replica session of this request, created on first use (None -> primary)"""
+    session = g.get('_replica_session')
+    if session is not None:
+        return session
+    if _sticky_to_primary():
+        g.db_use_replica = False
+        return None
+    replica_engine = replicas.choose() if replicas else None
+    if replica_engine is None:
+        g.db_use_replica = False
+        return None
+    session = g._replica_session = ReplicaSession(bind=replica_engine)
+    return session
+
+
+def _sticky_to_primary():
+    """Client wrote recently; its replica might not have the write yet"""
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def use_replica(f):
+    """Serve a read-only handler from a read replica when one is usable"""
+    @functools.wraps(f)
+    def decorated(*args, **kwargs):
+        g.db_use_replica = bool(replicas)
+        return f(*args, **kwargs)
+    return decorated
+
+
+def _mark_write(session, flush_context):
+    session.info['wrote'] = True
+
+
+def _mark_bulk_write(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info['wrote'] = True
+
+
+def _after_commit(session):
+    if session.info.pop('wrote', False) and has_request_context():
+        g.db_wrote = True
+
+
+def new_session(tenant_id=None):
+    """Session independent of the request (its own transaction), caller closes it.
+
+    With shards configured, it belongs to the shard of `tenant_id`.
+    """
+    if tenant_id is not None and shards is not None and shards.enabled:
+        return shards.session(shards.shard_for(tenant_id))
+    return SessionLocal.session_factory()
+
+
+def init_request_sessions(app):
+    """Release the request session when the app context tears down"""
+    @app.after_request
+    def set_primary_stickiness(response):
+        # Read-your-writes: keep this client's reads on the primary for a moment
+        if g.get('db_wrote') and replicas:
+            until = time.time() + Config.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE, f"{until:.3f}",
+                max_age=Config.REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
+
+    @app.teardown_appcontext
+    def remove_session(exception=None):
+        replica_session = g.pop('_replica_session', None)
+        if replica_session is not None:
+            if isinstance(exception, OperationalError):
+                replicas.mark_failed(replica_session.get_bind())
+            replica_session.close()
+        for shard_session in g.pop('_shard_sessions', {}).values():
+            shard_session.close()
+        if SessionLocal is not None:
+            SessionLocal.remove()
+
+
+def pool_stats():
+    if pool_monitor is None:
+        return {}
+    stats = pool_monitor.stats(engine.pool)
+    if replicas:
+        stats["replicas"] = replicas.stats()
+    return stats
 
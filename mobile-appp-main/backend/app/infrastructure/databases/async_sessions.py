@@ -0,0 +1,76 @@
+"""
+Async sessions - Engine và session SQLAlchemy asyncio cho các handler chạy qua ASGI, song song với engine đồng bộ
+"""
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import Config
+from app.infrastructure.databases.shards import DEFAULT_SHARD
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+engines = {}
+factories = {}
+router = None
+
+
+def async_url(url):
+    """(url, connect_args) of the same database through its asyncio driver"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for {backend}")
+    query = dict(url.query)
+    connect_args = {}
+    if backend == "postgresql" and "connect_timeout" in query:
+        # asyncpg calls it timeout
+        connect_args["timeout"] = int(query.pop("connect_timeout"))
+    return url.set(drivername=ASYNC_DRIVERS[backend], query=query), connect_args
+
+
+def init_async_db(shards):
+    """Async engine per shard, mirroring the sync ShardRouter (call after init_db)"""
+    global router
+    router = shards
+    for name, sync_engine in shards.engines.items():
+        url, connect_args = async_url(sync_engine.url)
+        engine_options = {"echo": sync_engine.echo, "pool_pre_ping": True, "pool_recycle": 300}
+        if url.get_backend_name() != "sqlite":
+            engine_options.update(pool_size=Config.DB_POOL_SIZE, max_overflow=Config.DB_MAX_OVERFLOW)
+        engines[name] = create_async_engine(url, connect_args=connect_args, **engine_options)
+        factories[name] = async_sessionmaker(engines[name], autoflush=False, expire_on_commit=False)
+
+
+async def dispose_async_db():
+    for engine in engines.values():
+        await engine.dispose()
+    engines.clear()
+    factories.clear()
+
+
+def async_session(tenant_id=None):
+    """New AsyncSession on the tenant's shard; use as `async with async_session(...) as session`.
+
+    The tenant map is cached, so this only touches the database (synchronously)
+    once per SHARD_MAP_TTL.
+    """
+    shard = router.shard_for(tenant_id) if router is not None else DEFAULT_SHARD
+    return factories[shard]()
+
+
+async def locate_tenant(model, *criteria):
+    """Async counterpart of databases.locate_tenant; None when unsharded"""
+    if router is None or not router.enabled:
+        return None
+
+    async def lookup(name):
+        async with factories[name]() as session:
+            return name, await session.scalar(select(model.tenant_id).where(*criteria).limit(1))
+
+    for name, tenant_id in await asyncio.gather(*(lookup(name) for name in factories)):
+        if tenant_id is not None and router.shard_for(tenant_id) == name:
+            return tenant_id
+    return None
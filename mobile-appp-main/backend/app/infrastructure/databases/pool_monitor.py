@@ -0,0 +1,68 @@
+"""
+Pool monitor - Đo số kết nối đang mượn, thời gian giữ kết nối và cảnh báo giữ quá lâu
+"""
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMonitor:
+    """Checkout/checkin counters of one engine's connection pool"""
+
+    def __init__(self, slow_hold_ms=0):
+        self.slow_hold_ms = slow_hold_ms
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.total_hold = 0.0
+        self.max_hold = 0.0
+        self.slow_holds = 0
+
+    def attach(self, engine):
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        return self
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.monotonic()
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is None:
+            return
+        held = time.monotonic() - started
+        with self._lock:
+            self.checkins += 1
+            self.in_use -= 1
+            self.total_hold += held
+            self.max_hold = max(self.max_hold, held)
+            slow = self.slow_hold_ms and held * 1000 >= self.slow_hold_ms
+            if slow:
+                self.slow_holds += 1
+        if slow:
+            logger.warning("Database connection held for %.0f ms", held * 1000)
+
+    def stats(self, pool=None):
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "avg_hold_ms": round(self.total_hold / self.checkins * 1000, 2) if self.checkins else 0.0,
+                "max_hold_ms": round(self.max_hold * 1000, 2),
+                "slow_holds": self.slow_holds
+            }
+        if pool is not None and hasattr(pool, "size"):
+            stats["pool_size"] = pool.size()
+            stats["overflow"] = pool.overflow()
+        return stats
@@ -0,0 +1,88 @@
+"""
+Read replicas - Chọn replica cho các request chỉ đọc, bỏ qua replica trễ hoặc lỗi
+"""
+import logging
+import random
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+logger = logging.getLogger(__name__)
+
+# 0 when the replica has replayed everything it received, so an idle primary does not look like lag
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    def __init__(self, engine):
+        self.engine = engine
+        self.lag = 0.0
+        self.healthy = True
+        self.checked_at = 0.0
+
+
+class ReplicaSet:
+    """Replica engines with a cached lag/health check per replica"""
+
+    def __init__(self, urls, engine_options, max_lag, check_interval):
+        self.replicas = [Replica(create_engine(url, **engine_options)) for url in urls]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    def _measure(self, replica):
+        try:
+            with replica.engine.connect() as connection:
+                if replica.engine.dialect.name == "postgresql":
+                    replica.lag = float(connection.execute(POSTGRES_LAG_SQL).scalar() or 0)
+                else:
+                    # Other engines (local SQLite copies) have no replication to measure
+                    connection.execute(text("SELECT 1"))
+                    replica.lag = 0.0
+            replica.healthy = True
+        except Exception:
+            replica.healthy = False
+            logger.warning("Read replica %s unavailable", replica.engine.url.render_as_string(hide_password=True), exc_info=True)
+
+    def _refresh(self):
+        now = time.monotonic()
+        due = [replica for replica in self.replicas if now - replica.checked_at >= self.check_interval]
+        if not due or not self._lock.acquire(blocking=False):
+            # Someone else is checking; use the last known state
+            return
+        try:
+            for replica in due:
+                self._measure(replica)
+                replica.checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def choose(self):
+        """Engine of a random usable replica, or None to use the primary"""
+        if not self.replicas:
+            return None
+        self._refresh()
+        usable = [replica for replica in self.replicas if replica.healthy and replica.lag <= self.max_lag]
+        if not usable:
+            return None
+        return random.choice(usable).engine
+
+    def mark_failed(self, engine):
+        for replica in self.replicas:
+            if replica.engine is engine:
+                replica.healthy = False
+                replica.checked_at = time.monotonic()
+
+    def stats(self):
+        return [{
+            "url": replica.engine.url.render_as_string(hide_password=True),
+            "healthy": replica.healthy,
+            "lag_seconds": round(replica.lag, 3)
+        } for replica in self.replicas]
@@ -0,0 +1,154 @@
+"""
+Tenant shards - Định tuyến nhà hàng tới cơ sở dữ liệu của nó và truy vấn scatter-gather trên mọi shard
+
+Dữ liệu của một nhà hàng (kể cả dòng tenants) nằm trọn trên một shard. Bảng
+toàn cục (tài khoản, khách thành viên, token, chỉ số nền tảng) và danh bạ
+tenant_shards nằm trên shard mặc định; nhà hàng chưa có trong danh bạ cũng vậy.
+Shard khác có thể giữ bản sao tham chiếu của dòng toàn cục (và shard mặc định
+giữ bản sao dòng tenants của nhà hàng đã chuyển đi) để khóa ngoại còn hợp lệ.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, text, true
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARD = "default"
+
+# Not owned by a tenant; kept on the default shard (copied to others only as FK targets).
+# rollup_watermarks is neither: every shard tracks its own rollup progress.
+GLOBAL_TABLES = frozenset({
+    "customers", "accounts", "refresh_tokens", "hll_sketches", "tenant_shards"
+})
+
+
+class ShardError(Exception):
+    """Shard map or migration problem"""
+
+
+def parse_shard_urls(value):
+    """'east=postgresql://...,west=postgresql://...' -> {name: url}"""
+    shards = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, url = item.partition('=')
+        if not url or name.strip() == DEFAULT_SHARD:
+            raise ShardError(f"Invalid shard entry: {item!r}")
+        shards[name.strip()] = url.strip()
+    return shards
+
+
+def reserve_id_range(engine, tables, offset):
+    """Start this shard's Postgres id sequences at `offset` so ids never
+    collide with rows moved in from other shards."""
+    if engine.dialect.name != "postgresql" or not offset:
+        return
+    with engine.begin() as connection:
+        for table in tables:
+            primary_key = list(table.primary_key.columns)
+            if len(primary_key) != 1 or not primary_key[0].autoincrement:
+                continue
+            sequence = connection.execute(
+                text("SELECT pg_get_serial_sequence(:table, :column)"),
+                {"table": table.name, "column": primary_key[0].name}
+            ).scalar()
+            if sequence:
+                connection.execute(
+                    text("SELECT setval(:sequence, GREATEST(nextval(:sequence) - 1, :offset))"),
+                    {"sequence": sequence, "offset": offset}
+                )
+
+
+class ShardRouter:
+    """Engines per shard plus the cached tenant -> shard directory"""
+
+    def __init__(self, default_engine, shard_urls, engine_options, map_ttl=30):
+        self.engines = {DEFAULT_SHARD: default_engine}
+        for name, url in shard_urls.items():
+            self.engines[name] = create_engine(url, **engine_options)
+        self.factories = {
+            name: sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+            for name, engine in self.engines.items()
+        }
+        self.map_ttl = map_ttl
+        self._map = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def enabled(self):
+        return len(self.engines) > 1
+
+    def _directory(self):
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.map_ttl:
+            from app.models.tenant_shard_model import TenantShardModel
+
+            with self._lock:
+                if self._loaded_at is None or now - self._loaded_at >= self.map_ttl:
+                    session = self.factories[DEFAULT_SHARD]()
+                    try:
+                        self._map = dict(session.query(TenantShardModel.tenant_id, TenantShardModel.shard).all())
+                    finally:
+                        session.close()
+                    self._loaded_at = time.monotonic()
+        return self._map
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def shard_for(self, tenant_id):
+        if not self.enabled or tenant_id is None:
+            return DEFAULT_SHARD
+        shard = self._directory().get(int(tenant_id), DEFAULT_SHARD)
+        if shard not in self.engines:
+            raise ShardError(f"Tenant {tenant_id} is mapped to unknown shard {shard!r}")
+        return shard
+
+    def session(self, shard):
+        session = self.factories[shard]()
+        session.info["shard"] = shard
+        return session
+
+    def home_filter(self, column, shard):
+        """Clause keeping tenants whose home is `shard` (drops reference copies)"""
+        directory = self._directory()
+        if shard == DEFAULT_SHARD:
+            elsewhere = [tenant_id for tenant_id, name in directory.items() if name != DEFAULT_SHARD]
+            return column.notin_(elsewhere) if elsewhere else true()
+        return column.in_([tenant_id for tenant_id, name in directory.items() if name == shard])
+
+    def scatter(self, fn, engines=None):
+        """[(shard, fn(session))] for every shard, run concurrently"""
+        engines = engines or {}
+
+        def run(name):
+            factory = self.factories[name]
+            session = factory(bind=engines[name]) if name in engines else factory()
+            session.info["shard"] = name
+            try:
+                return name, fn(session)
+            finally:
+                session.close()
+
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max(4, len(self.engines)), thread_name_prefix="shard-scatter"
+                    )
+        return list(self._executor.map(run, self.engines))
+
+    def locate_tenant(self, model, *criteria):
+        """Tenant id of the first row matching criteria on any shard (e.g. a QR token)"""
+        for name, tenant_id in self.scatter(
+            lambda session: session.query(model.tenant_id).filter(*criteria).limit(1).scalar()
+        ):
+            # Rows left behind by a --keep-source migration do not count
+            if tenant_id is not None and self.shard_for(tenant_id) == name:
+                return tenant_id
+        return None
@@ -0,0 +1,142 @@
+"""
+Green workers (eventlet/gevent) - Monkey-patch một lần, psycopg2 nhường hub khi chờ I/O, cảnh báo route chặn hub
+"""
+import logging
+import sys
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+# 'eventlet' or 'gevent' once patch() ran
+worker = None
+
+
+def patch(kind="eventlet"):
+    """Monkey-patch the standard library; call before importing anything else"""
+    global worker
+    if worker is not None:
+        return
+    if kind == "eventlet":
+        import eventlet
+        eventlet.monkey_patch()
+    elif kind == "gevent":
+        from gevent import monkey
+        monkey.patch_all()
+    else:
+        raise ValueError(f"Unknown green worker: {kind}")
+    worker = kind
+    make_psycopg_green()
+
+
+def _primitives():
+    """(green spawn, green sleep, OS start_new_thread, OS sleep, OS get_ident)"""
+    if worker == "eventlet":
+        import eventlet
+        from eventlet.patcher import original
+
+        os_thread = original("_thread")
+        return eventlet.spawn, eventlet.sleep, os_thread.start_new_thread, original("time").sleep, os_thread.get_ident
+    import gevent
+    from gevent.monkey import get_original
+
+    return (
+        gevent.spawn, gevent.sleep,
+        get_original("_thread", "start_new_thread"), get_original("time", "sleep"), get_original("_thread", "get_ident")
+    )
+
+
+def make_psycopg_green():
+    """Let psycopg2 wait on the hub instead of blocking the whole worker in libpq"""
+    try:
+        from psycopg2 import OperationalError, extensions
+    except ImportError:
+        return
+
+    if worker == "eventlet":
+        from eventlet.hubs import trampoline
+
+        def wait_read(fd):
+            trampoline(fd, read=True)
+
+        def wait_write(fd):
+            trampoline(fd, write=True)
+    else:
+        from gevent.socket import wait_read, wait_write
+
+    def wait_callback(conn, timeout=None):
+        while True:
+            state = conn.poll()
+            if state == extensions.POLL_OK:
+                break
+            elif state == extensions.POLL_READ:
+                wait_read(conn.fileno())
+            elif state == extensions.POLL_WRITE:
+                wait_write(conn.fileno())
+            else:
+                raise OperationalError(f"Bad result from poll: {state!r}")
+
+    extensions.set_wait_callback(wait_callback)
+
+
+def describe_frame(frame):
+    """(route, stack) of the code running in a frame"""
+    route = "<outside a request>"
+    current = frame
+    while current is not None:
+        if current.f_code.co_name == "wsgi_app" and "environ" in current.f_locals:
+            environ = current.f_locals["environ"]
+            route = f"{environ.get('REQUEST_METHOD')} {environ.get('PATH_INFO')}"
+            break
+        current = current.f_back
+    return route, "".join(traceback.format_stack(frame)) if frame is not None else ""
+
+
+class HubWatchdog:
+    """Detect code that keeps the hub from switching for longer than threshold_ms.
+
+    A greenlet beats every interval; an OS thread notices a missing beat and
+    snapshots the frame running in the hub's thread (the blocking code) and
+    the request it belongs to. The beat logs how long the block lasted.
+    """
+
+    def __init__(self, threshold_ms=100, interval_ms=None):
+        self.threshold = threshold_ms / 1000
+        self.interval = (interval_ms or max(threshold_ms // 4, 10)) / 1000
+        self.blocks = {}
+        self._beat = time.monotonic()
+        self._blocked_in = None
+        self._hub_thread = None
+
+    def start(self):
+        spawn, _, start_new_thread, _, get_ident = _primitives()
+        self._hub_thread = get_ident()
+        self._beat = time.monotonic()
+        spawn(self._heartbeat)
+        start_new_thread(self._watch, ())
+        return self
+
+    def _heartbeat(self):
+        green_sleep = _primitives()[1]
+        while True:
+            before = time.monotonic()
+            green_sleep(self.interval)
+            self._beat = time.monotonic()
+            blocked_in, self._blocked_in = self._blocked_in, None
+            if blocked_in is not None:
+                lag_ms = (self._beat - before - self.interval) * 1000
+                logger.warning("Hub was blocked for %.0f ms by %s", lag_ms, blocked_in)
+
+    def _watch(self):
+        os_sleep = _primitives()[3]
+        while True:
+            os_sleep(self.interval)
+            if self._blocked_in is not None or time.monotonic() - self._beat < self.threshold:
+                continue
+            route, stack = describe_frame(sys._current_frames().get(self._hub_thread))
+            self._blocked_in = route
+            self.blocks[route] = self.blocks.get(route, 0) + 1
+            logger.warning("Hub blocked over %.0f ms in %s:\n%s", self.threshold * 1000, route, stack)
+
+    def stats(self):
+        return dict(self.blocks)
@@ -0,0 +1,25 @@
+"""
+Redis client setup
+"""
+from app.config import Config
+from app.utils.lazy import lazy_import
+
+redis = lazy_import("redis")
+
+_client = None
+
+
+def get_redis_client():
+    """Get shared Redis client (created on first use)"""
+    global _client
+
+    if _client is None:
+        _client = redis.Redis(
+            host=Config.REDIS_HOST,
+            port=Config.REDIS_PORT,
+            password=Config.REDIS_PASSWORD or None,
+            db=Config.REDIS_DB,
+            socket_timeout=5,
+            health_check_interval=30
+        )
+    return _client
@@ -0,0 +1,108 @@
+"""
+Background job scheduler (APScheduler)
+"""
+import functools
+import logging
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+scheduler = None
+
+
+def exclusive(job):
+    """Run a job in one worker process at a time; the others skip that run.
+
+    Every worker starts its own scheduler, so jobs that work on shared rows
+    take a database lock named after the job. Jobs on per-process state
+    (buffered counters, pending sketches) run unwrapped in every worker.
+    """
+    from app.infrastructure.databases import advisory_lock
+
+    @functools.wraps(job)
+    def run(*args, **kwargs):
+        with advisory_lock(f"scheduler:{job.__name__}") as acquired:
+            if not acquired:
+                logger.debug("Skipping %s: another worker is running it", job.__name__)
+                return None
+            return job(*args, **kwargs)
+    return run
+
+
+def init_scheduler(app):
+    """Initialize background scheduler and register periodic jobs"""
+    global scheduler
+
+    if not app.config.get('SCHEDULER_ENABLED') or app.config.get('TESTING'):
+        return None
+    if scheduler is not None:
+        return scheduler
+
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from app.services.refresh_token_service import purge_expired_refresh_tokens
+    from app.services.customer_service import reconcile_unrecorded_payments
+    from app.services.analytics_service import refresh_sales_rollups
+    from app.services.snapshot_service import dump_recent_snapshots
+    from app.services.trending_service import persist_trending
+    from app.services.metrics_service import flush_unique_counters
+
+    scheduler = BackgroundScheduler(timezone=Config.SERVER_TIMEZONE)
+    scheduler.add_job(
+        exclusive(purge_expired_refresh_tokens),
+        'interval',
+        seconds=Config.REFRESH_TOKEN_PURGE_INTERVAL,
+        id='purge_expired_refresh_tokens',
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True
+    )
+    scheduler.add_job(
+        exclusive(reconcile_unrecorded_payments),
+        'interval',
+        seconds=Config.CUSTOMER_HISTORY_RECONCILE_INTERVAL,
+        id='reconcile_unrecorded_payments',
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True
+    )
+    scheduler.add_job(
+        exclusive(refresh_sales_rollups),
+        'interval',
+        seconds=Config.ANALYTICS_ROLLUP_INTERVAL,
+        id='refresh_sales_rollups',
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True
+    )
+    scheduler.add_job(
+        exclusive(dump_recent_snapshots),
+        'cron',
+        hour=Config.ANALYTICS_SNAPSHOT_HOUR,
+        id='dump_recent_snapshots',
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True
+    )
+    scheduler.add_job(
+        flush_unique_counters,
+        'interval',
+        seconds=Config.HLL_FLUSH_INTERVAL,
+        id='flush_unique_counters',
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True
+    )
+    if Config.TRENDING_PERSIST:
+        scheduler.add_job(
+            persist_trending,
+            'interval',
+            seconds=Config.TRENDING_PERSIST_INTERVAL,
+            id='persist_trending',
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True
+        )
+    scheduler.start()
+
+    return scheduler
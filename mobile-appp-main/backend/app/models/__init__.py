@@ -10,11 +10,17 @@ from app.models.order_model import OrderModel
 from app.models.guest_model import GuestModel
 from app.models.discount_model import DiscountModel
 from app.models.review_model import ReviewModel
-from app.models.reservation_model import ReservationModel
+from app.models.reservation_model import ReservationModel, ReservationTableModel
 from app.models.refresh_token_model import RefreshTokenModel
 from app.models.socket_model import SocketModel
 from app.models.customer_model import CustomerModel
 from app.models.customer_history_model import CustomerHistoryModel
+from app.models.loyalty_ledger_model import LoyaltyLedgerModel
+from app.models.order_history_model import OrderHistoryModel
+from app.models.rating_stats_model import TenantRatingStatsModel, DishRatingStatsModel
+from app.models.analytics_model import SalesRollupModel, DishSalesRollupModel, RollupWatermarkModel
+from app.models.hll_sketch_model import HllSketchModel
+from app.models.tenant_shard_model import TenantShardModel
 
 __all__ = [
     "TenantModel",
@@ -28,9 +34,19 @@ __all__ = [
     "DiscountModel",
     "ReviewModel",
     "ReservationModel",
+    "ReservationTableModel",
     "RefreshTokenModel",
     "SocketModel",
     "CustomerModel",
     "CustomerHistoryModel",
+    "LoyaltyLedgerModel",
+    "OrderHistoryModel",
+    "TenantRatingStatsModel",
+    "DishRatingStatsModel",
+    "SalesRollupModel",
+    "DishSalesRollupModel",
+    "RollupWatermarkModel",
+    "HllSketchModel",
+    "TenantShardModel",
 ]
 
@@ -0,0 +1,60 @@
+"""
+Analytics Models - Bảng tổng hợp doanh thu theo giờ/ngày và món bán ra
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.infrastructure.databases.base import Base
+
+
+class SalesRollupModel(Base):
+    """Paid sales per tenant/branch and local hour or day"""
+    __tablename__ = "sales_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    branch_id = Column(Integer, default=0, nullable=False)  # 0: orders without a branch
+    period = Column(String(4), nullable=False)  # hour | day
+    bucket = Column(DateTime, nullable=False)  # bucket start, tenant local time
+    revenue = Column(BigInteger, default=0, nullable=False)
+    orders = Column(Integer, default=0, nullable=False)  # order lines
+    items_sold = Column(Integer, default=0, nullable=False)
+    covers = Column(Integer, default=0, nullable=False)  # distinct guests
+    tickets = Column(Integer, default=0, nullable=False)  # paid bills
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index('ix_sales_rollups_tenant_period_bucket', 'tenant_id', 'period', 'bucket'),
+        UniqueConstraint('tenant_id', 'branch_id', 'period', 'bucket', name='uq_sales_rollups_bucket'),
+    )
+
+    @property
+    def average_ticket(self):
+        return round(self.revenue / self.tickets, 2) if self.tickets else 0
+
+
+class DishSalesRollupModel(Base):
+    """Items sold per dish, tenant/branch and local day"""
+    __tablename__ = "dish_sales_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    branch_id = Column(Integer, default=0, nullable=False)  # 0: orders without a branch
+    day = Column(Date, nullable=False)
+    dish_id = Column(Integer, default=0, nullable=False)  # 0 when the dish was deleted
+    dish_name = Column(String, nullable=False)
+    quantity = Column(Integer, default=0, nullable=False)
+    revenue = Column(BigInteger, default=0, nullable=False)
+
+    __table_args__ = (
+        Index('ix_dish_sales_rollups_tenant_day', 'tenant_id', 'day'),
+        UniqueConstraint('tenant_id', 'day', 'branch_id', 'dish_id', 'dish_name', name='uq_dish_sales_rollups_dish'),
+    )
+
+
+class RollupWatermarkModel(Base):
+    """High-water mark of incremental rollup jobs"""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(64), primary_key=True)
+    value = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,25 @@
+"""
+HLL Sketch Model - Sketch HyperLogLog theo chỉ số, ngày và nhà hàng
+"""
+from sqlalchemy import Column, Integer, String, Date, DateTime, LargeBinary, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.infrastructure.databases.base import Base
+
+PLATFORM_TENANT_ID = 0  # Row holding the union of all tenants for the day
+
+
+class HllSketchModel(Base):
+    __tablename__ = "hll_sketches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    metric = Column(String(32), nullable=False)  # guests | customers | tables
+    tenant_id = Column(Integer, nullable=False)  # PLATFORM_TENANT_ID for platform-wide totals
+    day = Column(Date, nullable=False)
+    precision = Column(Integer, nullable=False)
+    registers = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('metric', 'tenant_id', 'day', name='uq_hll_metric_tenant_day'),
+    )
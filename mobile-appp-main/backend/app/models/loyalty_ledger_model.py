@@ -0,0 +1,28 @@
+"""
+Loyalty Ledger Model - Sổ cái điểm tích lũy và chi tiêu (chỉ ghi thêm)
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.infrastructure.databases.base import Base
+
+
+class LoyaltyLedgerModel(Base):
+    __tablename__ = "loyalty_ledger"
+
+    id = Column(Integer, primary_key=True, index=True)
+    customer_id = Column(Integer, ForeignKey("customers.id", ondelete="CASCADE"), nullable=False)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="SET NULL"), nullable=True, unique=True)
+    spend_delta = Column(Float, default=0.0, nullable=False)
+    points_delta = Column(Integer, default=0, nullable=False)
+    reason = Column(String, nullable=False)  # order_paid, adjustment, ...
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_loyalty_ledger_customer_created', 'customer_id', 'created_at'),
+    )
+
+    # Relationships
+    customer = relationship("CustomerModel")
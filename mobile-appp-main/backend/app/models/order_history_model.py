@@ -0,0 +1,33 @@
+"""
+Order History Model - Bản đọc lịch sử gọi món (mỗi dòng một món, chỉ ghi thêm)
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+
+from app.infrastructure.databases.base import Base
+
+
+class OrderHistoryModel(Base):
+    __tablename__ = "order_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    guest_id = Column(Integer, ForeignKey("guests.id", ondelete="SET NULL"), nullable=True)
+    customer_id = Column(Integer, ForeignKey("customers.id", ondelete="SET NULL"), nullable=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="SET NULL"), nullable=True, unique=True)
+    table_number = Column(Integer, nullable=True)
+    # Denormalized from the dish snapshot so reads never join
+    dish_id = Column(Integer, nullable=True)
+    dish_name = Column(String, nullable=False)
+    dish_image = Column(String, nullable=True)
+    price = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    notes = Column(String, nullable=True)
+    # Set when the table is paid; lines sharing a visit_key belong to one visit
+    visit_key = Column(String(32), nullable=True)
+    paid_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('ix_order_history_guest_created_id', 'guest_id', 'created_at', 'id'),
+        Index('ix_order_history_customer_created_id', 'customer_id', 'created_at', 'id'),
+    )
@@ -1,7 +1,7 @@
 """
 Order Model
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -25,6 +25,7 @@ class OrderModel(Base):
     tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
     branch_id = Column(Integer, ForeignKey("branches.id", ondelete="SET NULL"), nullable=True, index=True)
     guest_id = Column(Integer, ForeignKey("guests.id", ondelete="SET NULL"), nullable=True, index=True)
+    customer_id = Column(Integer, ForeignKey("customers.id", ondelete="SET NULL"), nullable=True, index=True)  # Mobile app member
     table_number = Column(Integer, ForeignKey("tables.number", ondelete="SET NULL"), nullable=True, index=True)
     dish_snapshot_id = Column(Integer, ForeignKey("dish_snapshots.id", ondelete="CASCADE"), unique=True, nullable=False)
     quantity = Column(Integer, nullable=False)
@@ -32,13 +33,19 @@ class OrderModel(Base):
     order_handler_id = Column(Integer, ForeignKey("accounts.id", ondelete="SET NULL"), nullable=True, index=True)
     status = Column(Enum(OrderStatus), default=OrderStatus.PENDING, nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)  # Rollup high-water mark
 
     # Relationships
     tenant = relationship("TenantModel", back_populates="orders")
     branch = relationship("BranchModel", back_populates="orders")
     guest = relationship("GuestModel", back_populates="orders")
+    customer = relationship("CustomerModel")
     table = relationship("TableModel", back_populates="orders", foreign_keys="[OrderModel.table_number]")
     dish_snapshot = relationship("DishSnapshotModel", back_populates="order", uselist=False)
     order_handler = relationship("AccountModel", foreign_keys="[OrderModel.order_handler_id]")
 
+    __table_args__ = (
+        # Per-tenant order count and last activity are index-only lookups
+        Index('ix_orders_tenant_created', 'tenant_id', 'created_at'),
+    )
+
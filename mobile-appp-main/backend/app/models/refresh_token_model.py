@@ -1,7 +1,7 @@
 """
 Refresh Token Model
 """
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -11,11 +11,11 @@ from app.infrastructure.databases.base import Base
 class RefreshTokenModel(Base):
     __tablename__ = "refresh_tokens"
 
-    token = Column(String, primary_key=True)
+    # SHA-256 hex digest of the JWT - fixed 64 chars instead of the full token
+    token_hash = Column(String(64), primary_key=True)
     account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False, index=True)
-    expires_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     account = relationship("AccountModel", back_populates="refresh_tokens")
-
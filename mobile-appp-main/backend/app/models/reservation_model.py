@@ -1,7 +1,7 @@
 """
 Reservation Model - Table booking
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -22,16 +22,44 @@ class ReservationModel(Base):
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id", ondelete="SET NULL"), nullable=True, index=True)
+    branch_id = Column(Integer, ForeignKey("branches.id", ondelete="SET NULL"), nullable=True, index=True)
     table_number = Column(Integer, nullable=True, index=True)
     date = Column(DateTime(timezone=True), nullable=False, index=True)
     time = Column(String, nullable=False)
+    # Booked interval [start_at, end_at) - date/time are kept for older clients
+    start_at = Column(DateTime(timezone=True), nullable=True)
+    end_at = Column(DateTime(timezone=True), nullable=True)
     guests = Column(Integer, nullable=False)
     status = Column(Enum(ReservationStatus), default=ReservationStatus.PENDING, nullable=False)
     notes = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index('ix_reservations_tenant_start', 'tenant_id', 'start_at'),
+    )
+
     # Relationships
     tenant = relationship("TenantModel", back_populates="reservations")
     customer = relationship("CustomerModel", back_populates="reservations")
+    tables = relationship("ReservationTableModel", back_populates="reservation", cascade="all, delete-orphan")
+
 
+class ReservationTableModel(Base):
+    """Tables occupied by an active reservation (several when tables are combined)"""
+    __tablename__ = "reservation_tables"
+
+    id = Column(Integer, primary_key=True, index=True)
+    reservation_id = Column(Integer, ForeignKey("reservations.id", ondelete="CASCADE"), nullable=False, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    table_number = Column(Integer, nullable=False)
+    # Copied from the reservation so overlap checks never join
+    start_at = Column(DateTime(timezone=True), nullable=False)
+    end_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('ix_reservation_tables_period', 'tenant_id', 'table_number', 'start_at', 'end_at'),
+    )
+
+    # Relationships
+    reservation = relationship("ReservationModel", back_populates="tables")
@@ -1,7 +1,7 @@
 """
 Review Model - Customer reviews
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -20,6 +20,11 @@ class ReviewModel(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Keyset pagination: newest reviews of a tenant first
+    __table_args__ = (
+        Index('ix_reviews_tenant_created_id', 'tenant_id', 'created_at', 'id'),
+    )
+
     # Relationships
     tenant = relationship("TenantModel", back_populates="reviews")
     customer = relationship("CustomerModel", back_populates="reviews")
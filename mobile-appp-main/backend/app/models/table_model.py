@@ -23,6 +23,8 @@ class TableModel(Base):
     tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
     branch_id = Column(Integer, ForeignKey("branches.id", ondelete="SET NULL"), nullable=True, index=True)
     capacity = Column(Integer, nullable=False)
+    # Tables sharing a group with consecutive numbers can be pushed together
+    combine_group = Column(String, nullable=True)
     status = Column(Enum(TableStatus), default=TableStatus.AVAILABLE, nullable=False)
     token = Column(String, unique=True, nullable=False, index=True)  # QR code token
     created_at = Column(DateTime(timezone=True), server_default=func.now())
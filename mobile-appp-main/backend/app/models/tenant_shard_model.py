@@ -0,0 +1,16 @@
+"""
+Tenant Shard Model - Danh bạ nhà hàng -> shard (chỉ nằm trên cơ sở dữ liệu mặc định)
+"""
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from app.infrastructure.databases.base import Base
+
+
+class TenantShardModel(Base):
+    __tablename__ = "tenant_shards"
+
+    # No FK: the tenant row itself lives on the shard named here
+    tenant_id = Column(Integer, primary_key=True)
+    shard = Column(String(64), nullable=False, index=True)
+    moved_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
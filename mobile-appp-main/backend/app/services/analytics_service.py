@@ -0,0 +1,279 @@
+"""
+Analytics service - Tổng hợp doanh thu/món bán theo giờ và ngày (cập nhật tăng dần)
+
+Job nền đọc các đơn thay đổi sau mốc high-water (orders.updated_at), tính
+lại những ngày (theo múi giờ của nhà hàng) bị ảnh hưởng và ghi đè các dòng
+tổng hợp của ngày đó. Dashboard chỉ đọc các bảng tổng hợp.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import and_, or_, func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.config import Config
+from app.infrastructure.databases import only_home_tenants, scatter
+from app.infrastructure.databases.shards import DEFAULT_SHARD
+from app.models.analytics_model import SalesRollupModel, DishSalesRollupModel, RollupWatermarkModel
+from app.models.dish_model import DishSnapshotModel
+from app.models.order_history_model import OrderHistoryModel
+from app.models.order_model import OrderModel, OrderStatus
+from app.models.tenant_model import TenantModel
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "sales_rollups"
+PERIODS = ("hour", "day")
+
+
+def tenant_timezone(settings):
+    """Tenant's settings['timezone'], falling back to SERVER_TIMEZONE"""
+    name = (settings or {}).get("timezone") if isinstance(settings, dict) else None
+    try:
+        return ZoneInfo(name or Config.SERVER_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo(Config.SERVER_TIMEZONE)
+
+
+def get_tenant_timezone(session, tenant_id):
+    return tenant_timezone(session.query(TenantModel.settings).filter(TenantModel.id == tenant_id).scalar())
+
+
+def _utc(value):
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def day_bounds(day, tz):
+    """[start, end) of a local day as naive UTC datetimes"""
+    start = datetime(day.year, day.month, day.day, tzinfo=tz)
+    end = datetime.combine(day + timedelta(days=1), datetime.min.time(), tzinfo=tz)
+    return (start.astimezone(timezone.utc).replace(tzinfo=None),
+            end.astimezone(timezone.utc).replace(tzinfo=None))
+
+
+def changed_tenant_days(session, since, until, batch_size=1000):
+    """{tenant_id: {local day}} of orders created or updated in (since, until]"""
+    changed = or_(
+        and_(OrderModel.updated_at > since, OrderModel.updated_at <= until),
+        and_(OrderModel.updated_at.is_(None), OrderModel.created_at > since, OrderModel.created_at <= until)
+    )
+    rows = only_home_tenants(
+        session, session.query(OrderModel.tenant_id, OrderModel.created_at).filter(changed), OrderModel.tenant_id
+    ).yield_per(batch_size)
+
+    created = defaultdict(set)
+    for tenant_id, created_at in rows:
+        if created_at:
+            # UTC offsets are whole quarter hours, so quarter-hour precision keeps local dates exact
+            created_at = _utc(created_at)
+            created[tenant_id].add(created_at.replace(minute=created_at.minute // 15 * 15, second=0, microsecond=0))
+    if not created:
+        return {}
+
+    settings = dict(session.query(TenantModel.id, TenantModel.settings).filter(TenantModel.id.in_(list(created))))
+    days = {}
+    for tenant_id, moments in created.items():
+        tz = tenant_timezone(settings.get(tenant_id))
+        days[tenant_id] = {moment.astimezone(tz).date() for moment in moments}
+    return days
+
+
+def rebuild_tenant_day(session, tenant_id, day, tz):
+    """Recompute every rollup row of one tenant's local day from its paid orders"""
+    start, end = day_bounds(day, tz)
+    lines = session.query(
+        OrderModel.branch_id, OrderModel.guest_id, OrderModel.table_number, OrderModel.quantity,
+        OrderModel.created_at, DishSnapshotModel.dish_id, DishSnapshotModel.name, DishSnapshotModel.price,
+        OrderHistoryModel.visit_key
+    ).join(
+        DishSnapshotModel, DishSnapshotModel.id == OrderModel.dish_snapshot_id
+    ).outerjoin(
+        OrderHistoryModel, OrderHistoryModel.order_id == OrderModel.id
+    ).filter(
+        OrderModel.tenant_id == tenant_id,
+        OrderModel.status == OrderStatus.PAID,
+        OrderModel.created_at >= start,
+        OrderModel.created_at < end
+    ).all()
+
+    buckets = {}
+    dishes = {}
+    for branch_id, guest_id, table_number, quantity, created_at, dish_id, name, price, visit_key in lines:
+        branch_id, dish_id = branch_id or 0, dish_id or 0
+        local = _utc(created_at).astimezone(tz).replace(tzinfo=None)
+        amount = price * quantity
+        # Orders placed before the history read model existed fall back to one bill per table
+        ticket = visit_key or f"table:{table_number}"
+        for period, bucket in (("hour", local.replace(minute=0, second=0, microsecond=0)),
+                               ("day", datetime(day.year, day.month, day.day))):
+            row = buckets.setdefault((branch_id, period, bucket), {
+                "revenue": 0, "orders": 0, "items_sold": 0, "covers": set(), "tickets": set()
+            })
+            row["revenue"] += amount
+            row["orders"] += 1
+            row["items_sold"] += quantity
+            if guest_id:
+                row["covers"].add(guest_id)
+            row["tickets"].add(ticket)
+
+        dish = dishes.setdefault((branch_id, dish_id, name), [0, 0])
+        dish[0] += quantity
+        dish[1] += amount
+
+    day_start = datetime(day.year, day.month, day.day)
+    _upsert(session, SalesRollupModel, ("tenant_id", "branch_id", "period", "bucket"), [{
+        "tenant_id": tenant_id,
+        "branch_id": branch_id,
+        "period": period,
+        "bucket": bucket,
+        "revenue": row["revenue"],
+        "orders": row["orders"],
+        "items_sold": row["items_sold"],
+        "covers": len(row["covers"]),
+        "tickets": len(row["tickets"])
+    } for (branch_id, period, bucket), row in buckets.items()])
+    _upsert(session, DishSalesRollupModel, ("tenant_id", "day", "branch_id", "dish_id", "dish_name"), [{
+        "tenant_id": tenant_id,
+        "branch_id": branch_id,
+        "day": day,
+        "dish_id": dish_id,
+        "dish_name": name,
+        "quantity": quantity,
+        "revenue": revenue
+    } for (branch_id, dish_id, name), (quantity, revenue) in dishes.items()])
+
+    # Rows the day no longer produces (orders refunded or moved to another day)
+    stale = [row_id for row_id, *key in session.query(
+        SalesRollupModel.id, SalesRollupModel.branch_id, SalesRollupModel.period, SalesRollupModel.bucket
+    ).filter(
+        SalesRollupModel.tenant_id == tenant_id,
+        SalesRollupModel.bucket >= day_start,
+        SalesRollupModel.bucket < day_start + timedelta(days=1)
+    ) if tuple(key) not in buckets]
+    if stale:
+        session.query(SalesRollupModel).filter(SalesRollupModel.id.in_(stale)).delete(synchronize_session=False)
+    stale = [row_id for row_id, *key in session.query(
+        DishSalesRollupModel.id, DishSalesRollupModel.branch_id, DishSalesRollupModel.dish_id,
+        DishSalesRollupModel.dish_name
+    ).filter(
+        DishSalesRollupModel.tenant_id == tenant_id,
+        DishSalesRollupModel.day == day
+    ) if tuple(key) not in dishes]
+    if stale:
+        session.query(DishSalesRollupModel).filter(DishSalesRollupModel.id.in_(stale)).delete(synchronize_session=False)
+    return len(lines)
+
+
+def refresh_sales_rollups(full=False):
+    """Scheduled job: rebuild the tenant-days touched since the high-water mark.
+
+    The mark trails now() by ANALYTICS_ROLLUP_LAG so rows from transactions
+    still in flight are picked up by the next run. Each day is committed on
+    its own; rebuilding is idempotent, so a crash only repeats work. Every
+    shard is refreshed against its own mark.
+    """
+    rebuilt = sum(count for _, count in scatter(lambda session: refresh_shard_rollups(session, full)))
+    if rebuilt:
+        logger.info("Rebuilt sales rollups for %d tenant-days", rebuilt)
+    return rebuilt
+
+
+def refresh_shard_rollups(session, full=False):
+    """Rollup refresh for the tenants whose home is the session's shard"""
+    try:
+        watermark = session.get(RollupWatermarkModel, WATERMARK_NAME)
+        since = datetime(1970, 1, 1) if full or not watermark else _utc(watermark.value).replace(tzinfo=None)
+        until = datetime.utcnow() - timedelta(seconds=Config.ANALYTICS_ROLLUP_LAG)
+        if until <= since:
+            return 0
+
+        tenant_days = changed_tenant_days(session, since, until)
+        rebuilt = 0
+        for tenant_id, days in tenant_days.items():
+            tz = get_tenant_timezone(session, tenant_id)
+            for day in sorted(days):
+                rebuild_tenant_day(session, tenant_id, day, tz)
+                session.commit()
+                rebuilt += 1
+
+        if watermark:
+            watermark.value = until
+        else:
+            session.add(RollupWatermarkModel(name=WATERMARK_NAME, value=until))
+        session.commit()
+        return rebuilt
+    except Exception:
+        session.rollback()
+        logger.exception("Sales rollup refresh failed on shard %s", session.info.get("shard", DEFAULT_SHARD))
+        raise
+
+
+def sales_series(session, tenant_id, period, start, end, branch_id=None):
+    """Rollup rows for local buckets in [start, end), summed over branches unless one is given"""
+    query = session.query(
+        SalesRollupModel.bucket,
+        func.sum(SalesRollupModel.revenue),
+        func.sum(SalesRollupModel.orders),
+        func.sum(SalesRollupModel.items_sold),
+        func.sum(SalesRollupModel.covers),
+        func.sum(SalesRollupModel.tickets)
+    ).filter(
+        SalesRollupModel.tenant_id == tenant_id,
+        SalesRollupModel.period == period,
+        SalesRollupModel.bucket >= start,
+        SalesRollupModel.bucket < end
+    )
+    if branch_id:
+        query = query.filter(SalesRollupModel.branch_id == branch_id)
+    rows = query.group_by(SalesRollupModel.bucket).order_by(SalesRollupModel.bucket).all()
+
+    return [{
+        "bucket": bucket.isoformat(),
+        "revenue": int(revenue or 0),
+        "orders": int(orders or 0),
+        "items_sold": int(items_sold or 0),
+        "covers": int(covers or 0),
+        "tickets": int(tickets or 0),
+        "average_ticket": round(revenue / tickets, 2) if tickets else 0
+    } for bucket, revenue, orders, items_sold, covers, tickets in rows]
+
+
+def _upsert(session, model, keys, rows):
+    """INSERT ... ON CONFLICT (keys) DO UPDATE, so concurrent rebuilds of a day cannot duplicate rows"""
+    if not rows:
+        return
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(model).values(rows)
+    values = {column: statement.excluded[column] for column in rows[0] if column not in keys}
+    if "updated_at" in model.__table__.c:
+        values["updated_at"] = func.now()
+    session.execute(statement.on_conflict_do_update(index_elements=list(keys), set_=values))
+
+
+def top_dishes(session, tenant_id, start_day, end_day, branch_id=None, limit=20):
+    """Best-selling dishes over local days [start_day, end_day]"""
+    quantity = func.sum(DishSalesRollupModel.quantity)
+    query = session.query(
+        DishSalesRollupModel.dish_id,
+        func.max(DishSalesRollupModel.dish_name),
+        quantity,
+        func.sum(DishSalesRollupModel.revenue)
+    ).filter(
+        DishSalesRollupModel.tenant_id == tenant_id,
+        DishSalesRollupModel.day >= start_day,
+        DishSalesRollupModel.day <= end_day
+    )
+    if branch_id:
+        query = query.filter(DishSalesRollupModel.branch_id == branch_id)
+    rows = query.group_by(DishSalesRollupModel.dish_id).order_by(quantity.desc()).limit(limit).all()
+
+    return [{
+        "dish_id": dish_id or None,
+        "name": name,
+        "quantity": int(sold or 0),
+        "revenue": int(revenue or 0)
+    } for dish_id, name, sold, revenue in rows]
@@ -0,0 +1,215 @@
+"""
+Customer service - Ghi lịch sử ghé quán và điểm tích lũy sau khi thanh toán
+
+Thanh toán chỉ phát sự kiện "table paid"; một luồng nền gom sự kiện theo lô,
+ghi CustomerHistoryModel + sổ cái điểm và commit một lần cho cả lô.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import NamedTuple, List
+
+from sqlalchemy import insert
+
+from app.config import Config
+from app.infrastructure.databases import new_session, only_home_tenants, scatter, shard_for
+from app.models.customer_history_model import CustomerHistoryModel
+from app.models.dish_model import DishSnapshotModel
+from app.models.loyalty_ledger_model import LoyaltyLedgerModel
+from app.models.order_model import OrderModel, OrderStatus
+from app.services.loyalty_service import record_paid_orders
+
+logger = logging.getLogger(__name__)
+
+
+class TablePaidEvent(NamedTuple):
+    tenant_id: int
+    table_number: int
+    order_ids: List[int]
+    paid_at: datetime
+
+
+def process_table_paid_events(events):
+    """Write history rows and ledger entries for a batch of events.
+
+    Orders live on their tenant's shard, so events are grouped by shard and
+    each group is written in one transaction there.
+    """
+    events_by_shard = defaultdict(list)
+    for event in events:
+        events_by_shard[shard_for(event.tenant_id)].append(event)
+    return sum(_process_shard_events(shard_events) for shard_events in events_by_shard.values())
+
+
+def _process_shard_events(events):
+    order_events = {}
+    for index, event in enumerate(events):
+        for order_id in event.order_ids:
+            order_events[order_id] = index
+
+    session = new_session(events[0].tenant_id)
+    try:
+        # Ledger skips orders already recorded, so a retried batch is not double counted
+        ledger_rows = record_paid_orders(session, list(order_events))
+        if not ledger_rows:
+            session.commit()
+            return 0
+
+        recorded_ids = [row["order_id"] for row in ledger_rows]
+        dish_ids = dict(session.query(OrderModel.id, DishSnapshotModel.dish_id).join(
+            DishSnapshotModel, DishSnapshotModel.id == OrderModel.dish_snapshot_id
+        ).filter(OrderModel.id.in_(recorded_ids)).all())
+
+        # One visit = one customer's orders settled by the same payment
+        visits = defaultdict(list)
+        for row in ledger_rows:
+            visits[(row["customer_id"], order_events[row["order_id"]])].append(row)
+
+        history_rows = []
+        for (customer_id, event_index), rows in visits.items():
+            event = events[event_index]
+            order_ids = sorted(row["order_id"] for row in rows)
+            history_rows.append({
+                "customer_id": customer_id,
+                "tenant_id": event.tenant_id,
+                "order_id": order_ids[0],
+                "dish_ids": sorted({dish_ids[order_id] for order_id in order_ids if dish_ids.get(order_id)}),
+                "total_amount": sum(row["spend_delta"] for row in rows),
+                "visit_date": event.paid_at,
+                "notes": f"Bàn {event.table_number}" if event.table_number else None
+            })
+
+        session.execute(insert(CustomerHistoryModel), history_rows)
+        session.commit()
+        return len(history_rows)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+class CustomerHistoryPipeline:
+    """In-process queue + worker thread that batches table-paid events"""
+
+    def __init__(self, batch_size=None, flush_interval=None, max_retries=None):
+        self.batch_size = batch_size or Config.CUSTOMER_HISTORY_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.CUSTOMER_HISTORY_FLUSH_INTERVAL
+        self.max_retries = max_retries or Config.CUSTOMER_HISTORY_MAX_RETRIES
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="customer-history-pipeline", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        """Stop the worker after draining queued events"""
+        if not self.running:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+
+    def publish(self, event):
+        if self.running:
+            self._queue.put_nowait(event)
+        else:
+            # No worker (tests, CLI): process inline
+            self._process_with_retry([event])
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._process_with_retry(batch)
+
+    def _process_with_retry(self, batch):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                return process_table_paid_events(batch)
+            except Exception:
+                if attempt == self.max_retries:
+                    # Left for the reconcile job to pick up
+                    logger.exception("Customer history batch failed after %s attempts", attempt)
+                    return 0
+                time.sleep(min(30, 0.5 * 2 ** (attempt - 1)))
+
+
+history_pipeline = CustomerHistoryPipeline()
+
+
+def init_customer_history_pipeline(app):
+    """Start the background worker (synchronous processing when disabled or testing)"""
+    if not app.config.get('CUSTOMER_HISTORY_ASYNC') or app.config.get('TESTING'):
+        return None
+    history_pipeline.start()
+    atexit.register(history_pipeline.stop)
+    return history_pipeline
+
+
+def publish_table_paid(tenant_id, table_number, order_ids):
+    """Hand a settled table over to the history pipeline"""
+    history_pipeline.publish(TablePaidEvent(
+        tenant_id=tenant_id,
+        table_number=table_number,
+        order_ids=list(order_ids),
+        paid_at=datetime.utcnow()
+    ))
+
+
+def reconcile_unrecorded_payments(grace_seconds=60, limit=1000):
+    """Scheduled job: record paid member orders whose event was lost (crash, restart)"""
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+
+    def unrecorded(session):
+        query = session.query(
+            OrderModel.id, OrderModel.tenant_id, OrderModel.table_number, OrderModel.updated_at
+        ).outerjoin(
+            LoyaltyLedgerModel, LoyaltyLedgerModel.order_id == OrderModel.id
+        ).filter(
+            OrderModel.status == OrderStatus.PAID,
+            OrderModel.customer_id.isnot(None),
+            LoyaltyLedgerModel.id.is_(None),
+            OrderModel.updated_at < cutoff
+        )
+        return only_home_tenants(session, query, OrderModel.tenant_id).limit(limit).all()
+
+    tables = defaultdict(list)
+    for _, rows in scatter(unrecorded):
+        for order_id, tenant_id, table_number, updated_at in rows:
+            tables[(tenant_id, table_number)].append((order_id, updated_at))
+
+    events = [
+        TablePaidEvent(tenant_id, table_number, [order_id for order_id, _ in orders], max(at for _, at in orders))
+        for (tenant_id, table_number), orders in tables.items()
+    ]
+    return process_table_paid_events(events) if events else 0
@@ -0,0 +1,118 @@
+"""
+Export service - Xuất đơn hàng dạng luồng (CSV/NDJSON, tùy chọn gzip) với bộ nhớ cố định
+"""
+import csv
+import io
+import json
+import zlib
+
+from sqlalchemy import select
+
+from app.config import Config
+from app.infrastructure.databases import new_session
+from app.models.dish_model import DishSnapshotModel
+from app.models.order_model import OrderModel
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+EXPORT_COLUMNS = (
+    ("id", OrderModel.id),
+    ("created_at", OrderModel.created_at),
+    ("updated_at", OrderModel.updated_at),
+    ("status", OrderModel.status),
+    ("branch_id", OrderModel.branch_id),
+    ("table_number", OrderModel.table_number),
+    ("guest_id", OrderModel.guest_id),
+    ("customer_id", OrderModel.customer_id),
+    ("order_handler_id", OrderModel.order_handler_id),
+    ("dish_id", DishSnapshotModel.dish_id),
+    ("dish_name", DishSnapshotModel.name),
+    ("category", DishSnapshotModel.category),
+    ("unit_price", DishSnapshotModel.price),
+    ("quantity", OrderModel.quantity),
+    ("notes", OrderModel.notes),
+)
+EXPORT_FIELDS = [name for name, _ in EXPORT_COLUMNS]
+
+
+def export_statement(tenant_id, filters=()):
+    """Orders joined with their snapshots in one SELECT, ordered by id"""
+    statement = select(*[column for _, column in EXPORT_COLUMNS]).join(
+        DishSnapshotModel, DishSnapshotModel.id == OrderModel.dish_snapshot_id
+    ).where(OrderModel.tenant_id == tenant_id)
+    for criterion in filters:
+        statement = statement.where(criterion)
+    return statement.order_by(OrderModel.id)
+
+
+def _record(row):
+    record = dict(zip(EXPORT_FIELDS, row))
+    for key in ("created_at", "updated_at"):
+        if record[key] is not None:
+            record[key] = record[key].isoformat()
+    record["status"] = record["status"].value if record["status"] else None
+    record["total"] = (record["unit_price"] or 0) * (record["quantity"] or 0)
+    return record
+
+
+def stream_rows(tenant_id, filters=(), batch_size=None):
+    """Yield export records from a server-side cursor; the session lives as long as the generator"""
+    batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+    session = new_session()
+    try:
+        result = session.execute(
+            export_statement(tenant_id, filters).execution_options(stream_results=True, yield_per=batch_size)
+        )
+        for row in result:
+            yield _record(row)
+    finally:
+        session.close()
+
+
+def csv_chunks(records, rows_per_chunk=500):
+    """Encode records as CSV, one bytes chunk per `rows_per_chunk` rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS + ["total"], extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def ndjson_chunks(records, rows_per_chunk=500):
+    """Encode records as newline-delimited JSON"""
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record, ensure_ascii=False))
+        if len(lines) >= rows_per_chunk:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a byte stream on the fly (wbits=31 writes the gzip header and trailer)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_orders(tenant_id, export_format="csv", filters=(), compress=False):
+    """Byte-chunk generator for an orders export"""
+    records = stream_rows(tenant_id, filters)
+    chunks = csv_chunks(records) if export_format == "csv" else ndjson_chunks(records)
+    return gzip_chunks(chunks) if compress else chunks
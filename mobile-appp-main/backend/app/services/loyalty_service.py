@@ -0,0 +1,124 @@
+"""
+Loyalty service - Sổ cái điểm/chi tiêu và tính hạng thành viên
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from sqlalchemy import insert, update, case, literal
+
+from app.config import Config
+from app.models.customer_model import CustomerModel, MembershipTier
+from app.models.dish_model import DishSnapshotModel
+from app.models.loyalty_ledger_model import LoyaltyLedgerModel
+from app.models.order_model import OrderModel
+
+# Tiers in ascending order, parallel to Config.MEMBERSHIP_TIER_THRESHOLDS
+TIERS = [MembershipTier.IRON, MembershipTier.SILVER, MembershipTier.GOLD, MembershipTier.DIAMOND]
+TIER_THRESHOLDS = sorted(Config.MEMBERSHIP_TIER_THRESHOLDS)
+POINT_RATES = dict(zip(TIERS, Config.MEMBERSHIP_POINT_RATES))
+
+ORDER_PAID = "order_paid"
+
+
+def tier_for_spending(total_spending):
+    """Membership tier for a total spending (binary search over thresholds)"""
+    index = bisect_right(TIER_THRESHOLDS, total_spending) - 1
+    return TIERS[max(0, index)]
+
+
+def next_tier_for_spending(total_spending):
+    """(next tier, spending still needed) or (None, 0) at the top tier"""
+    index = bisect_right(TIER_THRESHOLDS, total_spending)
+    if index >= len(TIERS):
+        return None, 0
+    return TIERS[index], max(0, TIER_THRESHOLDS[index] - total_spending)
+
+
+def points_for_amount(tier, amount):
+    """Points earned for an amount at the given tier's rate"""
+    return int(amount * POINT_RATES.get(tier, 0))
+
+
+def record_paid_orders(session, order_ids):
+    """Append ledger entries for paid member orders and update customers.
+
+    Runs inside the caller's transaction. Orders without a customer and
+    orders that already have a ledger entry are skipped, so replaying the
+    same payment is harmless. Returns the ledger rows written.
+    """
+    if not order_ids:
+        return []
+
+    lines = []
+    for start in range(0, len(order_ids), Config.LOYALTY_LEDGER_BATCH_SIZE):
+        chunk = order_ids[start:start + Config.LOYALTY_LEDGER_BATCH_SIZE]
+        lines.extend(session.query(
+            OrderModel.id,
+            OrderModel.customer_id,
+            OrderModel.tenant_id,
+            (DishSnapshotModel.price * OrderModel.quantity).label('amount')
+        ).join(
+            DishSnapshotModel, DishSnapshotModel.id == OrderModel.dish_snapshot_id
+        ).outerjoin(
+            LoyaltyLedgerModel, LoyaltyLedgerModel.order_id == OrderModel.id
+        ).filter(
+            OrderModel.id.in_(chunk),
+            OrderModel.customer_id.isnot(None),
+            LoyaltyLedgerModel.id.is_(None)
+        ).all())
+
+    if not lines:
+        return []
+
+    lines_by_customer = defaultdict(list)
+    for line in lines:
+        lines_by_customer[line.customer_id].append(line)
+
+    customers = session.query(CustomerModel).filter(
+        CustomerModel.id.in_(list(lines_by_customer))
+    ).with_for_update().all()
+
+    ledger_rows = []
+    for customer in customers:
+        total_spending = customer.total_spending or 0
+        points = customer.points or 0
+        tier = customer.membership_tier
+
+        # Apply each order in turn so a tier upgrade mid-batch earns the new rate
+        for line in lines_by_customer[customer.id]:
+            earned = points_for_amount(tier, line.amount)
+            ledger_rows.append({
+                "customer_id": customer.id,
+                "tenant_id": line.tenant_id,
+                "order_id": line.id,
+                "spend_delta": float(line.amount),
+                "points_delta": earned,
+                "reason": ORDER_PAID
+            })
+            total_spending += line.amount
+            points += earned
+            tier = tier_for_spending(total_spending)
+
+        customer.total_spending = total_spending
+        customer.points = points
+        customer.membership_tier = tier
+
+    for start in range(0, len(ledger_rows), Config.LOYALTY_LEDGER_BATCH_SIZE):
+        session.execute(insert(LoyaltyLedgerModel), ledger_rows[start:start + Config.LOYALTY_LEDGER_BATCH_SIZE])
+
+    return ledger_rows
+
+
+def recompute_all_tiers(session):
+    """Recompute every customer's tier with one set-based UPDATE ... CASE"""
+    tier_type = CustomerModel.__table__.c.membership_tier.type
+    whens = [
+        (CustomerModel.total_spending >= threshold, literal(tier, tier_type))
+        for threshold, tier in reversed(list(zip(TIER_THRESHOLDS, TIERS)))
+        if tier != TIERS[0]
+    ]
+    result = session.execute(
+        update(CustomerModel).values(
+            membership_tier=case(*whens, else_=literal(TIERS[0], tier_type))
+        ).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,180 @@
+"""
+Metrics service - Đếm xấp xỉ khách, thành viên và bàn hoạt động theo ngày (HyperLogLog)
+
+Sự kiện được gom vào sketch trong bộ nhớ rồi định kỳ gộp (max theo register)
+vào bảng hll_sketches, cả dòng của nhà hàng lẫn dòng tổng toàn nền tảng.
+"""
+import atexit
+import logging
+import threading
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.exc import IntegrityError
+
+from app.config import Config
+from app.infrastructure.databases import get_session
+from app.models.hll_sketch_model import HllSketchModel, PLATFORM_TENANT_ID
+from app.utils.hyperloglog import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("guests", "customers", "tables")
+
+
+def local_today():
+    return datetime.now(ZoneInfo(Config.SERVER_TIMEZONE)).date()
+
+
+class UniqueCounterBuffer:
+    """Pending sketches per (metric, tenant, day), bounded by active tenants x metrics"""
+
+    def __init__(self, precision=None):
+        self.precision = precision or Config.HLL_PRECISION
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._exit_hook = False
+
+    def add(self, metric, tenant_id, value, day=None):
+        key = (metric, tenant_id, day or local_today())
+        with self._lock:
+            sketch = self._pending.get(key)
+            if sketch is None:
+                sketch = self._pending[key] = HyperLogLog(self.precision)
+                if not self._exit_hook:
+                    atexit.register(self.flush)
+                    self._exit_hook = True
+            sketch.add(value)
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, pending):
+        """Put back sketches that failed to flush, merging with newer ones"""
+        with self._lock:
+            for key, sketch in pending.items():
+                current = self._pending.get(key)
+                self._pending[key] = current.merge(sketch) if current else sketch
+
+    def flush(self):
+        """Merge pending sketches into their tenant rows and the platform rows"""
+        pending = self.drain()
+        if not pending:
+            return 0
+
+        merged = {}
+        for (metric, tenant_id, day), sketch in pending.items():
+            merged[(metric, tenant_id, day)] = sketch
+            platform_key = (metric, PLATFORM_TENANT_ID, day)
+            platform = merged.get(platform_key)
+            merged[platform_key] = HyperLogLog(self.precision).merge(sketch) if platform is None else platform.merge(sketch)
+
+        session = get_session()
+        try:
+            # Sorted keys give concurrent flushers the same lock order
+            for key in sorted(merged):
+                merge_sketch(session, *key, merged[key])
+            session.commit()
+            return len(pending)
+        except Exception:
+            session.rollback()
+            self.restore(pending)
+            logger.exception("Unique counter flush failed; will retry")
+            return 0
+        finally:
+            session.close()
+
+
+def merge_sketch(session, metric, tenant_id, day, sketch):
+    """Register-max merge into the stored row (created on first use)"""
+    row = session.query(HllSketchModel).filter(
+        HllSketchModel.metric == metric,
+        HllSketchModel.tenant_id == tenant_id,
+        HllSketchModel.day == day
+    ).with_for_update().first()
+
+    if row is None:
+        try:
+            with session.begin_nested():
+                session.add(HllSketchModel(
+                    metric=metric,
+                    tenant_id=tenant_id,
+                    day=day,
+                    precision=sketch.precision,
+                    registers=sketch.to_bytes()
+                ))
+            return
+        except IntegrityError:
+            # Another worker created it meanwhile
+            row = session.query(HllSketchModel).filter(
+                HllSketchModel.metric == metric,
+                HllSketchModel.tenant_id == tenant_id,
+                HllSketchModel.day == day
+            ).with_for_update().one()
+
+    stored = HyperLogLog.from_bytes(row.registers, row.precision)
+    row.registers = stored.merge(sketch).to_bytes()
+
+
+unique_counters = UniqueCounterBuffer()
+
+
+def track_unique(metric, tenant_id, value):
+    """Count `value` once per day for the metric; cheap and never raises"""
+    if value is None or tenant_id is None:
+        return
+    try:
+        unique_counters.add(metric, tenant_id, value)
+    except Exception:
+        logger.exception("Unique counter update failed")
+
+
+def track_order_activity(tenant_id, orders):
+    """Active tables, members and guests behind a committed order batch"""
+    for order in orders:
+        # Table numbers repeat across tenants, so qualify them for the platform union
+        if order.table_number is not None:
+            track_unique("tables", tenant_id, f"{tenant_id}:{order.table_number}")
+        track_unique("customers", tenant_id, order.customer_id)
+        track_unique("guests", tenant_id, order.guest_id)
+
+
+def flush_unique_counters():
+    return unique_counters.flush()
+
+
+def unique_metrics(session, start_day, end_day, tenant_id=None):
+    """Daily and whole-range distinct counts per metric.
+
+    Reads one sketch per metric and day (the platform row unless a tenant
+    is given), so memory is bounded by days x metrics x 2^precision bytes.
+    """
+    rows = session.query(
+        HllSketchModel.metric, HllSketchModel.day, HllSketchModel.precision, HllSketchModel.registers
+    ).filter(
+        HllSketchModel.tenant_id == (tenant_id or PLATFORM_TENANT_ID),
+        HllSketchModel.day >= start_day,
+        HllSketchModel.day <= end_day
+    ).all()
+
+    daily = {}
+    totals = {}
+    for metric, day, precision, registers in rows:
+        sketch = HyperLogLog.from_bytes(registers, precision)
+        daily.setdefault(day, {})[metric] = sketch.count()
+        total = totals.get(metric)
+        totals[metric] = HyperLogLog(precision).merge(sketch) if total is None else total.merge(sketch)
+
+    days = []
+    day = start_day
+    while day <= end_day:
+        counts = daily.get(day, {})
+        days.append({"date": day.isoformat(), **{metric: counts.get(metric, 0) for metric in METRICS}})
+        day += timedelta(days=1)
+
+    return {
+        "days": days,
+        "totals": {metric: totals[metric].count() if metric in totals else 0 for metric in METRICS}
+    }
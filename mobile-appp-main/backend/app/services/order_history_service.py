@@ -0,0 +1,100 @@
+"""
+Order history service - Ghi và đọc bản đọc lịch sử gọi món
+"""
+import uuid
+from datetime import datetime
+from sqlalchemy import insert, update, or_, and_
+
+from app.models.order_history_model import OrderHistoryModel
+
+
+def record_order_lines(session, orders):
+    """Append one history line per (order, snapshot) pair.
+
+    Orders must be flushed so they have ids. Runs inside the caller's transaction.
+    """
+    if not orders:
+        return
+    now = datetime.utcnow()
+    session.execute(insert(OrderHistoryModel), [{
+        "tenant_id": order.tenant_id,
+        "guest_id": order.guest_id,
+        "customer_id": order.customer_id,
+        "order_id": order.id,
+        "table_number": order.table_number,
+        "dish_id": snapshot.dish_id,
+        "dish_name": snapshot.name,
+        "dish_image": snapshot.image,
+        "price": snapshot.price,
+        "quantity": order.quantity,
+        "notes": order.notes,
+        "created_at": order.created_at or now
+    } for order, snapshot in orders])
+
+
+def mark_lines_paid(session, order_ids, paid_at=None):
+    """Close a visit: stamp all lines of a payment with one visit key"""
+    if not order_ids:
+        return None
+    visit_key = uuid.uuid4().hex
+    session.execute(
+        update(OrderHistoryModel).where(
+            OrderHistoryModel.order_id.in_(order_ids)
+        ).values(
+            visit_key=visit_key,
+            paid_at=paid_at or datetime.utcnow()
+        ).execution_options(synchronize_session=False)
+    )
+    return visit_key
+
+
+def get_history_page(session, owner_column, owner_id, cursor_values=None, limit=20):
+    """One page of history lines (newest first) grouped into visits.
+
+    cursor_values is the parsed (created_at datetime, id) of the last line of
+    the previous page. Cost is O(limit) thanks to the (owner, created_at, id) index.
+    """
+    query = session.query(OrderHistoryModel).filter(owner_column == owner_id)
+
+    if cursor_values:
+        cursor_created_at, cursor_id = cursor_values
+        query = query.filter(or_(
+            OrderHistoryModel.created_at < cursor_created_at,
+            and_(OrderHistoryModel.created_at == cursor_created_at, OrderHistoryModel.id < cursor_id)
+        ))
+
+    lines = query.order_by(
+        OrderHistoryModel.created_at.desc(), OrderHistoryModel.id.desc()
+    ).limit(limit + 1).all()
+
+    has_more = len(lines) > limit
+    lines = lines[:limit]
+
+    # Lines of one visit are contiguous in time order; unpaid lines form the current visit
+    visits = []
+    for line in lines:
+        if not visits or visits[-1]["visitKey"] != line.visit_key:
+            visits.append({
+                "visitKey": line.visit_key,
+                "tenantId": line.tenant_id,
+                "tableNumber": line.table_number,
+                "paidAt": line.paid_at.isoformat() if line.paid_at else None,
+                "totalAmount": 0,
+                "items": []
+            })
+        visit = visits[-1]
+        visit["totalAmount"] += line.price * line.quantity
+        visit["items"].append({
+            "orderId": line.order_id,
+            "dishId": line.dish_id,
+            "dishName": line.dish_name,
+            "dishImage": line.dish_image,
+            "quantity": line.quantity,
+            "notes": line.notes,
+            "price": line.price,
+            "totalPrice": line.price * line.quantity,
+            "createdAt": line.created_at.isoformat()
+        })
+
+    last = lines[-1] if has_more else None
+    return visits, (last.created_at, last.id) if last else None
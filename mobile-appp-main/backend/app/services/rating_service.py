@@ -0,0 +1,196 @@
+"""
+Rating service - Duy trì thống kê đánh giá theo nhà hàng và theo món
+"""
+from collections import defaultdict
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from app.infrastructure.databases import get_session
+from app.models.review_model import ReviewModel
+from app.models.dish_model import DishModel
+from app.models.rating_stats_model import TenantRatingStatsModel, DishRatingStatsModel
+
+DISH_STATS_COLUMNS = (
+    "rating_count", "rating_sum", "rating_1", "rating_2", "rating_3", "rating_4", "rating_5"
+)
+
+
+def parse_dish_ratings(dish_ratings):
+    """Normalize ReviewModel.dish_ratings to {dish_id: rating}.
+
+    Accepts {"<dish_id>": rating} or [{"dish_id": ..., "rating": ...}];
+    entries that are not a 1-5 rating for an integer dish id are ignored.
+    """
+    if isinstance(dish_ratings, dict):
+        items = dish_ratings.items()
+    elif isinstance(dish_ratings, list):
+        items = [(item.get('dish_id'), item.get('rating')) for item in dish_ratings if isinstance(item, dict)]
+    else:
+        return {}
+
+    ratings = {}
+    for dish_id, rating in items:
+        try:
+            dish_id, rating = int(dish_id), int(rating)
+        except (TypeError, ValueError):
+            continue
+        if 1 <= rating <= 5:
+            ratings[dish_id] = rating
+    return ratings
+
+
+def review_state(review):
+    """Snapshot of the fields that feed rating aggregates"""
+    if review is None:
+        return None
+    return {
+        "tenant_id": review.tenant_id,
+        "rating": review.rating,
+        "dish_ratings": parse_dish_ratings(review.dish_ratings)
+    }
+
+
+def touches_dish_ratings(old_state, new_state):
+    """Whether a review change moves any dish's rating summary"""
+    return any(state and state["dish_ratings"] for state in (old_state, new_state))
+
+
+def apply_review_change(session, old_state, new_state):
+    """Apply the delta between two review states to the aggregates.
+
+    old_state is None for a new review, new_state is None for a deleted one.
+    Runs inside the caller's transaction.
+    """
+    tenant_id = (new_state or old_state)["tenant_id"]
+    count_delta = (1 if new_state else 0) - (1 if old_state else 0)
+    sum_delta = (new_state["rating"] if new_state else 0) - (old_state["rating"] if old_state else 0)
+
+    if count_delta or sum_delta:
+        _apply_tenant_delta(session, tenant_id, count_delta, sum_delta)
+
+    old_dishes = old_state["dish_ratings"] if old_state else {}
+    new_dishes = new_state["dish_ratings"] if new_state else {}
+
+    # Only dishes whose rating actually changed are touched
+    for dish_id in old_dishes.keys() | new_dishes.keys():
+        old_rating, new_rating = old_dishes.get(dish_id), new_dishes.get(dish_id)
+        if old_rating != new_rating:
+            _apply_dish_delta(session, tenant_id, dish_id, old_rating, new_rating)
+
+
+def _apply_tenant_delta(session, tenant_id, count_delta, sum_delta):
+    stats = session.get(TenantRatingStatsModel, tenant_id)
+    if stats is None:
+        try:
+            with session.begin_nested():
+                session.add(TenantRatingStatsModel(
+                    tenant_id=tenant_id,
+                    review_count=max(0, count_delta),
+                    rating_sum=max(0, sum_delta)
+                ))
+            return
+        except IntegrityError:
+            # A concurrent first review created the row meanwhile
+            stats = session.get(TenantRatingStatsModel, tenant_id)
+
+    # Increment in SQL so concurrent writers don't overwrite each other
+    stats.review_count = TenantRatingStatsModel.review_count + count_delta
+    stats.rating_sum = TenantRatingStatsModel.rating_sum + sum_delta
+
+
+def _apply_dish_delta(session, tenant_id, dish_id, old_rating, new_rating):
+    deltas = defaultdict(int)
+    if old_rating is not None:
+        deltas["rating_count"] -= 1
+        deltas["rating_sum"] -= old_rating
+        deltas[f"rating_{old_rating}"] -= 1
+    if new_rating is not None:
+        deltas["rating_count"] += 1
+        deltas["rating_sum"] += new_rating
+        deltas[f"rating_{new_rating}"] += 1
+
+    stats = session.get(DishRatingStatsModel, dish_id)
+    if stats is None:
+        # Skip ratings for unknown dishes or dishes of another restaurant
+        dish = session.get(DishModel, dish_id) if new_rating is not None else None
+        if not dish or dish.tenant_id != tenant_id:
+            return
+        try:
+            with session.begin_nested():
+                session.add(DishRatingStatsModel(
+                    dish_id=dish_id,
+                    tenant_id=tenant_id,
+                    **{column: max(0, deltas[column]) for column in DISH_STATS_COLUMNS}
+                ))
+            return
+        except IntegrityError:
+            stats = session.get(DishRatingStatsModel, dish_id)
+
+    for column, delta in deltas.items():
+        if delta:
+            setattr(stats, column, getattr(DishRatingStatsModel, column) + delta)
+
+
+def backfill_tenant_rating_stats():
+    """Rebuild tenant rating stats from the reviews table"""
+    session = get_session()
+    try:
+        rows = session.query(
+            ReviewModel.tenant_id,
+            func.count(ReviewModel.id),
+            func.coalesce(func.sum(ReviewModel.rating), 0)
+        ).group_by(ReviewModel.tenant_id).all()
+
+        session.query(TenantRatingStatsModel).delete(synchronize_session=False)
+        session.add_all([
+            TenantRatingStatsModel(tenant_id=tenant_id, review_count=count, rating_sum=int(rating_sum))
+            for tenant_id, count, rating_sum in rows
+        ])
+        session.commit()
+        return len(rows)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def backfill_dish_rating_stats(batch_size=1000):
+    """Rebuild per-dish rating stats by streaming every review's dish_ratings"""
+    session = get_session()
+    try:
+        dish_tenants = {}
+        histograms = defaultdict(lambda: [0, 0, 0, 0, 0])
+
+        reviews = session.query(ReviewModel.tenant_id, ReviewModel.dish_ratings).filter(
+            ReviewModel.dish_ratings.isnot(None)
+        ).yield_per(batch_size)
+
+        for tenant_id, dish_ratings in reviews:
+            for dish_id, rating in parse_dish_ratings(dish_ratings).items():
+                dish_tenants.setdefault(dish_id, tenant_id)
+                histograms[dish_id][rating - 1] += 1
+
+        # Ratings can reference dishes that were deleted since
+        existing_ids = set()
+        dish_ids = list(dish_tenants)
+        for start in range(0, len(dish_ids), batch_size):
+            existing_ids.update(row[0] for row in session.query(DishModel.id).filter(
+                DishModel.id.in_(dish_ids[start:start + batch_size])
+            ))
+
+        session.query(DishRatingStatsModel).delete(synchronize_session=False)
+        session.bulk_insert_mappings(DishRatingStatsModel, [{
+            "dish_id": dish_id,
+            "tenant_id": dish_tenants[dish_id],
+            "rating_count": sum(histogram),
+            "rating_sum": sum((i + 1) * n for i, n in enumerate(histogram)),
+            **{f"rating_{i + 1}": n for i, n in enumerate(histogram)}
+        } for dish_id, histogram in histograms.items() if dish_id in existing_ids])
+        session.commit()
+        return len(existing_ids)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
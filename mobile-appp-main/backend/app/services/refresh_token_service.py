@@ -0,0 +1,132 @@
+"""
+Refresh token store - Lưu refresh token theo digest cố định
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select
+
+from app.config import Config
+from app.infrastructure.databases import get_session
+from app.models.refresh_token_model import RefreshTokenModel
+from app.utils.helpers import hash_string
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseRefreshTokenStore:
+    """Refresh tokens in the refresh_tokens table, keyed by SHA-256 digest"""
+
+    def save(self, session, token, account_id, expires_at):
+        session.add(RefreshTokenModel(
+            token_hash=hash_string(token),
+            account_id=account_id,
+            expires_at=expires_at
+        ))
+
+    def is_valid(self, session, token):
+        token_model = session.get(RefreshTokenModel, hash_string(token))
+        if not token_model:
+            return False
+
+        expires_at = token_model.expires_at
+        if expires_at.tzinfo:
+            expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+        return expires_at >= datetime.utcnow()
+
+    def revoke(self, session, token):
+        session.execute(
+            delete(RefreshTokenModel).where(RefreshTokenModel.token_hash == hash_string(token))
+        )
+
+    def consume(self, session, token):
+        """Revoke a valid token for rotation; True only for the one caller whose delete removed it"""
+        result = session.execute(
+            delete(RefreshTokenModel).where(
+                RefreshTokenModel.token_hash == hash_string(token),
+                RefreshTokenModel.expires_at >= datetime.utcnow()
+            )
+        )
+        return result.rowcount == 1
+
+    def purge_expired(self, batch_size=None):
+        """Delete expired tokens in chunks so one sweep never locks the whole table"""
+        batch_size = batch_size or Config.REFRESH_TOKEN_PURGE_BATCH_SIZE
+        total = 0
+
+        while True:
+            session = get_session()
+            try:
+                expired_hashes = session.execute(
+                    select(RefreshTokenModel.token_hash).where(
+                        RefreshTokenModel.expires_at < datetime.utcnow()
+                    ).limit(batch_size)
+                ).scalars().all()
+
+                if not expired_hashes:
+                    break
+
+                session.execute(
+                    delete(RefreshTokenModel).where(RefreshTokenModel.token_hash.in_(expired_hashes))
+                )
+                session.commit()
+                total += len(expired_hashes)
+
+                if len(expired_hashes) < batch_size:
+                    break
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+        return total
+
+
+class RedisRefreshTokenStore:
+    """Refresh tokens in Redis with native TTL - no sweeper needed"""
+
+    key_prefix = "refresh_token:"
+
+    def _key(self, token):
+        return f"{self.key_prefix}{hash_string(token)}"
+
+    def _client(self):
+        from app.infrastructure.redis import get_redis_client
+        return get_redis_client()
+
+    def save(self, session, token, account_id, expires_at):
+        ttl = max(1, int((expires_at - datetime.utcnow()).total_seconds()))
+        self._client().set(self._key(token), account_id, ex=ttl)
+
+    def is_valid(self, session, token):
+        return self._client().exists(self._key(token)) == 1
+
+    def revoke(self, session, token):
+        self._client().delete(self._key(token))
+
+    def consume(self, session, token):
+        """Revoke a valid token for rotation; True only for the one caller whose delete removed it"""
+        return self._client().delete(self._key(token)) == 1
+
+    def purge_expired(self, batch_size=None):
+        return 0
+
+
+def get_refresh_token_store():
+    """Get refresh token store configured by REFRESH_TOKEN_STORE"""
+    if Config.REFRESH_TOKEN_STORE == 'redis':
+        return RedisRefreshTokenStore()
+    return DatabaseRefreshTokenStore()
+
+
+def refresh_token_expires_at():
+    """Expiry time for a newly issued refresh token"""
+    return datetime.utcnow() + timedelta(seconds=Config.REFRESH_TOKEN_EXPIRES_IN)
+
+
+def purge_expired_refresh_tokens():
+    """Scheduled job: remove expired refresh tokens"""
+    deleted = get_refresh_token_store().purge_expired()
+    if deleted:
+        logger.info("Purged %s expired refresh tokens", deleted)
+    return deleted
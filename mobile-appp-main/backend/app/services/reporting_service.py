@@ -0,0 +1,168 @@
+"""
+Reporting service - Báo cáo doanh thu, món bán chạy và heatmap theo giờ từ snapshot cột (NumPy)
+
+Chỉ đọc các phân đoạn do snapshot_service ghi ra; không truy vấn Postgres.
+"""
+import json
+import os
+from datetime import date, datetime, timezone
+
+from app.services.snapshot_service import COLUMNS, month_key, segment_path, shift_month
+from app.utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+SECONDS_PER_DAY = 86400
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def _local_epoch(day):
+    """Wall-clock epoch seconds of a local date's midnight (matches the local_time column)"""
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp())
+
+
+def load_segments(tenant_id, start_day, end_day, base_dir=None):
+    """Memory-mapped columns of each month covering [start_day, end_day].
+
+    Returns (segments, dish_names, months_missing); every segment is a
+    {column: array} dict still backed by its files, not copied into memory.
+    """
+    segments = []
+    dish_names = {}
+    missing = []
+
+    year, month = start_day.year, start_day.month
+    while (year, month) <= (end_day.year, end_day.month):
+        path = segment_path(tenant_id, month_key(year, month), base_dir)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            dish_names.update({int(dish_id): name for dish_id, name in meta["dish_names"].items()})
+            segments.append({
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in COLUMNS
+            })
+        else:
+            missing.append(month_key(year, month))
+        year, month = shift_month(year, month, 1)
+    return segments, dish_names, missing
+
+
+def _select(columns, start, end, branch_id=None):
+    """Rows of one segment with local_time in [start, end) (and of the branch)"""
+    local_time = columns["local_time"]
+    mask = (local_time >= start) & (local_time < end)
+    if branch_id is not None:
+        mask &= columns["branch_id"] == branch_id
+    if mask.all():
+        return columns
+    return {name: values[mask] for name, values in columns.items()}
+
+
+class ReportAggregator:
+    """Revenue, top-dish and heatmap partials added one segment at a time.
+
+    Only per-day, per-dish and 7x24 sums are kept between segments, so a
+    long range never holds more than one month of rows in memory.
+    """
+
+    def __init__(self, start_day, end_day):
+        self.start_day = start_day
+        self.days = (end_day - start_day).days + 1
+        self.origin = _local_epoch(start_day)
+        self.total_revenue = 0
+        self.total_items = 0
+        self.order_lines = 0
+        self.daily_revenue = np.zeros(self.days)
+        self.daily_items = np.zeros(self.days)
+        self.daily_orders = np.zeros(self.days, dtype=np.int64)
+        self.dish_parts = []
+        self.heatmap_revenue = np.zeros((7, 24), dtype=np.int64)
+        self.heatmap_orders = np.zeros((7, 24), dtype=np.int64)
+
+    def add(self, columns):
+        local_time = columns["local_time"]
+        amounts = columns["price"] * columns["quantity"]
+        quantity = columns["quantity"].astype(np.int64)
+
+        # Revenue per local day
+        day_index = (local_time - self.origin) // SECONDS_PER_DAY
+        self.total_revenue += int(amounts.sum())
+        self.total_items += int(quantity.sum())
+        self.order_lines += int(amounts.size)
+        self.daily_revenue += np.bincount(day_index, weights=amounts, minlength=self.days)
+        self.daily_items += np.bincount(day_index, weights=quantity, minlength=self.days)
+        self.daily_orders += np.bincount(day_index, minlength=self.days)
+
+        # Dishes: per-segment sums, merged in top_dishes()
+        dish_ids, inverse = np.unique(columns["dish_id"], return_inverse=True)
+        self.dish_parts.append((
+            dish_ids,
+            np.bincount(inverse, weights=quantity, minlength=dish_ids.size),
+            np.bincount(inverse, weights=amounts, minlength=dish_ids.size)
+        ))
+
+        # Weekday x hour; 1970-01-01 was a Thursday
+        hours = (local_time // 3600) % 24
+        weekdays = (local_time // SECONDS_PER_DAY + 3) % 7
+        np.add.at(self.heatmap_revenue, (weekdays, hours), amounts)
+        np.add.at(self.heatmap_orders, (weekdays, hours), 1)
+
+    def revenue(self):
+        """Totals plus a per-day revenue/items series"""
+        return {
+            "total_revenue": self.total_revenue,
+            "total_items_sold": self.total_items,
+            "order_lines": self.order_lines,
+            "daily": [{
+                "date": date.fromordinal(self.start_day.toordinal() + i).isoformat(),
+                "revenue": int(self.daily_revenue[i]),
+                "items_sold": int(self.daily_items[i]),
+                "orders": int(self.daily_orders[i])
+            } for i in range(self.days)]
+        }
+
+    def top_dishes(self, dish_names, limit=20):
+        """Dishes ranked by quantity sold"""
+        if not self.dish_parts:
+            return []
+        dish_ids, inverse = np.unique(np.concatenate([ids for ids, _, _ in self.dish_parts]), return_inverse=True)
+        quantity = np.bincount(
+            inverse, weights=np.concatenate([part for _, part, _ in self.dish_parts]), minlength=dish_ids.size
+        )
+        revenue = np.bincount(
+            inverse, weights=np.concatenate([part for _, _, part in self.dish_parts]), minlength=dish_ids.size
+        )
+        order = np.argsort(-quantity, kind="stable")[:limit]
+
+        return [{
+            "dish_id": int(dish_ids[i]) if dish_ids[i] >= 0 else None,
+            "name": dish_names.get(int(dish_ids[i])),
+            "quantity": int(quantity[i]),
+            "revenue": int(revenue[i])
+        } for i in order]
+
+    def heatmap(self):
+        """7x24 revenue and order-line matrices (Monday first, local hours)"""
+        return {
+            "weekdays": list(WEEKDAYS),
+            "revenue": self.heatmap_revenue.tolist(),
+            "orders": self.heatmap_orders.tolist()
+        }
+
+
+def build_report(tenant_id, start_day, end_day, branch_id=None, limit=20, base_dir=None):
+    """Revenue, top dishes and hourly heatmap for local days [start_day, end_day]"""
+    segments, dish_names, missing = load_segments(tenant_id, start_day, end_day, base_dir)
+    start, end = _local_epoch(start_day), _local_epoch(end_day) + SECONDS_PER_DAY
+    report = ReportAggregator(start_day, end_day)
+    for columns in segments:
+        report.add(_select(columns, start, end, branch_id))
+    return {
+        "from": start_day.isoformat(),
+        "to": end_day.isoformat(),
+        "revenue": report.revenue(),
+        "top_dishes": report.top_dishes(dish_names, limit),
+        "heatmap": report.heatmap(),
+        "missing_months": missing
+    }
@@ -0,0 +1,357 @@
+"""
+Reservation service - Khoảng thời gian đặt bàn, kiểm tra trùng lịch và bàn trống
+"""
+import threading
+import time as _time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.config import Config
+from app.models.reservation_model import ReservationModel, ReservationStatus, ReservationTableModel
+from app.models.table_model import TableModel
+
+
+class ReservationError(Exception):
+    """Reservation cannot be made as requested"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def local_timezone():
+    return ZoneInfo(Config.SERVER_TIMEZONE)
+
+
+def as_utc(value):
+    """Normalize a datetime from the DB or a request to aware UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def parse_clock(value):
+    """'HH:MM' -> minutes after midnight"""
+    try:
+        hours, minutes = value.split(':')[:2]
+        hours, minutes = int(hours), int(minutes)
+    except (AttributeError, ValueError):
+        raise ReservationError("Giờ không hợp lệ (HH:MM)")
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ReservationError("Giờ không hợp lệ (HH:MM)")
+    return hours * 60 + minutes
+
+
+def local_midnight(day):
+    return datetime(day.year, day.month, day.day, tzinfo=local_timezone())
+
+
+def parse_duration(value, default=None):
+    """Client-supplied duration in minutes; default when absent, ReservationError when not a sane int"""
+    if value is None:
+        return default or Config.RESERVATION_DEFAULT_DURATION
+    minimum, maximum = Config.RESERVATION_MIN_DURATION, Config.RESERVATION_MAX_DURATION
+    if isinstance(value, bool) or not isinstance(value, int) or not minimum <= value <= maximum:
+        raise ReservationError(f"Thời lượng không hợp lệ ({minimum}-{maximum} phút)")
+    return value
+
+
+def reservation_window(day, time_str, duration_minutes=None):
+    """(start_at, end_at) in UTC for a local date and 'HH:MM' time"""
+    duration = parse_duration(duration_minutes)
+    start = local_midnight(day) + timedelta(minutes=parse_clock(time_str))
+    return as_utc(start), as_utc(start + timedelta(minutes=duration))
+
+
+class IntervalIndex:
+    """Disjoint [start, end) intervals of one table, kept sorted by start.
+
+    Because intervals on a table never overlap, ends are sorted too, so an
+    overlap test only needs the predecessor of the insertion point: O(log n).
+    """
+
+    __slots__ = ("_starts", "_intervals")
+
+    def __init__(self):
+        self._starts = []
+        self._intervals = []
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def __iter__(self):
+        return iter(self._intervals)
+
+    def add(self, start, end, key):
+        position = bisect_left(self._starts, start)
+        self._starts.insert(position, start)
+        self._intervals.insert(position, (start, end, key))
+
+    def remove(self, key):
+        for position, interval in enumerate(self._intervals):
+            if interval[2] == key:
+                del self._starts[position]
+                del self._intervals[position]
+                return True
+        return False
+
+    def overlapping(self, start, end, exclude=None):
+        """Key of an interval overlapping [start, end), or None"""
+        position = bisect_left(self._starts, end)
+        while position:
+            position -= 1
+            interval_end, key = self._intervals[position][1], self._intervals[position][2]
+            if interval_end <= start:
+                return None
+            if key != exclude:
+                return key
+        return None
+
+    def overlapping_keys(self, start, end):
+        """Keys of every interval overlapping [start, end)"""
+        keys = []
+        position = bisect_left(self._starts, end)
+        while position:
+            position -= 1
+            if self._intervals[position][1] <= start:
+                break
+            keys.append(self._intervals[position][2])
+        return keys
+
+
+class ReservationIndex:
+    """In-process interval indexes per (tenant, local day), rebuilt from SQL on miss.
+
+    Used to answer availability without touching the database on every
+    request. Writes in this worker invalidate the day; other workers see
+    changes after RESERVATION_INDEX_TTL, and every booking is re-checked in
+    SQL before commit. At most RESERVATION_INDEX_MAX_DAYS days are kept; the
+    least recently used go first.
+    """
+
+    def __init__(self, ttl=None, max_days=None):
+        self.ttl = ttl if ttl is not None else Config.RESERVATION_INDEX_TTL
+        self.max_days = max_days if max_days is not None else Config.RESERVATION_INDEX_MAX_DAYS
+        self._days = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session, tenant_id, day):
+        key = (tenant_id, day)
+        with self._lock:
+            entry = self._days.get(key)
+            if entry and _time.monotonic() - entry[0] < self.ttl:
+                self._days.move_to_end(key)
+                return entry[1]
+
+        tables = self._load(session, tenant_id, day)
+        with self._lock:
+            self._days[key] = (_time.monotonic(), tables)
+            self._days.move_to_end(key)
+            while len(self._days) > self.max_days:
+                self._days.popitem(last=False)
+        return tables
+
+    def invalidate(self, tenant_id, day=None):
+        with self._lock:
+            for key in [k for k in self._days if k[0] == tenant_id and (day is None or k[1] == day)]:
+                del self._days[key]
+
+    def _load(self, session, tenant_id, day):
+        day_start = as_utc(local_midnight(day))
+        day_end = day_start + timedelta(days=1)
+        rows = session.query(
+            ReservationTableModel.reservation_id, ReservationTableModel.table_number,
+            ReservationTableModel.start_at, ReservationTableModel.end_at
+        ).filter(
+            ReservationTableModel.tenant_id == tenant_id,
+            ReservationTableModel.start_at < day_end,
+            ReservationTableModel.end_at > day_start
+        ).all()
+
+        tables = {}
+        for reservation_id, table_number, start_at, end_at in rows:
+            tables.setdefault(table_number, IntervalIndex()).add(as_utc(start_at), as_utc(end_at), reservation_id)
+        return tables
+
+
+reservation_index = ReservationIndex()
+
+
+def local_days(start_at, end_at):
+    """Local dates touched by [start_at, end_at)"""
+    tz = local_timezone()
+    day = start_at.astimezone(tz).date()
+    last = (end_at - timedelta(microseconds=1)).astimezone(tz).date()
+    days = []
+    while day <= last:
+        days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def find_conflict(session, tenant_id, table_number, start_at, end_at, exclude_id=None):
+    """Active reservation on the table overlapping [start_at, end_at), checked in SQL"""
+    query = session.query(ReservationTableModel.reservation_id).filter(
+        ReservationTableModel.tenant_id == tenant_id,
+        ReservationTableModel.table_number == table_number,
+        ReservationTableModel.start_at < end_at,
+        ReservationTableModel.end_at > start_at
+    )
+    if exclude_id:
+        query = query.filter(ReservationTableModel.reservation_id != exclude_id)
+    return query.limit(1).scalar()
+
+
+def branch_tables(session, tenant_id, branch_id=None):
+    """(number, capacity) of the tenant's tables, optionally for one branch"""
+    query = session.query(TableModel.number, TableModel.capacity).filter(TableModel.tenant_id == tenant_id)
+    if branch_id:
+        query = query.filter(TableModel.branch_id == branch_id)
+    return query.order_by(TableModel.capacity, TableModel.number).all()
+
+
+def set_reservation_tables(session, reservation, table_numbers):
+    """Replace the tables a reservation occupies; an empty list frees them"""
+    session.query(ReservationTableModel).filter(
+        ReservationTableModel.reservation_id == reservation.id
+    ).delete(synchronize_session=False)
+    session.add_all([
+        ReservationTableModel(
+            reservation_id=reservation.id,
+            tenant_id=reservation.tenant_id,
+            table_number=number,
+            start_at=reservation.start_at,
+            end_at=reservation.end_at
+        ) for number in table_numbers
+    ])
+    reservation.table_number = table_numbers[0] if table_numbers else None
+
+
+def day_slots(day, duration_minutes):
+    """Slot start offsets (minutes after local midnight) for a day"""
+    open_minute = parse_clock(Config.RESERVATION_OPEN_TIME)
+    close_minute = parse_clock(Config.RESERVATION_CLOSE_TIME)
+    return list(range(open_minute, close_minute - duration_minutes + 1, Config.RESERVATION_SLOT_MINUTES))
+
+
+def availability(session, tenant_id, start_day, end_day, branch_id=None, duration_minutes=None):
+    """Free-slot bitmaps per day and capacity class.
+
+    Bit i (least significant first) of a class bitmap is set when at least
+    one table seating that class is free for `duration_minutes` starting at
+    slot i. Bitmaps are returned as hex strings.
+    """
+    duration = parse_duration(duration_minutes)
+    slot = Config.RESERVATION_SLOT_MINUTES
+    tables = branch_tables(session, tenant_id, branch_id)
+    classes = sorted(Config.RESERVATION_CAPACITY_CLASSES)
+
+    days = []
+    day = start_day
+    while day <= end_day:
+        offsets = day_slots(day, duration)
+        slot_count = len(offsets)
+        all_slots = (1 << slot_count) - 1
+        midnight = as_utc(local_midnight(day))
+        index = reservation_index.get(session, tenant_id, day)
+
+        class_bits = dict.fromkeys(classes, 0)
+        for number, capacity in tables:
+            busy = 0
+            for start_at, end_at, _ in index.get(number, ()):
+                # Slot i [o_i, o_i + duration) overlaps [start, end) when start - duration < o_i < end
+                start = (start_at - midnight).total_seconds() / 60
+                end = (end_at - midnight).total_seconds() / 60
+                first = max(0, int((start - duration - offsets[0]) // slot) + 1) if offsets else 0
+                last = min(slot_count - 1, int(-(-(end - offsets[0]) // slot)) - 1) if offsets else -1
+                if first <= last:
+                    busy |= ((1 << (last - first + 1)) - 1) << first
+            free = all_slots & ~busy
+            for size in classes:
+                if capacity >= size:
+                    class_bits[size] |= free
+
+        days.append({
+            "date": day.isoformat(),
+            "slots": slot_count,
+            "first_slot": f"{offsets[0] // 60:02d}:{offsets[0] % 60:02d}" if offsets else None,
+            "classes": {str(size): format(bits, f"0{(slot_count + 3) // 4}x") if slot_count else "" for size, bits in class_bits.items()}
+        })
+        day += timedelta(days=1)
+
+    return {
+        "slot_minutes": slot,
+        "duration_minutes": duration,
+        "days": days
+    }
+
+
+def create_reservation(session, tenant_id, day, time_str, guests, customer_id=None,
+                       branch_id=None, table_number=None, duration_minutes=None, notes=None):
+    """Validate the window against existing bookings and add the reservation.
+
+    Without a table_number the assignment solver picks (or combines) tables.
+    """
+    from app.services.table_assignment_service import assign_reservation
+
+    if not guests or guests < 1:
+        raise ReservationError("Số khách không hợp lệ")
+
+    start_at, end_at = reservation_window(day, time_str, duration_minutes)
+    if start_at < datetime.now(timezone.utc):
+        raise ReservationError("Không thể đặt bàn trong quá khứ")
+
+    if table_number is not None:
+        # Row lock serializes bookings of the same table across workers
+        table = session.query(TableModel).filter(
+            TableModel.tenant_id == tenant_id,
+            TableModel.number == table_number
+        ).with_for_update().first()
+        if not table:
+            raise ReservationError("Không tìm thấy bàn", 404)
+        if table.capacity < guests:
+            raise ReservationError("Bàn không đủ chỗ")
+        if find_conflict(session, tenant_id, table_number, start_at, end_at):
+            raise ReservationError("Bàn đã được đặt trong khung giờ này", 409)
+
+    reservation = ReservationModel(
+        tenant_id=tenant_id,
+        customer_id=customer_id,
+        branch_id=branch_id,
+        table_number=table_number,
+        date=local_midnight(day),
+        time=time_str,
+        start_at=start_at,
+        end_at=end_at,
+        guests=guests,
+        status=ReservationStatus.PENDING,
+        notes=notes
+    )
+    session.add(reservation)
+    session.flush()
+
+    if table_number is not None:
+        set_reservation_tables(session, reservation, [table_number])
+    else:
+        assign_reservation(session, reservation)
+    return reservation
+
+
+def cancel_reservation(session, reservation, status=ReservationStatus.CANCELLED):
+    """Move a reservation out of the active statuses and free its tables"""
+    reservation.status = status
+    set_reservation_tables(session, reservation, [])
+
+
+def invalidate_reservation(reservation):
+    """Drop cached day indexes touched by a reservation (call after commit)"""
+    if reservation.start_at and reservation.end_at:
+        invalidate_window(reservation.tenant_id, as_utc(reservation.start_at), as_utc(reservation.end_at))
+
+
+def invalidate_window(tenant_id, start_at, end_at):
+    for day in local_days(start_at, end_at):
+        reservation_index.invalidate(tenant_id, day)
@@ -0,0 +1,197 @@
+"""
+Shard migration service - Chuyển toàn bộ dữ liệu của một nhà hàng sang shard khác
+
+Sao chép theo thứ tự khóa ngoại trong một transaction trên shard đích, kèm bản
+sao tham chiếu của dòng toàn cục (khách, tài khoản) mà dữ liệu trỏ tới; sau đó
+đổi danh bạ tenant_shards và xóa dữ liệu ở shard nguồn.
+"""
+import logging
+import time
+from datetime import datetime
+
+from sqlalchemy import delete, or_, select, tuple_, update
+
+from app.config import Config
+from app.infrastructure import databases
+from app.infrastructure.databases.base import Base
+from app.infrastructure.databases.shards import DEFAULT_SHARD, GLOBAL_TABLES, ShardError
+from app.models.tenant_model import TenantModel, TenantStatus
+from app.models.tenant_shard_model import TenantShardModel
+
+logger = logging.getLogger(__name__)
+
+
+def _primary_key(table):
+    return list(table.primary_key.columns)
+
+
+def tenant_filters(tenant_id):
+    """{table: clause} selecting the tenant's rows in every non-global table.
+
+    Tables without tenant_id (dish snapshots) are reached through their
+    foreign keys to or from tables that have one.
+    """
+    filters = {}
+    for table in Base.metadata.sorted_tables:
+        if table.name == TenantModel.__tablename__:
+            filters[table] = table.c.id == tenant_id
+        elif table.name not in GLOBAL_TABLES and "tenant_id" in table.c:
+            filters[table] = table.c.tenant_id == tenant_id
+
+    for table in Base.metadata.sorted_tables:
+        if table in filters or table.name in GLOBAL_TABLES:
+            continue
+        clauses = []
+        for fk in table.foreign_keys:
+            if fk.column.table in filters:
+                clauses.append(fk.parent.in_(select(fk.column).where(filters[fk.column.table])))
+        for owned, clause in list(filters.items()):
+            for fk in owned.foreign_keys:
+                if fk.column.table is table:
+                    clauses.append(fk.column.in_(select(fk.parent).where(clause)))
+        if clauses:
+            filters[table] = or_(*clauses)
+    return filters
+
+
+def _referenced_ids(connection, table, filters):
+    """Ids of global `table` rows that the tenant's rows point at, plus their own parents"""
+    ids = set()
+    for owned, clause in filters.items():
+        for fk in owned.foreign_keys:
+            if fk.column.table is table:
+                ids.update(connection.execute(
+                    select(fk.parent).where(clause, fk.parent.isnot(None)).distinct()
+                ).scalars())
+
+    # Self references (account owners) must exist before their children
+    for fk in table.foreign_keys:
+        if fk.column.table is not table:
+            continue
+        pending = set(ids)
+        while pending:
+            parents = set(connection.execute(
+                select(fk.parent).where(fk.column.in_(pending), fk.parent.isnot(None))
+            ).scalars()) - ids
+            ids.update(parents)
+            pending = parents
+    return ids
+
+
+def _existing_keys(connection, table, keys):
+    columns = _primary_key(table)
+    if len(columns) == 1:
+        found = connection.execute(select(columns[0]).where(columns[0].in_([key[0] for key in keys])))
+        return {(value,) for value in found.scalars()}
+    return set(map(tuple, connection.execute(select(*columns).where(tuple_(*columns).in_(keys)))))
+
+
+def _copy(source, target, table, statement, batch_size, on_conflict):
+    """Copy rows selected by statement; returns their primary keys"""
+    columns = _primary_key(table)
+    copied = []
+    result = source.execution_options(yield_per=batch_size).execute(statement)
+    for batch in result.mappings().partitions(batch_size):
+        rows = [dict(row) for row in batch]
+        keys = [tuple(row[column.name] for column in columns) for row in rows]
+        existing = _existing_keys(target, table, keys)
+        if existing:
+            if on_conflict == "skip":
+                rows = [row for row, key in zip(rows, keys) if key not in existing]
+            elif on_conflict == "update":
+                for row, key in zip(rows, keys):
+                    if key in existing:
+                        target.execute(update(table).where(
+                            *(column == value for column, value in zip(columns, key))
+                        ).values(**row))
+                rows = [row for row, key in zip(rows, keys) if key not in existing]
+            else:
+                raise ShardError(
+                    f"{table.name} rows {sorted(existing)[:5]} already exist on the target shard"
+                )
+        if rows:
+            target.execute(table.insert(), rows)
+        copied.extend(keys)
+    return copied
+
+
+def _delete(connection, table, keys, batch_size):
+    columns = _primary_key(table)
+    for start in range(0, len(keys), batch_size):
+        chunk = keys[start:start + batch_size]
+        if len(columns) == 1:
+            connection.execute(delete(table).where(columns[0].in_([key[0] for key in chunk])))
+        else:
+            connection.execute(delete(table).where(tuple_(*columns).in_(chunk)))
+
+
+def migrate_tenant(tenant_id, target, keep_source=False, force=False, batch_size=1000):
+    """Move one tenant's rows to `target`; returns {table: rows copied}.
+
+    The tenant should be INACTIVE while it moves: writes that land on the
+    source after its rows are copied are lost (force skips the check).
+    """
+    router = databases.shards
+    if router is None or not router.enabled:
+        raise ShardError("No shards configured (DATABASE_SHARDS)")
+    if target not in router.engines:
+        raise ShardError(f"Unknown shard {target!r}")
+    source = router.shard_for(tenant_id)
+    if source == target:
+        raise ShardError(f"Tenant {tenant_id} is already on shard {target!r}")
+
+    source_engine, target_engine = router.engines[source], router.engines[target]
+    filters = tenant_filters(tenant_id)
+    copied, counts = {}, {}
+
+    with source_engine.connect() as source_connection:
+        tenant = source_connection.execute(
+            select(TenantModel.__table__).where(TenantModel.id == tenant_id)
+        ).mappings().first()
+        if tenant is None:
+            raise ShardError(f"Tenant {tenant_id} not found on shard {source!r}")
+        if tenant["status"] == TenantStatus.ACTIVE and not force:
+            raise ShardError(f"Tenant {tenant_id} is active; set it inactive first or force the move")
+
+        with target_engine.begin() as target_connection:
+            for table in Base.metadata.sorted_tables:
+                if table.name in GLOBAL_TABLES:
+                    ids = _referenced_ids(source_connection, table, filters)
+                    if ids:
+                        column = _primary_key(table)[0]
+                        statement = select(table).where(column.in_(ids))
+                        counts[table.name] = len(_copy(
+                            source_connection, target_connection, table, statement, batch_size, "skip"
+                        ))
+                elif table in filters:
+                    statement = select(table).where(filters[table])
+                    # A reference copy of the tenant row may already be on the target
+                    on_conflict = "update" if table.name == TenantModel.__tablename__ else "error"
+                    copied[table] = _copy(
+                        source_connection, target_connection, table, statement, batch_size, on_conflict
+                    )
+                    counts[table.name] = len(copied[table])
+
+    # Point the directory at the new home
+    session = router.session(DEFAULT_SHARD)
+    try:
+        session.merge(TenantShardModel(tenant_id=tenant_id, shard=target, moved_at=datetime.utcnow()))
+        session.commit()
+    finally:
+        session.close()
+    router.invalidate()
+    logger.info("Tenant %s moved from shard %s to %s: %s", tenant_id, source, target, counts)
+
+    if not keep_source:
+        # Other workers keep their cached map for up to SHARD_MAP_TTL seconds
+        time.sleep(Config.SHARD_MAP_TTL)
+        with source_engine.begin() as source_connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                if table not in copied:
+                    continue
+                if table.name == TenantModel.__tablename__ and source == DEFAULT_SHARD:
+                    # Global accounts still reference it; discovery skips it as a reference copy
+                    continue
+                _delete(source_connection, table, copied[table], batch_size)
+
+    return counts
@@ -0,0 +1,165 @@
+"""
+Snapshot service - Xuất các dòng đơn đã thanh toán ra file cột (.npy) theo nhà hàng/tháng
+
+Mỗi phân đoạn là một thư mục <dir>/tenant_<id>/<YYYY-MM>/ gồm một file .npy
+cho mỗi cột và meta.json; báo cáo đọc các file này bằng mmap, không chạm DB.
+"""
+import json
+import logging
+import os
+import shutil
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from app.config import Config
+from app.infrastructure.databases import only_home_tenants, scatter
+from app.models.dish_model import DishSnapshotModel
+from app.models.order_model import OrderModel, OrderStatus
+from app.models.tenant_model import TenantModel
+from app.services.analytics_service import tenant_timezone
+from app.utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+# Column name -> (array typecode, numpy dtype)
+COLUMNS = {
+    "order_id": ("q", "int64"),
+    "branch_id": ("i", "int32"),    # -1: no branch
+    "dish_id": ("i", "int32"),      # -1: dish deleted
+    "price": ("q", "int64"),
+    "quantity": ("i", "int32"),
+    "created_at": ("q", "int64"),   # UTC epoch seconds
+    "local_time": ("q", "int64"),   # tenant wall-clock epoch seconds (for day/hour buckets)
+    "paid_at": ("q", "int64"),      # UTC epoch seconds
+}
+SEGMENT_VERSION = 1
+
+
+def month_key(year, month):
+    return f"{year:04d}-{month:02d}"
+
+
+def shift_month(year, month, delta):
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+def month_bounds(year, month, tz):
+    """[start, end) of a local month as naive UTC datetimes"""
+    next_year, next_month = shift_month(year, month, 1)
+    start = datetime(year, month, 1, tzinfo=tz).astimezone(timezone.utc)
+    end = datetime(next_year, next_month, 1, tzinfo=tz).astimezone(timezone.utc)
+    return start.replace(tzinfo=None), end.replace(tzinfo=None)
+
+
+def segment_path(tenant_id, key, base_dir=None):
+    return os.path.join(base_dir or Config.ANALYTICS_SNAPSHOT_DIR, f"tenant_{tenant_id}", key)
+
+
+def _epoch(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def dump_tenant_month(session, tenant_id, year, month, tz, base_dir=None, batch_size=5000):
+    """Write one tenant/month segment from paid order lines; returns the row count.
+
+    The segment is built in a temporary directory and swapped in with a
+    rename, so readers never see a half-written month.
+    """
+    start, end = month_bounds(year, month, tz)
+    rows = session.query(
+        OrderModel.id, OrderModel.branch_id, DishSnapshotModel.dish_id, DishSnapshotModel.name,
+        DishSnapshotModel.price, OrderModel.quantity, OrderModel.created_at, OrderModel.updated_at
+    ).join(
+        DishSnapshotModel, DishSnapshotModel.id == OrderModel.dish_snapshot_id
+    ).filter(
+        OrderModel.tenant_id == tenant_id,
+        OrderModel.status == OrderStatus.PAID,
+        OrderModel.created_at >= start,
+        OrderModel.created_at < end
+    ).order_by(OrderModel.id).yield_per(batch_size)
+
+    columns = {name: array(typecode) for name, (typecode, _) in COLUMNS.items()}
+    dish_names = {}
+    for order_id, branch_id, dish_id, name, price, quantity, created_at, updated_at in rows:
+        created = _epoch(created_at)
+        columns["order_id"].append(order_id)
+        columns["branch_id"].append(branch_id if branch_id is not None else -1)
+        columns["dish_id"].append(dish_id if dish_id is not None else -1)
+        columns["price"].append(price)
+        columns["quantity"].append(quantity)
+        columns["created_at"].append(created)
+        columns["local_time"].append(created + int(datetime.fromtimestamp(created, tz).utcoffset().total_seconds()))
+        columns["paid_at"].append(_epoch(updated_at) if updated_at else created)
+        dish_names[dish_id if dish_id is not None else -1] = name
+
+    path = segment_path(tenant_id, month_key(year, month), base_dir)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, (_, dtype) in COLUMNS.items():
+        np.save(os.path.join(tmp_path, f"{name}.npy"), np.frombuffer(columns[name], dtype=dtype))
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "version": SEGMENT_VERSION,
+            "tenant_id": tenant_id,
+            "month": month_key(year, month),
+            "timezone": str(tz),
+            "rows": len(columns["order_id"]),
+            "written_at": datetime.utcnow().isoformat(),
+            "dish_names": {str(dish_id): name for dish_id, name in dish_names.items()}
+        }, f, ensure_ascii=False)
+
+    old_path = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return len(columns["order_id"])
+
+
+def dump_recent_snapshots(months=None, tenant_id=None, base_dir=None):
+    """Scheduled job: rewrite the last `months` local months for tenants with paid orders.
+
+    Older months are immutable in practice; use the CLI with a larger
+    --months to backfill them. Each shard dumps the tenants whose home it is.
+    """
+    months = months or Config.ANALYTICS_SNAPSHOT_MONTHS
+    now = datetime.now(timezone.utc)
+    written = sum(count for _, count in scatter(
+        lambda session: dump_shard_snapshots(session, now, months, tenant_id, base_dir)
+    ))
+    if written:
+        logger.info("Wrote %d analytics snapshot segments", written)
+    return written
+
+
+def dump_shard_snapshots(session, now, months, tenant_id=None, base_dir=None):
+    """Snapshot dump for the tenants whose home is the session's shard"""
+    oldest_year, oldest_month = shift_month(now.year, now.month, -(months - 1))
+    # A day of slack covers tenants whose month starts before UTC's
+    since = datetime(oldest_year, oldest_month, 1) - timedelta(days=1)
+
+    tenants = session.query(TenantModel.id, TenantModel.settings).filter(
+        session.query(OrderModel.id).filter(
+            OrderModel.tenant_id == TenantModel.id,
+            OrderModel.status == OrderStatus.PAID,
+            OrderModel.created_at >= since
+        ).exists()
+    )
+    if tenant_id:
+        tenants = tenants.filter(TenantModel.id == tenant_id)
+
+    written = 0
+    for current_tenant_id, settings in only_home_tenants(session, tenants, TenantModel.id).all():
+        tz = tenant_timezone(settings)
+        local_now = now.astimezone(tz)
+        for delta in range(months):
+            year, month = shift_month(local_now.year, local_now.month, -delta)
+            dump_tenant_month(session, current_tenant_id, year, month, tz, base_dir)
+            written += 1
+    return written
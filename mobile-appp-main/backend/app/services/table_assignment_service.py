@@ -0,0 +1,325 @@
+"""
+Table assignment service - Xếp bàn cho đặt chỗ và khách vãng lai (ghép bàn, ít ghế trống nhất)
+"""
+from datetime import datetime, timedelta, timezone
+
+from app.config import Config
+from app.models.reservation_model import ReservationModel, ReservationStatus, ReservationTableModel
+from app.models.table_model import TableModel, TableStatus
+from app.services.reservation_service import (
+    ReservationError, IntervalIndex, as_utc, local_midnight, local_timezone,
+    parse_duration, set_reservation_tables
+)
+
+# Bookings loaded around the one being seated, so a blocker can be moved safely
+ASSIGNMENT_MARGIN = timedelta(hours=6)
+
+
+class TableAssignmentSolver:
+    """Best-fit assignment of parties to single or combined tables.
+
+    Options are single tables plus runs of up to `max_combine` tables with
+    consecutive numbers in the same combine group. An option costs its
+    wasted seats plus `combine_penalty` per extra table, and the candidate
+    list is sorted once per party size, so placing a booking scans options
+    cheapest-first and stops at the first one whose tables are free
+    (O(log n) per table via IntervalIndex).
+    """
+
+    # Distinct bookings tried as the one to move before giving up
+    repair_limit = 20
+
+    def __init__(self, tables, max_combine=None, combine_penalty=None):
+        """tables: iterable of (number, capacity, combine_group)"""
+        self.max_combine = max_combine or Config.TABLE_MAX_COMBINE
+        self.combine_penalty = Config.TABLE_COMBINE_PENALTY if combine_penalty is None else combine_penalty
+        self.capacities = {}
+        self.timelines = {}
+        self.assignments = {}  # booking id -> (tables, start, end, guests)
+        self._candidates = {}
+
+        groups = {}
+        for number, capacity, group in tables:
+            self.capacities[number] = capacity
+            self.timelines[number] = IntervalIndex()
+            if group:
+                groups.setdefault(group, []).append(number)
+
+        self.options = [((number,), capacity) for number, capacity in self.capacities.items()]
+        for numbers in groups.values():
+            numbers.sort()
+            for first in range(len(numbers)):
+                run = [numbers[first]]
+                for number in numbers[first + 1:first + self.max_combine]:
+                    if number != run[-1] + 1:
+                        break
+                    run.append(number)
+                    self.options.append((tuple(run), sum(self.capacities[n] for n in run)))
+
+    def candidates(self, guests):
+        """Options seating `guests`, cheapest first"""
+        options = self._candidates.get(guests)
+        if options is None:
+            options = sorted(
+                (capacity - guests + self.combine_penalty * (len(numbers) - 1), numbers)
+                for numbers, capacity in self.options if capacity >= guests
+            )
+            self._candidates[guests] = options
+        return options
+
+    def is_free(self, numbers, start, end):
+        return all(self.timelines[number].overlapping(start, end) is None for number in numbers)
+
+    def blockers(self, numbers, start, end):
+        keys = set()
+        for number in numbers:
+            keys.update(self.timelines[number].overlapping_keys(start, end))
+        return keys
+
+    def occupy(self, booking_id, numbers, start, end, guests):
+        for number in numbers:
+            self.timelines[number].add(start, end, booking_id)
+        self.assignments[booking_id] = (tuple(numbers), start, end, guests)
+
+    def release(self, booking_id):
+        assignment = self.assignments.pop(booking_id, None)
+        if assignment:
+            for number in assignment[0]:
+                self.timelines[number].remove(booking_id)
+        return assignment
+
+    def place(self, booking_id, start, end, guests):
+        """Occupy the cheapest free option; returns its tables or None"""
+        free = {number for number, timeline in self.timelines.items() if timeline.overlapping(start, end) is None}
+        for _, numbers in self.candidates(guests):
+            if all(number in free for number in numbers):
+                self.occupy(booking_id, numbers, start, end, guests)
+                return numbers
+        return None
+
+    def place_with_repair(self, booking_id, start, end, guests, movable=()):
+        """Place a booking, moving at most one movable booking out of the way.
+
+        Returns (tables, moved) where moved maps relocated booking ids to
+        their new tables; tables is None when nothing fits.
+        """
+        numbers = self.place(booking_id, start, end, guests)
+        if numbers is not None:
+            return numbers, {}
+
+        tried = set()
+        for _, numbers in self.candidates(guests):
+            if len(tried) >= self.repair_limit:
+                break
+            blocking = self.blockers(numbers, start, end)
+            if len(blocking) != 1:
+                continue
+            blocker = next(iter(blocking))
+            if blocker not in movable or blocker in tried:
+                continue
+            tried.add(blocker)
+            previous = self.release(blocker)
+            self.occupy(booking_id, numbers, start, end, guests)
+            moved_to = self.place(blocker, *previous[1:])
+            if moved_to is not None:
+                return numbers, {blocker: moved_to}
+            self.release(booking_id)
+            self.occupy(blocker, *previous)
+        return None, {}
+
+    def solve(self, bookings, movable=()):
+        """Place bookings largest party (then longest stay) first.
+
+        bookings: iterable of (id, start, end, guests). Returns the ids that
+        could not be seated; moved bookings are reflected in `assignments`.
+        """
+        unplaced = []
+        ordered = sorted(bookings, key=lambda b: (-b[3], b[1] - b[2], b[1]))
+        for booking_id, start, end, guests in ordered:
+            numbers, _ = self.place_with_repair(booking_id, start, end, guests, movable)
+            if numbers is None:
+                unplaced.append(booking_id)
+        return unplaced
+
+
+def branch_table_rows(session, tenant_id, branch_id=None, available_only=False):
+    query = session.query(TableModel.number, TableModel.capacity, TableModel.combine_group).filter(
+        TableModel.tenant_id == tenant_id
+    )
+    if branch_id:
+        query = query.filter(TableModel.branch_id == branch_id)
+    if available_only:
+        query = query.filter(TableModel.status == TableStatus.AVAILABLE)
+    return query.all()
+
+
+def load_solver(session, tenant_id, branch_id, start_at, end_at, available_only=False):
+    """Solver over the branch's tables with every booking overlapping the window placed.
+
+    Returns (solver, bookings) where bookings maps reservation id to
+    (status, start, end, guests).
+    """
+    solver = TableAssignmentSolver(branch_table_rows(session, tenant_id, branch_id, available_only))
+    rows = session.query(
+        ReservationTableModel.reservation_id, ReservationTableModel.table_number,
+        ReservationModel.status, ReservationModel.start_at, ReservationModel.end_at, ReservationModel.guests
+    ).join(
+        ReservationModel, ReservationModel.id == ReservationTableModel.reservation_id
+    ).filter(
+        ReservationTableModel.tenant_id == tenant_id,
+        ReservationTableModel.table_number.in_(list(solver.capacities)),
+        ReservationTableModel.start_at < end_at,
+        ReservationTableModel.end_at > start_at
+    ).order_by(ReservationTableModel.reservation_id, ReservationTableModel.table_number).all()
+
+    tables_by_booking = {}
+    bookings = {}
+    for reservation_id, number, status, booking_start, booking_end, guests in rows:
+        tables_by_booking.setdefault(reservation_id, []).append(number)
+        bookings[reservation_id] = (status, as_utc(booking_start), as_utc(booking_end), guests)
+    for reservation_id, numbers in tables_by_booking.items():
+        _, booking_start, booking_end, guests = bookings[reservation_id]
+        solver.occupy(reservation_id, numbers, booking_start, booking_end, guests)
+    return solver, bookings
+
+
+def movable_bookings(bookings, start_at, end_at):
+    """Pending bookings inside the loaded window may be moved; confirmed ones are fixed.
+
+    Only bookings wholly inside [start_at, end_at) are movable because the
+    solver knows nothing about tables outside the window it loaded.
+    """
+    return {
+        reservation_id for reservation_id, (status, booking_start, booking_end, _) in bookings.items()
+        if status == ReservationStatus.PENDING and booking_start >= start_at and booking_end <= end_at
+    }
+
+
+def _write_moves(session, moves):
+    if not moves:
+        return
+    for reservation in session.query(ReservationModel).filter(ReservationModel.id.in_(list(moves))).all():
+        set_reservation_tables(session, reservation, list(moves[reservation.id]))
+
+
+def _has_conflict(session, tenant_id, numbers, start_at, end_at, ignore_ids):
+    return session.query(ReservationTableModel.id).filter(
+        ReservationTableModel.tenant_id == tenant_id,
+        ReservationTableModel.table_number.in_(list(numbers)),
+        ReservationTableModel.start_at < end_at,
+        ReservationTableModel.end_at > start_at,
+        ReservationTableModel.reservation_id.notin_(list(ignore_ids))
+    ).limit(1).scalar() is not None
+
+
+def assign_reservation(session, reservation, available_only=False, attempts=3):
+    """Seat a flushed reservation, possibly combining tables or moving one pending booking.
+
+    The chosen tables are row-locked and re-checked in SQL so concurrent
+    workers cannot double-book; on a race the solver is rebuilt and retried.
+    """
+    start_at, end_at = as_utc(reservation.start_at), as_utc(reservation.end_at)
+    load_start, load_end = start_at - ASSIGNMENT_MARGIN, end_at + ASSIGNMENT_MARGIN
+    for _ in range(attempts):
+        solver, bookings = load_solver(
+            session, reservation.tenant_id, reservation.branch_id, load_start, load_end, available_only
+        )
+        solver.release(reservation.id)
+        numbers, moves = solver.place_with_repair(
+            reservation.id, start_at, end_at, reservation.guests, movable_bookings(bookings, load_start, load_end)
+        )
+        if numbers is None:
+            raise ReservationError("Không còn bàn trống trong khung giờ này", 409)
+
+        locked = sorted(set(numbers).union(*moves.values()))
+        session.query(TableModel.number).filter(
+            TableModel.tenant_id == reservation.tenant_id,
+            TableModel.number.in_(locked)
+        ).order_by(TableModel.number).with_for_update().all()
+
+        # Bookings being moved out of the way do not count as conflicts
+        ignore_ids = {reservation.id, *moves}
+        checks = [(numbers, start_at, end_at)]
+        checks += [(moved_to, *solver.assignments[moved_id][1:3]) for moved_id, moved_to in moves.items()]
+        if any(
+            _has_conflict(session, reservation.tenant_id, check_numbers, check_start, check_end, ignore_ids)
+            for check_numbers, check_start, check_end in checks
+        ):
+            continue
+
+        set_reservation_tables(session, reservation, list(numbers))
+        _write_moves(session, moves)
+        return numbers
+
+    raise ReservationError("Không còn bàn trống trong khung giờ này", 409)
+
+
+def solve_day(session, tenant_id, day, branch_id=None):
+    """Re-seat every pending booking of a local day from scratch.
+
+    Confirmed bookings keep their tables. Returns (moved, unplaced) as lists
+    of reservation ids. If the new plan would unseat a booking that already
+    had tables, the current plan is kept and nothing is moved.
+    """
+    day_start = as_utc(local_midnight(day))
+    day_end = day_start + timedelta(days=1)
+
+    # Serialize with bookings being seated on the same tables
+    lock_query = session.query(TableModel.number).filter(TableModel.tenant_id == tenant_id)
+    if branch_id:
+        lock_query = lock_query.filter(TableModel.branch_id == branch_id)
+    lock_query.order_by(TableModel.number).with_for_update().all()
+
+    solver, _ = load_solver(session, tenant_id, branch_id, day_start - ASSIGNMENT_MARGIN, day_end + ASSIGNMENT_MARGIN)
+
+    pending = session.query(
+        ReservationModel.id, ReservationModel.start_at, ReservationModel.end_at, ReservationModel.guests
+    ).filter(
+        ReservationModel.tenant_id == tenant_id,
+        ReservationModel.status == ReservationStatus.PENDING,
+        ReservationModel.start_at >= day_start,
+        ReservationModel.start_at < day_end
+    )
+    if branch_id:
+        pending = pending.filter(ReservationModel.branch_id == branch_id)
+    pending = [(r_id, as_utc(start), as_utc(end), guests) for r_id, start, end, guests in pending.all()]
+
+    previous = {booking[0]: solver.release(booking[0]) for booking in pending}
+    unplaced = solver.solve(pending, movable={booking[0] for booking in pending})
+    if any(previous[reservation_id] for reservation_id in unplaced):
+        return [], unplaced
+
+    moves = {
+        reservation_id: solver.assignments[reservation_id][0]
+        for reservation_id in previous
+        if reservation_id in solver.assignments
+        and (not previous[reservation_id] or previous[reservation_id][0] != solver.assignments[reservation_id][0])
+    }
+    _write_moves(session, moves)
+    return sorted(moves), unplaced
+
+
+def seat_walk_in(session, tenant_id, guests, branch_id=None, duration_minutes=None, notes=None):
+    """Seat a party arriving now on free, available tables as a confirmed booking"""
+    if not guests or guests < 1:
+        raise ReservationError("Số khách không hợp lệ")
+
+    start_at = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    end_at = start_at + timedelta(minutes=parse_duration(duration_minutes, Config.WALK_IN_DURATION))
+    local_start = start_at.astimezone(local_timezone())
+
+    reservation = ReservationModel(
+        tenant_id=tenant_id,
+        branch_id=branch_id,
+        date=local_midnight(local_start.date()),
+        time=local_start.strftime("%H:%M"),
+        start_at=start_at,
+        end_at=end_at,
+        guests=guests,
+        status=ReservationStatus.CONFIRMED,
+        notes=notes
+    )
+    session.add(reservation)
+    session.flush()
+    assign_reservation(session, reservation, available_only=True)
+    return reservation
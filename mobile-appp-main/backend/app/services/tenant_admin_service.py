@@ -0,0 +1,114 @@
+"""
+Tenant admin service - Danh sách nhà hàng cho admin kèm số món, bàn, đơn, tài khoản và lần hoạt động cuối
+
+Một truy vấn duy nhất: trang nhà hàng (kèm tổng qua count() OVER ()) được cắt
+trước, sau đó các subquery tương quan chỉ chạy cho các dòng của trang đó.
+"""
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from app.config import Config
+from app.infrastructure.cache import cached
+from app.infrastructure.databases import get_session, is_sharded, only_home_tenants, scatter
+from app.models.account_model import AccountModel
+from app.models.dish_model import DishModel
+from app.models.order_model import OrderModel
+from app.models.table_model import TableModel
+from app.models.tenant_model import TenantModel, TenantStatus
+
+
+def _count(model, tenant_id):
+    return select(func.count()).select_from(model).where(model.tenant_id == tenant_id).scalar_subquery()
+
+
+def list_tenants(session, status=None, page=1, limit=10):
+    """(rows, total); each row is (tenant, dishes, tables, orders, accounts, last_activity)"""
+    page_query = select(TenantModel, func.count().over().label("total"))
+    if status:
+        page_query = page_query.where(TenantModel.status == status)
+    page_query = only_home_tenants(session, page_query, TenantModel.id)
+    page_rows = page_query.order_by(TenantModel.id).offset((page - 1) * limit).limit(limit).subquery()
+
+    tenant = aliased(TenantModel, page_rows)
+    tenant_id = page_rows.c.id
+    rows = session.query(
+        tenant,
+        page_rows.c.total,
+        _count(DishModel, tenant_id),
+        _count(TableModel, tenant_id),
+        _count(OrderModel, tenant_id),
+        _count(AccountModel, tenant_id),
+        select(func.max(OrderModel.created_at)).where(OrderModel.tenant_id == tenant_id).scalar_subquery()
+    ).order_by(tenant_id).all()
+
+    if rows:
+        total = rows[0][1]
+    elif page > 1:
+        # Past the last page the window has no row to ride on
+        count_query = session.query(func.count(TenantModel.id))
+        if status:
+            count_query = count_query.filter(TenantModel.status == status)
+        total = only_home_tenants(session, count_query, TenantModel.id).scalar()
+    else:
+        total = 0
+
+    return [(row[0], *row[2:]) for row in rows], total
+
+
+def gather_tenants(status=None, page=1, limit=10):
+    """list_tenants across shards: each shard returns its first page*limit
+    rows in id order, merged here into the requested page."""
+    if not is_sharded():
+        session = get_session()
+        try:
+            return list_tenants(session, status, page, limit)
+        finally:
+            session.close()
+
+    results = scatter(lambda session: list_tenants(session, status, 1, page * limit), read_only=True)
+    rows = sorted((row for _, (shard_rows, _) in results for row in shard_rows), key=lambda row: row[0].id)
+    total = sum(shard_total for _, (_, shard_total) in results)
+    rows = rows[(page - 1) * limit:page * limit]
+
+    # Accounts are global rows on the default shard
+    session = get_session()
+    try:
+        accounts = dict(session.query(AccountModel.tenant_id, func.count()).filter(
+            AccountModel.tenant_id.in_([row[0].id for row in rows])
+        ).group_by(AccountModel.tenant_id).all())
+    finally:
+        session.close()
+    return [(tenant, dishes, tables, orders, accounts.get(tenant.id, 0), last_activity)
+            for tenant, dishes, tables, orders, _, last_activity in rows], total
+
+
+LISTING_TAG = "admin:tenants"
+
+
+@cached("admin:tenants", ttl=Config.ADMIN_LISTING_CACHE_TTL, tags=(LISTING_TAG,))
+def tenant_listing(status, page, limit):
+    """Serialized listing page: {"items": [...], "total": n}"""
+    rows, total = gather_tenants(TenantStatus(status) if status else None, page, limit)
+    return {
+        "items": [{
+            "id": r.id,
+            "name": r.name,
+            "slug": r.slug,
+            "email": r.email,
+            "phone": r.phone,
+            "address": r.address,
+            "logo": r.logo,
+            "description": r.description,
+            "status": r.status.value,
+            "subscription": r.subscription.value,
+            "created_at": r.created_at.isoformat() if r.created_at else None,
+            "stats": {
+                "dishes": dishes,
+                "tables": tables,
+                "orders": orders,
+                "accounts": accounts
+            },
+            "last_activity_at": last_activity.isoformat() if last_activity else None
+        } for r, dishes, tables, orders, accounts, last_activity in rows],
+        "total": total
+    }
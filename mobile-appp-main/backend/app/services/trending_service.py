@@ -0,0 +1,349 @@
+"""
+Trending service - Món "đang hot" theo cửa sổ trượt (count-min sketch theo khung thời gian + top-K)
+
+Mỗi nhà hàng giữ một vòng các sketch, mỗi sketch đếm món trong một khung
+TRENDING_WINDOW_MINUTES / TRENDING_BUCKETS phút. Khung cũ tự bị xóa khi vòng
+quay lại, nên ước lượng luôn chỉ tính trong cửa sổ gần nhất.
+
+With TRENDING_PERSIST every worker adds only the counts it has not pushed yet
+to the shared sketch in Redis (count-min sketches add cell by cell), then
+adopts the merged result, so all workers converge on the same counts.
+"""
+import base64
+import heapq
+import json
+import logging
+import threading
+import time
+from array import array
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Fixed (a, b) pairs for ((a * key + b) mod p) mod width, so persisted sketches stay valid across restarts
+_PRIME = 2305843009213693951  # 2^61 - 1
+_HASH_SEEDS = (
+    (1140071481932319848, 862766287311961207),
+    (1597334677432171553, 1876358512830208779),
+    (2043916429367209339, 364738291731872873),
+    (1219422081493016181, 1713261098823407749),
+    (1725479213549051201, 497319384739113109),
+    (2179134811273818361, 1297313081931853147),
+)
+
+
+class CountMinSketch:
+    """depth x width counters in one flat array; estimates never undercount"""
+
+    __slots__ = ("width", "depth", "counters")
+
+    def __init__(self, width, depth, counters=None):
+        self.width = width
+        self.depth = depth
+        self.counters = counters if counters is not None else array("q", bytes(8 * width * depth))
+
+    def _cells(self, key):
+        width = self.width
+        return [row * width + (a * key + b) % _PRIME % width for row, (a, b) in enumerate(_HASH_SEEDS[:self.depth])]
+
+    def add(self, key, count=1):
+        counters = self.counters
+        for cell in self._cells(key):
+            counters[cell] += count
+
+    def estimate(self, key):
+        counters = self.counters
+        return min(counters[cell] for cell in self._cells(key))
+
+    def clear(self):
+        self.counters = array("q", bytes(8 * self.width * self.depth))
+
+
+class TenantTrending:
+    """Sliding-window dish counter of one restaurant"""
+
+    def __init__(self, window_seconds, buckets, width, depth, candidates, persist=False):
+        self.bucket_seconds = max(1, window_seconds // buckets)
+        self.sketches = [CountMinSketch(width, depth) for _ in range(buckets)]
+        self.epochs = [None] * buckets  # bucket number each sketch currently holds
+        self.max_candidates = candidates
+        self.candidates = {}  # dish id -> current estimate; bounded heavy-hitter set
+        self.refreshed_epoch = None
+        self.persist = persist
+        self.pending = {}  # bucket number -> counts not yet merged into the shared sketch (persist only)
+        self.lock = threading.Lock()
+
+    def _bucket(self, now):
+        return self._slot(int(now // self.bucket_seconds))
+
+    def _live(self, now):
+        oldest = int(now // self.bucket_seconds) - len(self.sketches) + 1
+        return [sketch for sketch, epoch in zip(self.sketches, self.epochs) if epoch is not None and epoch >= oldest]
+
+    def _estimate(self, live, key):
+        return sum(sketch.estimate(key) for sketch in live)
+
+    def add(self, key, count, now):
+        with self.lock:
+            self._bucket(now).add(key, count)
+            if self.persist:
+                epoch = int(now // self.bucket_seconds)
+                pending = self.pending.get(epoch)
+                if pending is None:
+                    self._drop_stale_pending(epoch)
+                    pending = self.pending[epoch] = CountMinSketch(self.sketches[0].width, self.sketches[0].depth)
+                pending.add(key, count)
+            live = self._live(now)
+            estimate = self._estimate(live, key)
+            if key in self.candidates or len(self.candidates) < self.max_candidates:
+                self.candidates[key] = estimate
+                return
+            # Replace the weakest candidate if this key now beats it
+            weakest = min(self.candidates, key=self.candidates.get)
+            if self._estimate(live, weakest) < estimate:
+                del self.candidates[weakest]
+                self.candidates[key] = estimate
+
+    def top(self, k, now):
+        """Candidate estimates are kept current by add(); they only need
+        re-estimating once per bucket, when the oldest bucket drops out."""
+        with self.lock:
+            epoch = int(now // self.bucket_seconds)
+            if epoch != self.refreshed_epoch:
+                live = self._live(now)
+                for key in list(self.candidates):
+                    estimate = self._estimate(live, key)
+                    if estimate > 0:
+                        self.candidates[key] = estimate
+                    else:
+                        del self.candidates[key]
+                self.refreshed_epoch = epoch
+            return heapq.nlargest(k, self.candidates.items(), key=lambda item: item[1])
+
+    def dump(self):
+        with self.lock:
+            return {
+                "epochs": list(self.epochs),
+                "candidates": {str(key): value for key, value in self.candidates.items()},
+                "sketches": [base64.b64encode(sketch.counters.tobytes()).decode("ascii") for sketch in self.sketches]
+            }
+
+    def take_pending(self):
+        """Counts recorded since the last merge; put them back with return_pending() if the merge fails"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            return pending
+
+    def return_pending(self, pending, now):
+        with self.lock:
+            oldest = int(now // self.bucket_seconds) - len(self.sketches) + 1
+            for epoch, sketch in pending.items():
+                if epoch < oldest:
+                    continue
+                current = self.pending.get(epoch)
+                if current is None:
+                    self.pending[epoch] = sketch
+                else:
+                    _add_counters(current.counters, sketch.counters)
+
+    def merged(self, state, pending, now):
+        """Stored snapshot (or None) plus pending counts, as a new snapshot.
+
+        Buckets that fell out of the window are dropped; a pending bucket
+        newer than the stored one in its slot replaces it.
+        """
+        buckets = len(self.sketches)
+        size = len(self.sketches[0].counters)
+        oldest = int(now // self.bucket_seconds) - buckets + 1
+        epochs = [None] * buckets
+        counters = [None] * buckets
+        candidates = {}
+
+        if state and len(state["sketches"]) == buckets:
+            for index, (epoch, data) in enumerate(zip(state["epochs"], state["sketches"])):
+                stored = array("q")
+                stored.frombytes(base64.b64decode(data))
+                if epoch is not None and epoch >= oldest and len(stored) == size:
+                    epochs[index], counters[index] = epoch, stored
+            candidates.update(state["candidates"])
+
+        for epoch, sketch in pending.items():
+            index = epoch % buckets
+            if epoch < oldest or (epochs[index] is not None and epochs[index] > epoch):
+                continue
+            if epochs[index] != epoch:
+                epochs[index], counters[index] = epoch, array("q", bytes(8 * size))
+            _add_counters(counters[index], sketch.counters)
+
+        with self.lock:
+            candidates.update((str(key), value) for key, value in self.candidates.items())
+        return {
+            "epochs": epochs,
+            "candidates": candidates,
+            "sketches": [
+                base64.b64encode((data if data is not None else array("q", bytes(8 * size))).tobytes()).decode("ascii")
+                for data in counters
+            ]
+        }
+
+    def load(self, state, now=None):
+        """Adopt a snapshot; counts still pending stay on top of it"""
+        now = now or time.time()
+        with self.lock:
+            if len(state["sketches"]) != len(self.sketches):
+                return False
+            loaded = []
+            for sketch, data in zip(self.sketches, state["sketches"]):
+                counters = array("q")
+                counters.frombytes(base64.b64decode(data))
+                if len(counters) != len(sketch.counters):
+                    return False
+                loaded.append(counters)
+            for sketch, counters in zip(self.sketches, loaded):
+                sketch.counters = counters
+            self.epochs = list(state["epochs"])
+
+            for epoch, pending in self.pending.items():
+                _add_counters(self._slot(epoch).counters, pending.counters)
+
+            # Re-estimate both workers' candidates against the merged counts; keep the strongest
+            live = self._live(now)
+            keys = {int(key) for key in state["candidates"]} | set(self.candidates)
+            estimates = [(key, self._estimate(live, key)) for key in keys]
+            self.candidates = dict(heapq.nlargest(
+                self.max_candidates, (item for item in estimates if item[1] > 0), key=lambda item: item[1]
+            ))
+            self.refreshed_epoch = None
+            return True
+
+    def _drop_stale_pending(self, epoch):
+        """Forget pending buckets that fell out of the window ending at `epoch`"""
+        oldest = epoch - len(self.sketches) + 1
+        for stale in [pending_epoch for pending_epoch in self.pending if pending_epoch < oldest]:
+            del self.pending[stale]
+
+    def _slot(self, epoch):
+        index = epoch % len(self.sketches)
+        if self.epochs[index] != epoch:
+            self.sketches[index].clear()
+            self.epochs[index] = epoch
+        return self.sketches[index]
+
+
+def _add_counters(target, source):
+    for cell, value in enumerate(source):
+        if value:
+            target[cell] += value
+
+
+class TrendingRegistry:
+    """Per-tenant trending counters in process memory, optionally snapshotted to Redis"""
+
+    key_prefix = "trending:"
+
+    def __init__(self):
+        self._tenants = {}
+        self._lock = threading.Lock()
+
+    def _tenant(self, tenant_id):
+        tenant = self._tenants.get(tenant_id)
+        if tenant is None:
+            with self._lock:
+                tenant = self._tenants.get(tenant_id)
+                if tenant is None:
+                    tenant = TenantTrending(
+                        Config.TRENDING_WINDOW_MINUTES * 60,
+                        Config.TRENDING_BUCKETS,
+                        Config.TRENDING_SKETCH_WIDTH,
+                        Config.TRENDING_SKETCH_DEPTH,
+                        Config.TRENDING_TOP_K * 4,
+                        persist=Config.TRENDING_PERSIST
+                    )
+                    if Config.TRENDING_PERSIST:
+                        self._restore(tenant_id, tenant)
+                    self._tenants[tenant_id] = tenant
+        return tenant
+
+    def record(self, tenant_id, items, now=None):
+        """Count (dish_id, quantity) pairs of a new order batch"""
+        now = now or time.time()
+        tenant = self._tenant(tenant_id)
+        for dish_id, quantity in items:
+            if dish_id is not None and quantity:
+                tenant.add(dish_id, quantity, now)
+
+    def top(self, tenant_id, k=None, now=None):
+        """[(dish_id, estimated count)] of the most ordered dishes in the window"""
+        # Reads never allocate counters for restaurants nobody ordered from
+        if tenant_id not in self._tenants and not Config.TRENDING_PERSIST:
+            return []
+        return self._tenant(tenant_id).top(k or Config.TRENDING_TOP_K, now or time.time())
+
+    def _restore(self, tenant_id, tenant):
+        from app.infrastructure.redis import get_redis_client
+
+        try:
+            raw = get_redis_client().get(f"{self.key_prefix}{tenant_id}")
+            if raw:
+                tenant.load(json.loads(raw))
+        except Exception:
+            logger.warning("Could not restore trending counters of tenant %s", tenant_id, exc_info=True)
+
+    def persist(self):
+        """Scheduled job: merge each tenant's new counts into the shared sketch in Redis
+        and adopt the result (expires after one window)"""
+        from app.infrastructure.redis import get_redis_client
+
+        client = get_redis_client()
+        now = time.time()
+        merged = 0
+        for tenant_id, tenant in list(self._tenants.items()):
+            pending = tenant.take_pending()
+            try:
+                state = self._merge(client, f"{self.key_prefix}{tenant_id}", tenant, pending, now)
+            except Exception:
+                tenant.return_pending(pending, now)
+                logger.warning("Could not merge trending counters of tenant %s", tenant_id, exc_info=True)
+                continue
+            tenant.load(state, now)
+            merged += 1
+        return merged
+
+    def _merge(self, client, key, tenant, pending, now, attempts=5):
+        """Read-merge-write under WATCH; retried when another worker wrote in between"""
+        from redis.exceptions import WatchError
+
+        with client.pipeline() as pipeline:
+            for _ in range(attempts):
+                try:
+                    pipeline.watch(key)
+                    raw = pipeline.get(key)
+                    state = tenant.merged(json.loads(raw) if raw else None, pending, now)
+                    if pending:
+                        pipeline.multi()
+                        pipeline.setex(key, Config.TRENDING_WINDOW_MINUTES * 60, json.dumps(state))
+                        pipeline.execute()
+                    return state
+                except WatchError:
+                    continue
+                finally:
+                    pipeline.reset()
+        raise RuntimeError(f"{key} kept changing during {attempts} merge attempts")
+
+
+trending = TrendingRegistry()
+
+
+def record_order_trending(tenant_id, order_lines):
+    """Feed (order, snapshot) pairs of a committed order batch; never fails the request"""
+    try:
+        trending.record(tenant_id, [(snapshot.dish_id, order.quantity) for order, snapshot in order_lines])
+    except Exception:
+        logger.exception("Trending counter update failed")
+
+
+def persist_trending():
+    if Config.TRENDING_PERSIST:
+        return trending.persist()
+    return 0
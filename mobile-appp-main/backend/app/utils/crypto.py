@@ -1,17 +1,22 @@
 """
 Cryptography utilities
 """
-from passlib.context import CryptContext
+import functools
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@functools.lru_cache(maxsize=None)
+def _pwd_context():
+    # passlib + bcrypt load on the first password check, not at boot
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
-
+    return _pwd_context().verify(plain_password, hashed_password)
@@ -37,3 +37,27 @@ def hash_string(text: str) -> str:
     """Hash a string using SHA256"""
     return hashlib.sha256(text.encode()).hexdigest()
 
+
+
+def encode_cursor(*values) -> str:
+    """Encode keyset pagination values into an opaque URL-safe cursor"""
+    import base64
+    import json
+    from datetime import datetime
+
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decode cursor produced by encode_cursor, None if malformed"""
+    import base64
+    import binascii
+    import json
+
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        return None
+    return values if isinstance(values, list) else None
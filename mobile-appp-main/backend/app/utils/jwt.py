@@ -3,8 +3,10 @@ JWT utilities for Flask
 """
 from datetime import datetime, timedelta
 from typing import Optional, Dict
-import jwt
 from app.config import Config
+from app.utils.lazy import lazy_import
+
+jwt = lazy_import("jwt")
 
 
 def create_access_token(
@@ -0,0 +1,21 @@
+"""
+Lazy imports - Nạp module nặng (numpy, passlib, jwt, Pillow...) ở lần dùng đầu tiên thay vì lúc khởi động
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Stands in for a module until one of its attributes is used"""
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        # Later lookups hit the instance dict directly
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """`np = lazy_import("numpy")` instead of `import numpy as np`"""
+    return sys.modules.get(name) or LazyModule(name)
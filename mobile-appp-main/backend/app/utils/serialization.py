@@ -0,0 +1,75 @@
+"""
+Serialization - Mã hóa JSON bằng orjson: JSON provider cho Flask và serializer biên dịch sẵn cho từng model
+
+orjson encodes datetime/date (ISO 8601, same as .isoformat()), Enum (its
+value), UUID and dataclasses natively, so handlers and serializers can pass
+those values through untouched.
+"""
+from decimal import Decimal
+
+import orjson
+from flask import current_app
+from flask.json.provider import JSONProvider
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    """Types orjson does not encode natively; matches Flask's default provider"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value):
+    """Encode to UTF-8 JSON bytes"""
+    return orjson.dumps(value, default=_default, option=OPTIONS)
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider (jsonify, dict return values, request.get_json) backed by orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = OPTIONS | orjson.OPT_INDENT_2 if self._app.debug else OPTIONS
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=option),
+            content_type=JSON_CONTENT_TYPE
+        )
+
+
+def compile_serializer(*fields):
+    """Build `serialize(row, **extra) -> dict` for the given attribute names.
+
+    The function is generated as a single dict literal, so there is no
+    per-field Python call; values are left native for orjson. It works on
+    ORM objects and on Core `Row` tuples (columns are attributes on both).
+    Keyword arguments are added to the result, e.g. rating=...
+    """
+    for field in fields:
+        if not field.isidentifier():
+            raise ValueError(f"Invalid field name: {field!r}")
+    items = "".join(f"{field!r}: row.{field}, " for field in fields)
+    namespace = {}
+    exec(f"def serialize(row, **extra):\n    return {{{items}**extra}}", namespace)
+    return namespace["serialize"]
+
+
+def envelope(data_json, message):
+    """Body of {"data": ..., "message": ...} around already encoded data"""
+    return b'{"data":' + data_json + b',"message":' + orjson.dumps(message) + b"}"
+
+
+def json_response(data_json, message, status=200):
+    """Flask response for already encoded data; skips re-encoding the payload"""
+    return current_app.response_class(envelope(data_json, message), status=status, content_type=JSON_CONTENT_TYPE)
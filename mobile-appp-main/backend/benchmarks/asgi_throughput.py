@@ -0,0 +1,142 @@
+"""
+Throughput of the hot routes served by Flask threads (sync) vs native asyncio (async).
+
+Both modes run `uvicorn app.asgi:app`; sync mode sets ASGI_NATIVE_ROUTES=false
+so every request goes through the Flask thread pool. Reports requests per
+second, latency percentiles and peak RSS of the server processes, plus the
+throughput scaled to a fixed memory budget.
+
+    pip install httpx
+    python benchmarks/asgi_throughput.py --tenant-id 1 --table-token <qr token> \\
+        --guest-token <guest access token> --workers 2 --concurrency 200 --memory-mb 512
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def process_tree_rss_mb(pid):
+    """Resident memory of pid and its children (Linux /proc)"""
+    pids, total = [pid], 0
+    while pids:
+        current = pids.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+            with open(f"/proc/{current}/task/{current}/children") as children:
+                pids.extend(int(child) for child in children.read().split())
+        except FileNotFoundError:
+            continue
+    return total / 1024
+
+
+def start_server(mode, args):
+    env = dict(os.environ, ASGI_NATIVE_ROUTES="true" if mode == "async" else "false", SCHEDULER_ENABLED="false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.asgi:app", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{args.port}/health", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+def requests_for(args):
+    """(method, path, kwargs) cycled by the load generator"""
+    requests = [("GET", f"/api/v1/dishes?tenant_id={args.tenant_id}&limit=20", {})]
+    if args.table_token:
+        requests.append(("POST", "/api/v1/qr/scan", {"json": {"token": args.table_token}}))
+    if args.guest_token:
+        requests.append(("GET", "/api/v1/guest/orders", {"headers": {"Authorization": f"Bearer {args.guest_token}"}}))
+    return requests
+
+
+async def load(args, server_pid):
+    base_url = f"http://127.0.0.1:{args.port}"
+    requests = requests_for(args)
+    latencies, errors, peak_rss = [], 0, 0.0
+    stop_at = time.monotonic() + args.duration
+
+    async def user(index):
+        nonlocal errors
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            position = index
+            while time.monotonic() < stop_at:
+                method, path, kwargs = requests[position % len(requests)]
+                position += 1
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+    async def sample_memory():
+        nonlocal peak_rss
+        while time.monotonic() < stop_at:
+            peak_rss = max(peak_rss, process_tree_rss_mb(server_pid))
+            await asyncio.sleep(0.5)
+
+    started = time.monotonic()
+    await asyncio.gather(sample_memory(), *(user(i) for i in range(args.concurrency)))
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+        "errors": errors,
+        "rss_mb": peak_rss
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenant-id", type=int, required=True)
+    parser.add_argument("--table-token", help="QR token for /qr/scan")
+    parser.add_argument("--guest-token", help="Guest access token for /guest/orders")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=int, default=20, help="Seconds of load per mode")
+    parser.add_argument("--memory-mb", type=float, default=512, help="Budget the throughput is scaled to")
+    parser.add_argument("--port", type=int, default=4100)
+    parser.add_argument("--modes", default="sync,async")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in args.modes.split(","):
+        server = start_server(mode, args)
+        try:
+            results[mode] = asyncio.run(load(args, server.pid))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print(f"{'mode':<6} {'rps':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'rss MB':>8} {f'rps@{args.memory_mb:g}MB':>12}")
+    for mode, result in results.items():
+        budget_rps = result["rps"] * args.memory_mb / result["rss_mb"] if result["rss_mb"] else 0.0
+        print(f"{mode:<6} {result['rps']:>9.1f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+              f"{result['errors']:>7} {result['rss_mb']:>8.1f} {budget_rps:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Boot time of a worker: imports, create_app() and the first request.
+
+Each run is a fresh interpreter. "default" boots as configured; "fast" sets
+DB_CREATE_ALL_ON_BOOT=false and SEED_ON_BOOT=false (run `flask db-setup`
+first). Also counts SQL statements and new DB connections made while booting.
+With --budget-ms the script fails when a mode's median import + create_app()
+time is over budget, so it can run as a startup check in CI.
+
+    python benchmarks/boot_time.py --runs 5
+    python benchmarks/boot_time.py --modes fast --budget-ms 800
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    "default": {},
+    "fast": {"DB_CREATE_ALL_ON_BOOT": "false", "SEED_ON_BOOT": "false"}
+}
+
+
+def measure():
+    """Runs inside the child interpreter; prints one JSON line"""
+    started = time.perf_counter()
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.pool import Pool
+
+    counts = {"statements": 0, "connections": 0}
+    event.listen(Engine, "before_cursor_execute", lambda *args: counts.__setitem__("statements", counts["statements"] + 1))
+    event.listen(Pool, "connect", lambda *args: counts.__setitem__("connections", counts["connections"] + 1))
+
+    from app.create_app import create_app
+    imported = time.perf_counter()
+    app = create_app()
+    created = time.perf_counter()
+    boot_counts = dict(counts)
+    app.test_client().get("/health")
+    served = time.perf_counter()
+
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "factory_ms": (created - imported) * 1000,
+        "first_request_ms": (served - created) * 1000,
+        "total_ms": (served - started) * 1000,
+        **boot_counts
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", default="default,fast")
+    parser.add_argument("--budget-ms", type=float, help="Fail when median import_ms + factory_ms exceeds this")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, BACKEND_DIR)
+        measure()
+        return
+
+    columns = ("import_ms", "factory_ms", "first_request_ms", "total_ms", "statements", "connections")
+    print(f"{'mode':<8}" + "".join(f"{column:>18}" for column in columns))
+    over_budget = []
+    for mode in args.modes.split(","):
+        env = dict(os.environ, SCHEDULER_ENABLED="false", CUSTOMER_HISTORY_ASYNC="false", **MODES[mode])
+        runs = []
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child"],
+                cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        medians = {column: statistics.median(run[column] for run in runs) for column in columns}
+        print(f"{mode:<8}" + "".join(f"{medians[column]:>18.1f}" for column in columns))
+        startup_ms = statistics.median(run["import_ms"] + run["factory_ms"] for run in runs)
+        if args.budget_ms is not None and startup_ms > args.budget_ms:
+            over_budget.append(f"{mode}: {startup_ms:.1f} ms")
+
+    if over_budget:
+        sys.exit(f"Startup over budget ({args.budget_ms:.0f} ms): " + ", ".join(over_budget))
+
+
+if __name__ == "__main__":
+    main()
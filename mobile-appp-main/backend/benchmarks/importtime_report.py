@@ -0,0 +1,67 @@
+"""
+Import-time profile of booting the app (python -X importtime).
+
+Lists the slowest top-level imports (cumulative) and the packages that cost
+the most in total (self time summed per top-level package), so heavy
+dependencies that should be lazy stand out.
+
+    python benchmarks/importtime_report.py --top 20
+    ENABLED_ROUTES=guest,qr python benchmarks/importtime_report.py
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+BOOT = "from app.create_app import create_app; create_app()"
+
+
+def profile(code, env):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    ).stderr
+    entries = []
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, len(indent) // 2, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--code", default=BOOT, help="Statement to profile")
+    args = parser.parse_args()
+
+    env = dict(os.environ, SCHEDULER_ENABLED="false", CUSTOMER_HISTORY_ASYNC="false")
+    entries = profile(args.code, env)
+    if not entries:
+        sys.exit("No -X importtime output (did the boot fail?)")
+
+    per_package = defaultdict(int)
+    for name, _, self_us, _ in entries:
+        per_package[name.split(".")[0]] += self_us
+    total_us = sum(per_package.values())
+
+    print(f"Total import time: {total_us / 1000:.1f} ms over {len(entries)} modules\n")
+    print(f"{'slowest top-level imports':<50}{'cumulative ms':>14}")
+    top_level = sorted((entry for entry in entries if entry[1] == 0), key=lambda entry: -entry[3])
+    for name, _, _, cumulative_us in top_level[:args.top]:
+        print(f"{name:<50}{cumulative_us / 1000:>14.1f}")
+
+    print(f"\n{'package':<50}{'self ms':>14}{'share':>8}")
+    for package, self_us in sorted(per_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<50}{self_us / 1000:>14.1f}{self_us / total_us:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
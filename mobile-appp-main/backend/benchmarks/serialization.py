@@ -0,0 +1,85 @@
+"""
+Serialization CPU per page: hand-built dicts through Flask's default JSON
+provider vs the compiled serializers and orjson (app.utils.serialization).
+
+Uses in-memory model objects, so no database is needed.
+
+    python benchmarks/serialization.py --items 100 --number 2000
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from app.api.routes.order_routes import serialize_order  # noqa: E402
+from app.models.order_model import OrderModel, OrderStatus  # noqa: E402
+from app.utils.serialization import OrjsonProvider, dumps, envelope  # noqa: E402
+
+
+def make_orders(count):
+    now = datetime.now(timezone.utc)
+    return [
+        OrderModel(
+            id=i, tenant_id=1, table_number=i % 20, guest_id=i, dish_snapshot_id=i, quantity=2,
+            notes="Không hành, ít cay", status=OrderStatus.PENDING, order_handler_id=None,
+            created_at=now, updated_at=now
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_page(app, orders):
+    """What get_orders did before: dict per row, .isoformat(), Flask's default provider"""
+    return app.json.response({
+        "data": {
+            "items": [{
+                "id": o.id,
+                "tenant_id": o.tenant_id,
+                "table_number": o.table_number,
+                "guest_id": o.guest_id,
+                "dish_snapshot_id": o.dish_snapshot_id,
+                "quantity": o.quantity,
+                "notes": o.notes,
+                "status": o.status.value,
+                "order_handler_id": o.order_handler_id,
+                "created_at": o.created_at.isoformat() if o.created_at else None,
+                "updated_at": o.updated_at.isoformat() if o.updated_at else None
+            } for o in orders],
+            "total": len(orders)
+        },
+        "message": "Lấy danh sách đơn hàng thành công!"
+    }).get_data()
+
+
+def compiled_page(app, orders):
+    body = dumps({"items": [serialize_order(o) for o in orders], "total": len(orders)})
+    return app.response_class(envelope(body, "Lấy danh sách đơn hàng thành công!")).get_data()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    orders = make_orders(args.items)
+    legacy_app = Flask("legacy")
+    legacy_app.config["JSON_AS_ASCII"] = False
+    orjson_app = Flask("orjson")
+    orjson_app.json = OrjsonProvider(orjson_app)
+
+    results = {}
+    for name, app, page in (("legacy", legacy_app, legacy_page), ("compiled", orjson_app, compiled_page)):
+        with app.app_context():
+            results[name] = min(timeit.repeat(lambda: page(app, orders), number=args.number, repeat=5)) / args.number
+        print(f"{name:<10}{results[name] * 1e6:>10.1f} us/page")
+    print(f"speedup   {results['legacy'] / results['compiled']:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Alembic environment - Migrate the default database or one shard
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.config import Config
+from app.infrastructure.databases.base import Base
+from app.infrastructure.databases.shards import DEFAULT_SHARD, parse_shard_urls
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def database_url():
+    """URL passed by `flask db-setup`, else -x shard=NAME, else DATABASE_URL"""
+    if config.attributes.get("url"):
+        return config.attributes["url"]
+    shard = context.get_x_argument(as_dictionary=True).get("shard", DEFAULT_SHARD)
+    if shard == DEFAULT_SHARD:
+        return Config.DATABASE_URI
+    return parse_shard_urls(Config.DATABASE_SHARDS)[shard]
+
+
+def run_migrations_offline():
+    context.configure(url=database_url(), target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connectable = create_engine(database_url(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=connection.dialect.name == "sqlite")
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,251 @@
+"""tables, columns and indexes added since the baseline
+
+Refresh tokens are keyed by their SHA-256 digest from here on; existing
+tokens are hashed in place (downgrading cannot recover them and deletes them).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 12:40:17.902114
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('hll_sketches',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('metric', sa.String(length=32), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('precision', sa.Integer(), nullable=False),
+    sa.Column('registers', sa.LargeBinary(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('metric', 'tenant_id', 'day', name='uq_hll_metric_tenant_day')
+    )
+    op.create_index(op.f('ix_hll_sketches_id'), 'hll_sketches', ['id'], unique=False)
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('tenant_shards',
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.String(length=64), nullable=False),
+    sa.Column('moved_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('tenant_id')
+    )
+    op.create_index(op.f('ix_tenant_shards_shard'), 'tenant_shards', ['shard'], unique=False)
+    op.create_table('dish_sales_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('branch_id', sa.Integer(), nullable=True),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('dish_id', sa.Integer(), nullable=True),
+    sa.Column('dish_name', sa.String(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_dish_sales_rollups_id'), 'dish_sales_rollups', ['id'], unique=False)
+    op.create_index('ix_dish_sales_rollups_tenant_day', 'dish_sales_rollups', ['tenant_id', 'day'], unique=False)
+    op.create_table('sales_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('branch_id', sa.Integer(), nullable=True),
+    sa.Column('period', sa.String(length=4), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('revenue', sa.BigInteger(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('items_sold', sa.Integer(), nullable=False),
+    sa.Column('covers', sa.Integer(), nullable=False),
+    sa.Column('tickets', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sales_rollups_id'), 'sales_rollups', ['id'], unique=False)
+    op.create_index('ix_sales_rollups_tenant_period_bucket', 'sales_rollups', ['tenant_id', 'period', 'bucket'], unique=False)
+    op.create_table('tenant_rating_stats',
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tenant_id')
+    )
+    op.create_table('dish_rating_stats',
+    sa.Column('dish_id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('rating_1', sa.Integer(), nullable=False),
+    sa.Column('rating_2', sa.Integer(), nullable=False),
+    sa.Column('rating_3', sa.Integer(), nullable=False),
+    sa.Column('rating_4', sa.Integer(), nullable=False),
+    sa.Column('rating_5', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['dish_id'], ['dishes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('dish_id')
+    )
+    op.create_index(op.f('ix_dish_rating_stats_tenant_id'), 'dish_rating_stats', ['tenant_id'], unique=False)
+    op.create_table('reservation_tables',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('reservation_id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('table_number', sa.Integer(), nullable=False),
+    sa.Column('start_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('end_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['reservation_id'], ['reservations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reservation_tables_id'), 'reservation_tables', ['id'], unique=False)
+    op.create_index('ix_reservation_tables_period', 'reservation_tables', ['tenant_id', 'table_number', 'start_at', 'end_at'], unique=False)
+    op.create_index(op.f('ix_reservation_tables_reservation_id'), 'reservation_tables', ['reservation_id'], unique=False)
+    op.create_table('loyalty_ledger',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('spend_delta', sa.Float(), nullable=False),
+    sa.Column('points_delta', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('order_id')
+    )
+    op.create_index('ix_loyalty_ledger_customer_created', 'loyalty_ledger', ['customer_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_loyalty_ledger_id'), 'loyalty_ledger', ['id'], unique=False)
+    op.create_index(op.f('ix_loyalty_ledger_tenant_id'), 'loyalty_ledger', ['tenant_id'], unique=False)
+    op.create_table('order_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('guest_id', sa.Integer(), nullable=True),
+    sa.Column('customer_id', sa.Integer(), nullable=True),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('table_number', sa.Integer(), nullable=True),
+    sa.Column('dish_id', sa.Integer(), nullable=True),
+    sa.Column('dish_name', sa.String(), nullable=False),
+    sa.Column('dish_image', sa.String(), nullable=True),
+    sa.Column('price', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('visit_key', sa.String(length=32), nullable=True),
+    sa.Column('paid_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['guest_id'], ['guests.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('order_id')
+    )
+    op.create_index('ix_order_history_customer_created_id', 'order_history', ['customer_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_order_history_guest_created_id', 'order_history', ['guest_id', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_order_history_id'), 'order_history', ['id'], unique=False)
+    op.create_index(op.f('ix_order_history_tenant_id'), 'order_history', ['tenant_id'], unique=False)
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.add_column(sa.Column('customer_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_orders_customer_id_customers', 'customers', ['customer_id'], ['id'], ondelete='SET NULL'
+        )
+        batch_op.create_index(batch_op.f('ix_orders_customer_id'), ['customer_id'], unique=False)
+        batch_op.create_index('ix_orders_tenant_created', ['tenant_id', 'created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_orders_updated_at'), ['updated_at'], unique=False)
+
+    with op.batch_alter_table('reservations') as batch_op:
+        batch_op.add_column(sa.Column('branch_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('start_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('end_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_reservations_branch_id_branches', 'branches', ['branch_id'], ['id'], ondelete='SET NULL'
+        )
+        batch_op.create_index(batch_op.f('ix_reservations_branch_id'), ['branch_id'], unique=False)
+        batch_op.create_index('ix_reservations_tenant_start', ['tenant_id', 'start_at'], unique=False)
+
+    op.create_index('ix_reviews_tenant_created_id', 'reviews', ['tenant_id', 'created_at', 'id'], unique=False)
+    op.add_column('tables', sa.Column('combine_group', sa.String(), nullable=True))
+
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.add_column(sa.Column('token_hash', sa.String(length=64), nullable=True))
+    refresh_tokens = sa.table('refresh_tokens', sa.column('token', sa.String()), sa.column('token_hash', sa.String()))
+    bind = op.get_bind()
+    for token in bind.execute(sa.select(refresh_tokens.c.token)).scalars().all():
+        bind.execute(refresh_tokens.update().where(refresh_tokens.c.token == token).values(
+            token_hash=hashlib.sha256(token.encode()).hexdigest()
+        ))
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        # Dropping the old key column drops its primary key with it
+        batch_op.drop_column('token')
+        batch_op.alter_column('token_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_primary_key('refresh_tokens_pkey', ['token_hash'])
+        batch_op.create_index(batch_op.f('ix_refresh_tokens_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.execute('DELETE FROM refresh_tokens')
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_refresh_tokens_expires_at'))
+        batch_op.drop_column('token_hash')
+        batch_op.add_column(sa.Column('token', sa.String(), nullable=False))
+        batch_op.create_primary_key('refresh_tokens_pkey', ['token'])
+
+    op.drop_column('tables', 'combine_group')
+    op.drop_index('ix_reviews_tenant_created_id', table_name='reviews')
+
+    with op.batch_alter_table('reservations') as batch_op:
+        batch_op.drop_index('ix_reservations_tenant_start')
+        batch_op.drop_index(batch_op.f('ix_reservations_branch_id'))
+        batch_op.drop_constraint('fk_reservations_branch_id_branches', type_='foreignkey')
+        batch_op.drop_column('end_at')
+        batch_op.drop_column('start_at')
+        batch_op.drop_column('branch_id')
+
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_orders_updated_at'))
+        batch_op.drop_index('ix_orders_tenant_created')
+        batch_op.drop_index(batch_op.f('ix_orders_customer_id'))
+        batch_op.drop_constraint('fk_orders_customer_id_customers', type_='foreignkey')
+        batch_op.drop_column('customer_id')
+
+    op.drop_index(op.f('ix_order_history_tenant_id'), table_name='order_history')
+    op.drop_index(op.f('ix_order_history_id'), table_name='order_history')
+    op.drop_index('ix_order_history_guest_created_id', table_name='order_history')
+    op.drop_index('ix_order_history_customer_created_id', table_name='order_history')
+    op.drop_table('order_history')
+    op.drop_index(op.f('ix_loyalty_ledger_tenant_id'), table_name='loyalty_ledger')
+    op.drop_index(op.f('ix_loyalty_ledger_id'), table_name='loyalty_ledger')
+    op.drop_index('ix_loyalty_ledger_customer_created', table_name='loyalty_ledger')
+    op.drop_table('loyalty_ledger')
+    op.drop_index(op.f('ix_reservation_tables_reservation_id'), table_name='reservation_tables')
+    op.drop_index('ix_reservation_tables_period', table_name='reservation_tables')
+    op.drop_index(op.f('ix_reservation_tables_id'), table_name='reservation_tables')
+    op.drop_table('reservation_tables')
+    op.drop_index(op.f('ix_dish_rating_stats_tenant_id'), table_name='dish_rating_stats')
+    op.drop_table('dish_rating_stats')
+    op.drop_table('tenant_rating_stats')
+    op.drop_index('ix_sales_rollups_tenant_period_bucket', table_name='sales_rollups')
+    op.drop_index(op.f('ix_sales_rollups_id'), table_name='sales_rollups')
+    op.drop_table('sales_rollups')
+    op.drop_index('ix_dish_sales_rollups_tenant_day', table_name='dish_sales_rollups')
+    op.drop_index(op.f('ix_dish_sales_rollups_id'), table_name='dish_sales_rollups')
+    op.drop_table('dish_sales_rollups')
+    op.drop_index(op.f('ix_tenant_shards_shard'), table_name='tenant_shards')
+    op.drop_table('tenant_shards')
+    op.drop_table('rollup_watermarks')
+    op.drop_index(op.f('ix_hll_sketches_id'), table_name='hll_sketches')
+    op.drop_table('hll_sketches')
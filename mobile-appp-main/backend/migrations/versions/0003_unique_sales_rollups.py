@@ -0,0 +1,59 @@
+"""unique sales rollup rows
+
+Rollups are upserted on their natural key, so rows without a branch or
+dish store 0 instead of NULL (NULLs never conflict).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 16:05:42.318520
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows duplicated by concurrent rebuilds hold the same totals: keep one of each
+    op.execute(
+        "DELETE FROM sales_rollups WHERE id NOT IN ("
+        "SELECT MIN(id) FROM sales_rollups GROUP BY tenant_id, COALESCE(branch_id, 0), period, bucket)"
+    )
+    op.execute(
+        "DELETE FROM dish_sales_rollups WHERE id NOT IN ("
+        "SELECT MIN(id) FROM dish_sales_rollups "
+        "GROUP BY tenant_id, day, COALESCE(branch_id, 0), COALESCE(dish_id, 0), dish_name)"
+    )
+    op.execute("UPDATE sales_rollups SET branch_id = 0 WHERE branch_id IS NULL")
+    op.execute("UPDATE dish_sales_rollups SET branch_id = 0 WHERE branch_id IS NULL")
+    op.execute("UPDATE dish_sales_rollups SET dish_id = 0 WHERE dish_id IS NULL")
+
+    with op.batch_alter_table('sales_rollups', schema=None) as batch_op:
+        batch_op.alter_column('branch_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_unique_constraint('uq_sales_rollups_bucket', ['tenant_id', 'branch_id', 'period', 'bucket'])
+
+    with op.batch_alter_table('dish_sales_rollups', schema=None) as batch_op:
+        batch_op.alter_column('branch_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('dish_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_unique_constraint(
+            'uq_dish_sales_rollups_dish', ['tenant_id', 'day', 'branch_id', 'dish_id', 'dish_name']
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('dish_sales_rollups', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_dish_sales_rollups_dish', type_='unique')
+        batch_op.alter_column('dish_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.alter_column('branch_id', existing_type=sa.Integer(), nullable=True)
+
+    with op.batch_alter_table('sales_rollups', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_sales_rollups_bucket', type_='unique')
+        batch_op.alter_column('branch_id', existing_type=sa.Integer(), nullable=True)
+
+    op.execute("UPDATE dish_sales_rollups SET dish_id = NULL WHERE dish_id = 0")
+    op.execute("UPDATE dish_sales_rollups SET branch_id = NULL WHERE branch_id = 0")
+    op.execute("UPDATE sales_rollups SET branch_id = NULL WHERE branch_id = 0")
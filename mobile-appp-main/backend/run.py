@@ -1,15 +1,13 @@
 """
-Run script for development
+Run script for development (ASGI: native async routes, Flask for the rest)
 """
 import uvicorn
-from app.main import app
 
 if __name__ == "__main__":
     uvicorn.run(
-        "app.main:app",
+        "app.asgi:app",
         host="0.0.0.0",
         port=4000,
         reload=True,
         log_level="info"
     )
-
@@ -0,0 +1,156 @@
+"""
+Cache tests - Two-tier cache against the in-memory backend (no Redis needed)
+"""
+import threading
+import time
+
+import pytest
+
+from app.infrastructure.cache import Cache
+from app.infrastructure.cache.backends import MemoryBackend
+
+
+class Producer:
+    """Callable returning a fixed value and counting its calls"""
+
+    def __init__(self, value, delay=0.0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self.value
+
+
+@pytest.fixture
+def backend():
+    return MemoryBackend()
+
+
+def make_cache(backend, **kwargs):
+    return Cache(backend=backend, local_ttl=5, default_ttl=60, **kwargs)
+
+
+def test_miss_then_local_and_remote_hits(backend):
+    cache = make_cache(backend)
+    producer = Producer({"items": [1, 2]})
+
+    assert cache.get_or_set("menu", producer) == {"items": [1, 2]}
+    assert cache.get_or_set("menu", producer) == {"items": [1, 2]}
+    cache.clear_local()
+    assert cache.get_or_set("menu", producer) == {"items": [1, 2]}
+
+    assert producer.calls == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["local_hits"], stats["remote_hits"]) == (1, 1, 1)
+
+
+def test_other_worker_reads_shared_tier(backend):
+    producer = Producer("menu")
+    make_cache(backend).get_or_set("menu", producer)
+
+    assert make_cache(backend).get_or_set("menu", producer) == "menu"
+    assert producer.calls == 1
+
+
+def test_tag_bump_makes_entries_stale(backend):
+    writer, reader = make_cache(backend), make_cache(backend)
+    tags = ("tenant:1:menu",)
+    reader.get_or_set("t1:dishes", Producer("old"), tags=tags)
+    reader.get_or_set("t1:other", Producer("kept"), tags=("tenant:1:tables",))
+
+    writer.invalidate_tags("tenant:1:menu")
+    # Without a bus the reader's near-cache is not told; drop it to read the shared tier
+    reader.clear_local()
+
+    fresh = Producer("new")
+    assert reader.get_or_set("t1:dishes", fresh, tags=tags) == "new"
+    assert fresh.calls == 1
+    untouched = Producer("recomputed")
+    assert reader.get_or_set("t1:other", untouched, tags=("tenant:1:tables",)) == "kept"
+    assert untouched.calls == 0
+
+
+def test_invalidation_during_producer_skips_near_cache(backend):
+    cache = make_cache(backend)
+    tags = ("tenant:1:menu",)
+
+    def producer():
+        # A dish update lands while the menu is being read
+        cache.invalidate_tags("tenant:1:menu")
+        return "old"
+
+    assert cache.get_or_set("t1:dishes", producer, tags=tags) == "old"
+    fresh = Producer("new")
+    assert cache.get_or_set("t1:dishes", fresh, tags=tags) == "new"
+    assert fresh.calls == 1
+
+
+def test_tag_bump_evicts_own_near_cache(backend):
+    cache = make_cache(backend)
+    cache.get_or_set("t1:dishes", Producer("old"), tags=("tenant:1:menu",))
+
+    cache.invalidate_tags("tenant:1:menu")
+
+    assert cache.get_or_set("t1:dishes", Producer("new"), tags=("tenant:1:menu",)) == "new"
+
+
+def test_xfetch_refreshes_early_near_expiry(backend, monkeypatch):
+    cache = make_cache(backend)
+    # A slow producer (delta ~0.1s) and a 2s TTL
+    cache.get_or_set("report", Producer("v1", delay=0.1), ttl=2)
+    cache.clear_local()
+
+    # Draw that makes -delta * beta * log(1 - r) larger than the remaining TTL
+    monkeypatch.setattr("app.infrastructure.cache.random.random", lambda: 1 - 1e-12)
+    refresh = Producer("v2")
+    assert cache.get_or_set("report", refresh, ttl=2) == "v2"
+    assert refresh.calls == 1
+    assert cache.stats()["early_refreshes"] == 1
+
+
+def test_no_early_refresh_far_from_expiry(backend, monkeypatch):
+    cache = make_cache(backend)
+    cache.get_or_set("report", Producer("v1"), ttl=60)
+    cache.clear_local()
+
+    monkeypatch.setattr("app.infrastructure.cache.random.random", lambda: 0.5)
+    refresh = Producer("v2")
+    assert cache.get_or_set("report", refresh, ttl=60) == "v1"
+    assert refresh.calls == 0
+
+
+def test_waits_for_lock_holder_instead_of_recomputing(backend):
+    holder, waiter = make_cache(backend), make_cache(backend)
+    slow = Producer("computed once", delay=0.3)
+    thread = threading.Thread(target=holder.get_or_set, args=("menu", slow))
+    thread.start()
+    time.sleep(0.1)  # holder has taken the lock and is computing
+
+    duplicate = Producer("duplicate")
+    assert waiter.get_or_set("menu", duplicate) == "computed once"
+    thread.join()
+
+    assert (slow.calls, duplicate.calls) == (1, 0)
+    assert waiter.stats()["lock_waits"] == 1
+
+
+def test_computes_itself_when_lock_holder_never_stores(backend):
+    cache = make_cache(backend, lock_timeout=0.2)
+    backend.add("cache:menu:lock", "1", 60)
+
+    producer = Producer("fallback")
+    assert cache.get_or_set("menu", producer) == "fallback"
+    assert producer.calls == 1
+    assert cache.stats()["lock_waits"] == 1
+
+
+def test_disabled_cache_always_calls_producer(backend):
+    cache = make_cache(backend, enabled=False)
+    producer = Producer("value")
+    cache.get_or_set("menu", producer)
+    cache.get_or_set("menu", producer)
+    assert producer.calls == 2
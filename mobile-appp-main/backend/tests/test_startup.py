@@ -0,0 +1,63 @@
+"""
+Startup tests - Fast-start boot (no create_all, no seed) within the startup budget
+
+Each boot is a fresh interpreter running benchmarks/boot_time.py --child, so
+import time is measured cold. Raise STARTUP_BUDGET_MS on slow CI machines.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", 1500))
+
+FAST_START = {
+    "DB_CREATE_ALL_ON_BOOT": "false",
+    "SEED_ON_BOOT": "false",
+    "SCHEDULER_ENABLED": "false",
+    "CUSTOMER_HISTORY_ASYNC": "false",
+    "CACHE_BACKEND": "memory"
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def full_route_set():
+    """Skip when an enabled route module cannot be imported; the boot would only report that ImportError"""
+    result = subprocess.run(
+        [sys.executable, "-c", (
+            "import importlib\n"
+            "from app.api.routes import enabled_route_modules\n"
+            "for module in enabled_route_modules():\n"
+            "    importlib.import_module('app.api.routes.' + module)\n"
+        )],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        pytest.skip("route modules do not import: " + result.stderr.strip().splitlines()[-1])
+
+
+def boot(tmp_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'boot.db'}", **FAST_START)
+    result = subprocess.run(
+        [sys.executable, os.path.join(BACKEND_DIR, "benchmarks", "boot_time.py"), "--child"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_fast_start_within_budget(tmp_path):
+    runs = [boot(tmp_path) for _ in range(3)]
+    startup_ms = statistics.median(run["import_ms"] + run["factory_ms"] for run in runs)
+    assert startup_ms <= BUDGET_MS, f"import + create_app() took {startup_ms:.0f} ms (budget {BUDGET_MS:.0f} ms)"
+
+
+def test_fast_start_does_no_database_work(tmp_path):
+    run = boot(tmp_path)
+    assert run["statements"] == 0
+    assert run["connections"] == 0